@@ -0,0 +1,224 @@
+"""Compare deployed role templates against a controller-rendered expected-state hash catalog.
+
+Hosts in the same zone render identical role templates, so rendering them once per host
+and diffing is wasted work. For every role in ``roles``, each entry of ``<role>_templates``
+is keyed by the template source hash plus the resolved values of only the variables the
+template references. The first host with a given key renders the template on the
+controller and stores the SHA-256 of the output in ``data/expected_state/``; every other
+host with the same variable set reuses it. The host then gets one command that checks all
+expected hashes with ``sha256sum -c`` and reports only the files that differ.
+
+Templates that call ``lookup``/``query`` read variables that cannot be found statically;
+they are keyed per host. Templates that cannot be rendered outside their play (undefined
+variables) are reported under ``unrendered`` and not compared.
+
+Task arguments:
+  roles: role names to check (default ``deployed_roles``).
+  catalog_dir: catalog directory (default ``$EXPECTED_STATE_CATALOG`` or ``data/expected_state``).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shlex
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import yaml
+from jinja2 import meta, nodes
+
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.common.text.converters import to_text
+from ansible.module_utils.parsing.convert_bool import boolean
+from ansible.plugins.action import ActionBase
+from ansible.template import AnsibleEnvironment, generate_ansible_template_vars
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+ROLES_DIR = REPO_ROOT / "roles"
+DEFAULT_CATALOG_DIR = REPO_ROOT / "data" / "expected_state"
+CATALOG_VERSION = 1
+DYNAMIC_CALLS = {"lookup", "query", "q"}
+# Same defaults as the template module so the rendered bytes match what was deployed.
+TEMPLATE_OVERRIDES = {"trim_blocks": True, "lstrip_blocks": False}
+
+
+def _catalog_root(catalog_dir: str | Path | None) -> Path:
+    root = Path(catalog_dir or os.environ.get("EXPECTED_STATE_CATALOG") or DEFAULT_CATALOG_DIR)
+    return root if root.is_absolute() else REPO_ROOT / root
+
+
+def _load_yaml(path: Path) -> dict[str, Any]:
+    if not path.exists():
+        return {}
+    return yaml.safe_load(path.read_text(encoding="utf-8")) or {}
+
+
+@lru_cache(maxsize=32)
+def role_layers(roles: tuple[str, ...], roles_dir: Path = ROLES_DIR) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Return merged ``defaults`` and ``vars`` of ``roles`` as site.yml exposes them to a play.
+
+    Cached so every host checking the same role list reuses one parse; callers must not
+    mutate the returned dicts.
+    """
+    defaults: dict[str, Any] = {}
+    role_vars: dict[str, Any] = {}
+    for role in roles:
+        defaults.update(_load_yaml(roles_dir / role / "defaults" / "main.yml"))
+        role_vars.update(_load_yaml(roles_dir / role / "vars" / "main.yml"))
+    return defaults, role_vars
+
+
+def referenced_variables(environment: Any, source: str) -> tuple[list[str], bool]:
+    """Return the top-level variables ``source`` reads and whether it also reads dynamically."""
+    ast = environment.parse(source)
+    dynamic = any(
+        isinstance(call.node, nodes.Name) and call.node.name in DYNAMIC_CALLS for call in ast.find_all(nodes.Call)
+    )
+    return sorted(meta.find_undeclared_variables(ast)), dynamic
+
+
+def variable_set_key(role: str, src: str, source: str, values: dict[str, Any]) -> str:
+    """Return the catalog key for one template rendered with ``values``."""
+    digest = hashlib.sha256()
+    digest.update(f"{CATALOG_VERSION}\0{role}\0{src}\0".encode("utf-8"))
+    digest.update(hashlib.sha256(source.encode("utf-8")).digest())
+    digest.update(json.dumps(values, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def entry_path(key: str, catalog_dir: str | Path | None = None) -> Path:
+    return _catalog_root(catalog_dir) / key[:2] / f"{key}.json"
+
+
+def load_entry(key: str, catalog_dir: str | Path | None = None) -> dict[str, Any] | None:
+    try:
+        return json.loads(entry_path(key, catalog_dir).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+
+
+def save_entry(key: str, entry: dict[str, Any], catalog_dir: str | Path | None = None) -> None:
+    """Write a catalog entry atomically; concurrent writers of the same key write equal content."""
+    path = entry_path(key, catalog_dir)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-", suffix=".json")
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        json.dump(entry, handle, sort_keys=True)
+    os.replace(tmp_name, path)
+
+
+def check_command(expected: dict[str, str]) -> str:
+    """Return one shell command that prints only the files whose hash differs from ``expected``."""
+    lines = [f"{digest}  {dest}" for dest, digest in sorted(expected.items())]
+    return f"printf '%s\\n' {' '.join(shlex.quote(line) for line in lines)} | sha256sum --quiet -c - 2>/dev/null; true"
+
+
+def parse_check_output(stdout: str, expected: dict[str, str]) -> list[str]:
+    """Return the destinations ``sha256sum -c`` reported as changed or missing."""
+    drifted = []
+    for line in stdout.splitlines():
+        dest, sep, status = line.rpartition(": ")
+        if sep and status.startswith("FAILED") and dest in expected:
+            drifted.append(dest)
+    return sorted(set(drifted))
+
+
+class ActionModule(ActionBase):
+    """Check deployed templates against the expected-state hash catalog."""
+
+    TRANSFERS_FILES = False
+    _VALID_ARGS = frozenset(("roles", "catalog_dir"))
+
+    def _expected_hash(
+        self,
+        templar: Any,
+        role: str,
+        item: dict[str, Any],
+        dest: str,
+        host: str,
+        catalog_dir: str | None,
+        stats: dict[str, int],
+    ) -> str:
+        source_path = ROLES_DIR / role / "templates" / str(item["src"])
+        source = source_path.read_text(encoding="utf-8")
+        names, dynamic = referenced_variables(templar.environment, source)
+        values: dict[str, Any] = {"__host__": host} if dynamic else {}
+        for name in names:
+            if name in templar.available_variables:
+                values[name] = templar.template(templar.available_variables[name])
+
+        key = variable_set_key(role, str(item["src"]), source, values)
+        entry = load_entry(key, catalog_dir)
+        if entry is not None:
+            stats["catalog_hits"] += 1
+            return entry["sha256"]
+
+        render_vars = dict(templar.available_variables)
+        render_vars.update(generate_ansible_template_vars(str(item["src"]), str(source_path), dest))
+        renderer = templar.copy_with_new_env(
+            environment_class=AnsibleEnvironment,
+            searchpath=[str(source_path.parent), str(source_path.parent.parent)],
+            available_variables=render_vars,
+        )
+        rendered = renderer.do_template(
+            source, preserve_trailing_newlines=True, escape_backslashes=False, overrides=TEMPLATE_OVERRIDES
+        )
+        digest = hashlib.sha256(to_text(rendered).encode("utf-8")).hexdigest()
+        save_entry(key, {"role": role, "src": str(item["src"]), "sha256": digest, "size": len(rendered)}, catalog_dir)
+        stats["rendered"] += 1
+        return digest
+
+    def run(self, tmp: Any = None, task_vars: dict[str, Any] | None = None) -> dict[str, Any]:
+        task_vars = task_vars or {}
+        result = super().run(tmp, task_vars)
+        del tmp
+
+        roles = self._task.args.get("roles", task_vars.get("deployed_roles", []))
+        if not isinstance(roles, list):
+            raise AnsibleActionFail("roles must be a list of role names")
+        catalog_dir = self._task.args.get("catalog_dir")
+        host = task_vars.get("inventory_hostname", self._play_context.remote_addr)
+
+        defaults, role_vars = role_layers(tuple(roles))
+        available = dict(defaults)
+        available.update(task_vars)
+        available.update(role_vars)
+        templar = self._templar.copy_with_new_env(available_variables=available)
+
+        stats = {"rendered": 0, "catalog_hits": 0}
+        owners: dict[str, str] = {}
+        expected: dict[str, str] = {}
+        unrendered: dict[str, list[str]] = {}
+        for role in roles:
+            if not boolean(templar.template(available.get(f"{role}_enabled", True)), strict=False):
+                continue
+            for item in templar.template(available.get(f"{role}_templates") or []):
+                try:
+                    dest = str(templar.template(item["dest"]))
+                    expected[dest] = self._expected_hash(templar, role, item, dest, host, catalog_dir, stats)
+                    owners[dest] = role
+                except Exception as exc:  # noqa: BLE001 - any render failure only skips that template
+                    unrendered.setdefault(role, []).append(f"{item.get('src')}: {type(exc).__name__}: {to_text(exc)}")
+
+        drift: dict[str, list[str]] = {}
+        if expected:
+            check = self._low_level_execute_command(check_command(expected), sudoable=True)
+            for dest in parse_check_output(check.get("stdout", ""), expected):
+                drift.setdefault(owners[dest], []).append(dest)
+
+        result.update(
+            {
+                "changed": False,
+                "expected_state": {
+                    "checked_files": len(expected),
+                    "drift": drift,
+                    "unrendered": unrendered,
+                    **stats,
+                },
+            }
+        )
+        self._remove_tmp_path(self._connection._shell.tmpdir)
+        return result
@@ -0,0 +1,234 @@
+"""Serve gathered facts from a controller snapshot store while a host is unchanged.
+
+A replacement for play-level ``gather_facts`` that keeps one snapshot per host and
+gather subset under ``data/fact_snapshots/<host>/``. Each run costs one raw probe that
+reads the host's boot ID and package database stamp. The snapshot is reused while both
+match and it is younger than ``ttl``. Otherwise only the requested ``gather_subset`` is
+gathered and stored. Volatile facts such as ``date_time`` are always refreshed.
+
+Task arguments:
+  gather_subset: subsets to gather on a miss (same syntax as ``setup``; default ``all``).
+  volatile_subset: subsets refreshed even on a hit (default ``['date_time']``).
+  ttl: snapshot lifetime in seconds; ``0`` disables the store (default 86400).
+  store_dir: snapshot directory (default ``$FACT_SNAPSHOT_STORE`` or ``data/fact_snapshots``).
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from ansible.errors import AnsibleActionFail
+from ansible.module_utils.common.text.converters import to_text
+from ansible.plugins.action import ActionBase
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_STORE_DIR = REPO_ROOT / "data" / "fact_snapshots"
+DEFAULT_TTL_SECONDS = 86400
+DEFAULT_VOLATILE_SUBSET = ["date_time"]
+SNAPSHOT_VERSION = 1
+
+# One round trip: the boot ID changes on reboot, the package database stamps change on
+# any install/update/removal, and /etc/image-id changes when a node is reimaged.
+PROBE_COMMAND = (
+    "cat /proc/sys/kernel/random/boot_id 2>/dev/null; echo '--'; "
+    "stat -L -c '%n %Y %s' /var/lib/rpm/rpmdb.sqlite /var/lib/rpm/Packages "
+    "/var/lib/dpkg/status /etc/image-id 2>/dev/null; true"
+)
+
+_UNSAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+def _store_root(store_dir: str | Path | None) -> Path:
+    root = Path(store_dir or os.environ.get("FACT_SNAPSHOT_STORE") or DEFAULT_STORE_DIR)
+    return root if root.is_absolute() else REPO_ROOT / root
+
+
+def normalize_subset(subset: Any) -> list[str]:
+    """Return the sorted positive subsets that ``setup`` would collect for ``subset``."""
+    items = subset.split(",") if isinstance(subset, str) else list(subset or [])
+    items = [str(item).strip() for item in items if str(item).strip()]
+    positives = {item for item in items if not item.startswith("!")}
+    negatives = {item[1:] for item in items if item.startswith("!")}
+    if not positives and "all" not in negatives:
+        positives.add("all")
+    if "min" not in negatives:
+        positives.add("min")
+    return sorted(positives)
+
+
+def subset_key(subset: Any) -> str:
+    return hashlib.sha256(",".join(normalize_subset(subset)).encode("utf-8")).hexdigest()[:16]
+
+
+def covers(snapshot_subset: list[str], requested: list[str]) -> bool:
+    """Whether facts gathered for ``snapshot_subset`` include everything in ``requested``."""
+    return "all" in snapshot_subset or set(requested) <= set(snapshot_subset)
+
+
+def volatile_refresh(requested: list[str], volatile: Any) -> list[str]:
+    """Return the volatile subsets the request actually asks for."""
+    wanted = set(requested)
+    return sorted(
+        item
+        for item in normalize_subset(["!all", "!min", *(volatile or [])])
+        if item != "min" and (item in wanted or wanted & {"all", "min"})
+    )
+
+
+def host_signature(probe_stdout: str) -> dict[str, str]:
+    """Derive the invalidation signature from the probe output."""
+    boot_id, _, stamps = to_text(probe_stdout).partition("--")
+    lines = sorted(line.strip() for line in stamps.splitlines() if line.strip())
+    return {
+        "boot_id": boot_id.strip() or "unknown",
+        "package_fingerprint": hashlib.sha256("\n".join(lines).encode("utf-8")).hexdigest(),
+    }
+
+
+def host_dir(host: str, store_dir: str | Path | None = None) -> Path:
+    return _store_root(store_dir) / (_UNSAFE_NAME_RE.sub("_", host) or "_")
+
+
+def load_snapshots(host: str, store_dir: str | Path | None = None) -> list[dict[str, Any]]:
+    directory = host_dir(host, store_dir)
+    snapshots = []
+    for path in sorted(directory.glob("*.json")) if directory.is_dir() else []:
+        try:
+            snapshot = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if isinstance(snapshot, dict) and snapshot.get("version") == SNAPSHOT_VERSION:
+            snapshots.append(snapshot)
+    return snapshots
+
+
+def find_snapshot(
+    snapshots: list[dict[str, Any]],
+    signature: dict[str, str],
+    requested: list[str],
+    ttl: float,
+    now: float,
+) -> tuple[dict[str, Any] | None, str]:
+    """Return ``(snapshot, reason)`` for the first usable snapshot, or ``(None, reason)``."""
+    if ttl <= 0:
+        return None, "disabled"
+    if not snapshots:
+        return None, "missing"
+    reason = "subset"
+    for snapshot in snapshots:
+        if snapshot.get("signature", {}).get("boot_id") != signature["boot_id"]:
+            return None, "rebooted"
+        if snapshot.get("signature", {}).get("package_fingerprint") != signature["package_fingerprint"]:
+            return None, "packages_changed"
+        if now - float(snapshot.get("gathered_at", 0)) > ttl:
+            reason = "expired"
+            continue
+        if covers(snapshot.get("gather_subset", []), requested):
+            return snapshot, "hit"
+    return None, reason
+
+
+def save_snapshot(
+    host: str,
+    facts: dict[str, Any],
+    requested: list[str],
+    signature: dict[str, str],
+    now: float,
+    store_dir: str | Path | None = None,
+) -> Path:
+    """Atomically write the snapshot for ``host`` and ``requested`` subsets."""
+    target = host_dir(host, store_dir) / f"{subset_key(requested)}.json"
+    target.parent.mkdir(parents=True, exist_ok=True)
+    document = {
+        "version": SNAPSHOT_VERSION,
+        "host": host,
+        "gather_subset": requested,
+        "gathered_at": now,
+        "signature": signature,
+        "ansible_facts": facts,
+    }
+    handle, temp_name = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            json.dump(document, stream, sort_keys=True, default=str)
+        os.replace(temp_name, target)
+    except OSError:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
+    return target
+
+
+def invalidate(host: str, store_dir: str | Path | None = None) -> None:
+    """Drop every snapshot held for ``host``."""
+    shutil.rmtree(host_dir(host, store_dir), ignore_errors=True)
+
+
+class ActionModule(ActionBase):
+    """Gather facts through the snapshot store."""
+
+    TRANSFERS_FILES = False
+    _VALID_ARGS = frozenset(("gather_subset", "volatile_subset", "ttl", "store_dir"))
+
+    def _gather(self, subset: list[str], task_vars: dict[str, Any]) -> dict[str, Any]:
+        result = self._execute_module(
+            module_name="ansible.legacy.setup",
+            module_args={"gather_subset": subset},
+            task_vars=task_vars,
+            wrap_async=False,
+        )
+        if result.get("failed") or result.get("unreachable"):
+            raise AnsibleActionFail(result.get("msg", "fact gathering failed"), result=result)
+        return result.get("ansible_facts") or {}
+
+    def run(self, tmp: Any = None, task_vars: dict[str, Any] | None = None) -> dict[str, Any]:
+        task_vars = task_vars or {}
+        result = super().run(tmp, task_vars)
+        del tmp
+
+        args = self._task.args
+        gather_subset = args.get("gather_subset", ["all"])
+        requested = normalize_subset(gather_subset)
+        try:
+            ttl = float(args.get("ttl", DEFAULT_TTL_SECONDS))
+        except (TypeError, ValueError) as exc:
+            raise AnsibleActionFail(f"ttl must be a number of seconds: {exc}") from exc
+        store_dir = args.get("store_dir")
+        host = task_vars.get("inventory_hostname", self._play_context.remote_addr)
+        now = time.time()
+
+        probe = self._low_level_execute_command(PROBE_COMMAND, sudoable=False)
+        signature = host_signature(probe.get("stdout", ""))
+        snapshot, reason = find_snapshot(load_snapshots(host, store_dir), signature, requested, ttl, now)
+
+        if snapshot is not None:
+            facts = dict(snapshot["ansible_facts"])
+            refresh = volatile_refresh(requested, args.get("volatile_subset", DEFAULT_VOLATILE_SUBSET))
+            if refresh:
+                facts.update(self._gather(["!all", "!min", *refresh], task_vars))
+            age = round(now - float(snapshot["gathered_at"]), 3)
+        else:
+            if reason in {"rebooted", "packages_changed"}:
+                invalidate(host, store_dir)
+            facts = self._gather(gather_subset if isinstance(gather_subset, list) else [gather_subset], task_vars)
+            if ttl > 0:
+                save_snapshot(host, facts, requested, signature, now, store_dir)
+            age = 0.0
+
+        facts["_ansible_facts_gathered"] = True
+        result.update(
+            {
+                "changed": False,
+                "ansible_facts": facts,
+                "fact_snapshot": {"hit": snapshot is not None, "reason": reason, "age_seconds": age},
+            }
+        )
+        self._remove_tmp_path(self._connection._shell.tmpdir)
+        return result
@@ -0,0 +1,365 @@
+"""Wall-time profiling callback for assessment and evidence playbooks."""
+from __future__ import annotations
+
+DOCUMENTATION = """
+    name: assessment_profile
+    type: aggregate
+    short_description: Record wall time per play, host, role include and verify command
+    description:
+      - Times every task per host, attributes it to the role it came from, and breaks
+        looped command tasks down by item (verify/evidence command C(id)).
+      - Writes a JSON profile with slowest-hosts and slowest-checks rankings plus a
+        flamegraph-compatible folded-stack file.
+      - When the playbook writes an assessment JSON under C(assessment_history), the
+        timing summary and the real C(run_duration_seconds) are merged into its C(metadata).
+    requirements:
+      - enable per run with C(ANSIBLE_CALLBACKS_ENABLED=assessment_profile); the Makefile assess and evidence targets do
+    options:
+      output_dir:
+        description: Directory that receives profile files (relative paths resolve from the repository root).
+        default: data/assessment_profiles
+        env:
+          - name: ASSESSMENT_PROFILE_DIR
+        ini:
+          - section: callback_assessment_profile
+            key: output_dir
+      top_n:
+        description: Number of entries kept in each ranking.
+        default: 20
+        type: int
+        env:
+          - name: ASSESSMENT_PROFILE_TOP_N
+        ini:
+          - section: callback_assessment_profile
+            key: top_n
+"""
+
+import json
+import re
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+from ansible.plugins.callback import CallbackBase
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_OUTPUT_DIR = REPO_ROOT / "data" / "assessment_profiles"
+ASSESSMENT_HISTORY_DIR = "assessment_history"
+NO_ROLE = "(play)"
+
+_DELTA_RE = re.compile(r"^(\d+):(\d{2}):(\d{2}(?:\.\d+)?)$")
+
+
+def parse_delta(delta: Any) -> float | None:
+    """Convert a command module ``delta`` (``H:MM:SS.ffffff``) into seconds."""
+    match = _DELTA_RE.match(str(delta or "").strip())
+    if not match:
+        return None
+    hours, minutes, seconds = match.groups()
+    return int(hours) * 3600 + int(minutes) * 60 + float(seconds)
+
+
+def _frame(name: str) -> str:
+    # Folded-stack frames are separated by ';' and terminated by a space.
+    return str(name).replace(";", ":").replace(" ", "_") or "_"
+
+
+class ProfileRecorder:
+    """Accumulate timings independently of Ansible so they can be unit tested."""
+
+    def __init__(self, clock: Any = time.monotonic) -> None:
+        self._clock = clock
+        self.playbook = "playbook"
+        self.started = clock()
+        self.finished: float | None = None
+        self.plays: list[dict[str, Any]] = []
+        self._task_starts: dict[tuple[str, str], float] = {}
+        self._item_marks: dict[tuple[str, str], float] = {}
+        self.tasks: list[dict[str, Any]] = []
+        self.checks: list[dict[str, Any]] = []
+
+    def start_playbook(self, name: str) -> None:
+        self.playbook = name
+        self.started = self._clock()
+
+    def start_play(self, name: str) -> None:
+        now = self._clock()
+        if self.plays and self.plays[-1]["end"] is None:
+            self.plays[-1]["end"] = now
+        self.plays.append({"name": name, "start": now, "end": None})
+
+    def _current_play(self) -> str:
+        return self.plays[-1]["name"] if self.plays else "play"
+
+    def start_task(self, host: str, task_uuid: str) -> None:
+        now = self._clock()
+        self._task_starts[(host, task_uuid)] = now
+        self._item_marks[(host, task_uuid)] = now
+
+    def finish_item(self, host: str, task_uuid: str, role: str, task: str, check: str, delta: Any) -> None:
+        """Record one loop item; prefer the module-reported ``delta`` over arrival time."""
+        now = self._clock()
+        mark = self._item_marks.get((host, task_uuid), now)
+        self._item_marks[(host, task_uuid)] = now
+        seconds = parse_delta(delta)
+        if seconds is None:
+            seconds = max(0.0, now - mark)
+        self.checks.append(
+            {
+                "play": self._current_play(),
+                "host": host,
+                "role": role,
+                "task": task,
+                "check": check,
+                "seconds": seconds,
+            }
+        )
+
+    def finish_task(self, host: str, task_uuid: str, role: str, task: str, status: str) -> None:
+        now = self._clock()
+        start = self._task_starts.pop((host, task_uuid), now)
+        self._item_marks.pop((host, task_uuid), None)
+        self.tasks.append(
+            {
+                "play": self._current_play(),
+                "host": host,
+                "role": role,
+                "task": task,
+                "status": status,
+                "seconds": max(0.0, now - start),
+            }
+        )
+
+    def finish(self) -> None:
+        self.finished = self._clock()
+        if self.plays and self.plays[-1]["end"] is None:
+            self.plays[-1]["end"] = self.finished
+
+    @property
+    def duration(self) -> float:
+        end = self.finished if self.finished is not None else self._clock()
+        return max(0.0, end - self.started)
+
+    def host_totals(self) -> dict[str, float]:
+        totals: dict[str, float] = defaultdict(float)
+        for entry in self.tasks:
+            totals[entry["host"]] += entry["seconds"]
+        return dict(totals)
+
+    def role_totals(self) -> dict[str, dict[str, float]]:
+        """Return per-role totals across hosts with the slowest single host include."""
+        per_host: dict[tuple[str, str], float] = defaultdict(float)
+        for entry in self.tasks:
+            per_host[(entry["role"], entry["host"])] += entry["seconds"]
+
+        totals: dict[str, dict[str, float]] = {}
+        for (role, _host), seconds in per_host.items():
+            bucket = totals.setdefault(role, {"total_seconds": 0.0, "max_host_seconds": 0.0, "hosts": 0})
+            bucket["total_seconds"] += seconds
+            bucket["max_host_seconds"] = max(bucket["max_host_seconds"], seconds)
+            bucket["hosts"] += 1
+        return totals
+
+    def slowest_hosts(self, top_n: int) -> list[dict[str, Any]]:
+        ranked = sorted(self.host_totals().items(), key=lambda item: (-item[1], item[0]))
+        return [{"host": host, "seconds": round(seconds, 3)} for host, seconds in ranked[:top_n]]
+
+    def slowest_checks(self, top_n: int) -> list[dict[str, Any]]:
+        grouped: dict[tuple[str, str], dict[str, Any]] = {}
+        for entry in self.checks:
+            key = (entry["role"], entry["check"])
+            bucket = grouped.setdefault(
+                key,
+                {"role": entry["role"], "check": entry["check"], "hosts": 0, "total_seconds": 0.0,
+                 "max_seconds": 0.0, "max_host": entry["host"]},
+            )
+            bucket["hosts"] += 1
+            bucket["total_seconds"] += entry["seconds"]
+            if entry["seconds"] > bucket["max_seconds"]:
+                bucket["max_seconds"] = entry["seconds"]
+                bucket["max_host"] = entry["host"]
+
+        ranked = sorted(grouped.values(), key=lambda item: (-item["max_seconds"], item["role"], item["check"]))
+        result = []
+        for bucket in ranked[:top_n]:
+            result.append(
+                {
+                    **bucket,
+                    "total_seconds": round(bucket["total_seconds"], 3),
+                    "max_seconds": round(bucket["max_seconds"], 3),
+                    "mean_seconds": round(bucket["total_seconds"] / bucket["hosts"], 3),
+                }
+            )
+        return result
+
+    def play_durations(self) -> list[dict[str, Any]]:
+        return [
+            {"play": play["name"], "seconds": round((play["end"] or play["start"]) - play["start"], 3)}
+            for play in self.plays
+        ]
+
+    def folded_stacks(self) -> list[str]:
+        """Return ``playbook;play;host;role;task[;check] <ms>`` lines for flamegraph.pl."""
+        item_ms: dict[tuple[str, str, str, str], int] = defaultdict(int)
+        counts: dict[str, int] = defaultdict(int)
+        for entry in self.checks:
+            stack = [self.playbook, entry["play"], entry["host"], entry["role"], entry["task"], entry["check"]]
+            millis = int(round(entry["seconds"] * 1000))
+            counts[";".join(_frame(part) for part in stack)] += millis
+            item_ms[(entry["play"], entry["host"], entry["role"], entry["task"])] += millis
+
+        for entry in self.tasks:
+            stack = [self.playbook, entry["play"], entry["host"], entry["role"], entry["task"]]
+            millis = int(round(entry["seconds"] * 1000))
+            millis -= item_ms.get((entry["play"], entry["host"], entry["role"], entry["task"]), 0)
+            counts[";".join(_frame(part) for part in stack)] += max(0, millis)
+
+        return [f"{stack} {value}" for stack, value in sorted(counts.items()) if value > 0]
+
+    def summary(self, top_n: int) -> dict[str, Any]:
+        roles = self.role_totals()
+        return {
+            "run_duration_seconds": round(self.duration, 3),
+            "plays": self.play_durations(),
+            "roles": {
+                role: {
+                    "total_seconds": round(bucket["total_seconds"], 3),
+                    "max_host_seconds": round(bucket["max_host_seconds"], 3),
+                    "hosts": int(bucket["hosts"]),
+                }
+                for role, bucket in sorted(roles.items())
+            },
+            "hosts_profiled": len(self.host_totals()),
+            "slowest_hosts": self.slowest_hosts(top_n),
+            "slowest_checks": self.slowest_checks(top_n),
+        }
+
+
+def merge_into_assessment(assessment_file: Path, summary: dict[str, Any], profile_file: Path, top_n: int = 5) -> None:
+    """Write the real run duration and a short timing summary into assessment metadata."""
+    payload = json.loads(assessment_file.read_text(encoding="utf-8"))
+    metadata = payload.setdefault("metadata", {})
+    metadata["run_duration_seconds"] = summary["run_duration_seconds"]
+    metadata["timing"] = {
+        "plays": summary["plays"],
+        "roles": summary["roles"],
+        "slowest_hosts": summary["slowest_hosts"][:top_n],
+        "slowest_checks": summary["slowest_checks"][:top_n],
+        "profile_file": str(profile_file),
+    }
+    assessment_file.write_text(json.dumps(payload, indent=4, sort_keys=True), encoding="utf-8")
+
+
+class CallbackModule(CallbackBase):
+    """Ansible entrypoint wrapping :class:`ProfileRecorder`."""
+
+    CALLBACK_VERSION = 2.0
+    CALLBACK_TYPE = "aggregate"
+    CALLBACK_NAME = "assessment_profile"
+    CALLBACK_NEEDS_ENABLED = True
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.recorder = ProfileRecorder()
+        self.assessment_files: list[Path] = []
+        self.basedir = Path.cwd()
+        self.output_dir = DEFAULT_OUTPUT_DIR
+        self.top_n = 20
+
+    def set_options(self, task_keys: Any = None, var_options: Any = None, direct: Any = None) -> None:
+        super().set_options(task_keys=task_keys, var_options=var_options, direct=direct)
+        output_dir = Path(self.get_option("output_dir"))
+        self.output_dir = output_dir if output_dir.is_absolute() else REPO_ROOT / output_dir
+        self.top_n = int(self.get_option("top_n"))
+
+    @staticmethod
+    def _role_name(task: Any) -> str:
+        # Flattened playbooks (scripts/compile_playbooks.py) tag each block with its source role.
+        node = task
+        while node is not None:
+            compiled_from = (getattr(node, "vars", None) or {}).get("compiled_from_role")
+            if compiled_from:
+                return str(compiled_from)
+            node = getattr(node, "_parent", None)
+        role = getattr(task, "_role", None)
+        return role.get_name() if role is not None else NO_ROLE
+
+    def _finish(self, result: Any, status: str) -> None:
+        task = result._task
+        self.recorder.finish_task(
+            result._host.get_name(), task._uuid, self._role_name(task), task.get_name(), status
+        )
+
+    def v2_playbook_on_start(self, playbook: Any) -> None:
+        self.recorder.start_playbook(Path(playbook._file_name).stem)
+        # Local module runs resolve relative paths from the playbook directory.
+        self.basedir = Path(playbook._basedir)
+
+    def v2_playbook_on_play_start(self, play: Any) -> None:
+        self.recorder.start_play(play.get_name().strip() or "play")
+
+    def v2_runner_on_start(self, host: Any, task: Any) -> None:
+        self.recorder.start_task(host.get_name(), task._uuid)
+
+    def v2_runner_item_on_ok(self, result: Any) -> None:
+        self._record_item(result)
+
+    def v2_runner_item_on_failed(self, result: Any) -> None:
+        self._record_item(result)
+
+    def _record_item(self, result: Any) -> None:
+        item_result = result._result
+        loop_var = item_result.get("ansible_loop_var", "item")
+        item = item_result.get(loop_var)
+        # Only verify/evidence command loops carry an ``id``; other loops stay task-level.
+        if not isinstance(item, dict) or not item.get("id"):
+            return
+        task = result._task
+        self.recorder.finish_item(
+            result._host.get_name(),
+            task._uuid,
+            self._role_name(task),
+            task.get_name(),
+            str(item["id"]),
+            item_result.get("delta"),
+        )
+
+    def v2_runner_on_ok(self, result: Any) -> None:
+        self._finish(result, "ok")
+        dest = result._result.get("dest")
+        if dest and Path(dest).suffix == ".json" and Path(dest).parent.name == ASSESSMENT_HISTORY_DIR:
+            self.assessment_files.append((self.basedir / dest).resolve())
+
+    def v2_runner_on_failed(self, result: Any, ignore_errors: bool = False) -> None:
+        self._finish(result, "ignored" if ignore_errors else "failed")
+
+    def v2_runner_on_skipped(self, result: Any) -> None:
+        self._finish(result, "skipped")
+
+    def v2_runner_on_unreachable(self, result: Any) -> None:
+        self._finish(result, "unreachable")
+
+    def v2_playbook_on_stats(self, stats: Any) -> None:
+        self.recorder.finish()
+        summary = self.recorder.summary(self.top_n)
+
+        stamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H-%M-%SZ")
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        profile_file = self.output_dir / f"{self.recorder.playbook}-{stamp}.json"
+        folded_file = profile_file.with_suffix(".folded")
+
+        profile = {"playbook": self.recorder.playbook, "generated_at": stamp, **summary,
+                   "folded_stacks_file": folded_file.name}
+        profile_file.write_text(json.dumps(profile, indent=2) + "\n", encoding="utf-8")
+        folded_file.write_text("\n".join(self.recorder.folded_stacks()) + "\n", encoding="utf-8")
+
+        for assessment_file in self.assessment_files:
+            if assessment_file.exists():
+                merge_into_assessment(assessment_file, summary, profile_file)
+
+        self._display.display(
+            f"Assessment profile: {profile_file} ({summary['run_duration_seconds']}s, "
+            f"{summary['hosts_profiled']} host(s))"
+        )
@@ -0,0 +1,352 @@
+"""In-process simulated hosts for benchmarking playbooks against thousands of nodes."""
+from __future__ import annotations
+
+DOCUMENTATION = """
+    name: simulated
+    short_description: Answer module and command executions from a scripted fleet model
+    description:
+      - Never contacts a real host. Every module or command the controller would run remotely
+        is answered from a YAML model, after an injected latency, so assessment, evidence and
+        compliance-gate playbooks can be timed against thousands of hosts on one machine.
+      - Command results are matched by regular expression against the command line; per-host
+        profiles override the defaults to model drifted or differently built nodes.
+      - Failure injection covers unreachable hosts and commands failing at a seeded rate.
+    options:
+      model_file:
+        description: Fleet model YAML (relative paths resolve from the repository root).
+        default: tests/simulation/fleet_model.yml
+        env:
+          - name: SIMULATED_FLEET_MODEL
+        vars:
+          - name: ansible_simulated_model
+      profile:
+        description: Model profile whose rules are tried before the default rules.
+        default: default
+        vars:
+          - name: ansible_simulated_profile
+      latency_ms:
+        description: Base latency added to every execution on this host.
+        default: 0
+        type: float
+        vars:
+          - name: ansible_simulated_latency_ms
+      jitter_ms:
+        description: Maximum extra latency, drawn deterministically per execution.
+        default: 0
+        type: float
+        vars:
+          - name: ansible_simulated_jitter_ms
+      failure_rate:
+        description: Fraction of command executions that return the rule's failure result.
+        default: 0
+        type: float
+        vars:
+          - name: ansible_simulated_failure_rate
+      unreachable:
+        description: Fail every connection attempt as unreachable.
+        default: false
+        type: bool
+        vars:
+          - name: ansible_simulated_unreachable
+      seed:
+        description: Seed for jitter and failure injection so runs are reproducible.
+        default: ""
+        env:
+          - name: SIMULATED_FLEET_SEED
+        vars:
+          - name: ansible_simulated_seed
+"""
+
+import ast
+import base64
+import hashlib
+import json
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+import yaml
+from ansible.errors import AnsibleConnectionFailure
+from ansible.plugins.connection import ConnectionBase
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_MODEL_FILE = REPO_ROOT / "tests" / "simulation" / "fleet_model.yml"
+SIMULATED_HOME = "/root"
+SIMULATED_TMP = "/tmp/.ansible-simulated"
+
+_MODULE_RE = re.compile(r"mod_name='([\w.]+)'")
+_PARAMS_RE = re.compile(r"^\s*ANSIBALLZ_PARAMS = (.+)$", re.MULTILINE)
+_TMPDIR_RE = re.compile(r"(ansible-tmp-[\w.\-]+)")
+_ECHO_HOME_RE = re.compile(r"^echo ~(\S*)")
+
+COMMAND_MODULES = {"command", "shell", "raw", "script"}
+
+
+def _unit(*parts: Any) -> float:
+    """Map ``parts`` to a reproducible number in [0, 1)."""
+    digest = hashlib.sha256("|".join(str(part) for part in parts).encode("utf-8")).hexdigest()
+    return int(digest[:12], 16) / float(1 << 48)
+
+
+def _delta(seconds: float) -> str:
+    # Same "H:MM:SS.ffffff" shape the command module reports.
+    text = str(timedelta(seconds=round(seconds, 6)))
+    return text if "." in text else f"{text}.000000"
+
+
+@lru_cache(maxsize=8)
+def load_model(path: str) -> dict[str, Any]:
+    """Load and cache a fleet model; forks reuse the parsed copy."""
+    source = Path(path)
+    if not source.is_absolute():
+        source = REPO_ROOT / source
+    with source.open("r", encoding="utf-8") as handle:
+        model = yaml.safe_load(handle) or {}
+    for rules in [model.get("commands", [])] + [
+        profile.get("commands", []) for profile in (model.get("profiles") or {}).values()
+    ]:
+        for rule in rules:
+            rule["_pattern"] = re.compile(str(rule.get("match", "")))
+    return model
+
+
+def parse_module_payload(in_data: bytes | str | None) -> tuple[str, dict[str, Any]] | None:
+    """Return ``(module short name, module args)`` from a pipelined AnsiballZ wrapper."""
+    if not in_data:
+        return None
+    text = in_data.decode("utf-8", "replace") if isinstance(in_data, bytes) else in_data
+    module = _MODULE_RE.search(text)
+    params = _PARAMS_RE.search(text)
+    if not module or not params:
+        return None
+    raw = ast.literal_eval(params.group(1).strip())
+    if isinstance(raw, bytes):
+        raw = raw.decode("utf-8")
+    args = json.loads(raw).get("ANSIBLE_MODULE_ARGS", {})
+    return module.group(1).rsplit(".", 1)[-1], args
+
+
+class FleetModel:
+    """Resolve scripted results for one simulated host."""
+
+    def __init__(self, model: dict[str, Any], host: str, profile: str = "default", seed: str = "") -> None:
+        self.model = model
+        self.host = host
+        self.profile = profile
+        self.seed = seed
+        self.defaults = model.get("defaults") or {}
+        self.profile_data = (model.get("profiles") or {}).get(profile) or {}
+
+    def _render(self, text: Any) -> str:
+        return str(text if text is not None else "").replace("{host}", self.host).replace("{profile}", self.profile)
+
+    def rule_for(self, command: str) -> dict[str, Any]:
+        for rule in list(self.profile_data.get("commands", [])) + list(self.model.get("commands", [])):
+            if rule["_pattern"].search(command):
+                return rule
+        return {}
+
+    def latency(self, rule: dict[str, Any], base_ms: float, jitter_ms: float, counter: int) -> float:
+        rule_ms = float(rule.get("latency_ms", self.defaults.get("latency_ms", 0)))
+        profile_ms = float(self.profile_data.get("latency_ms", 0))
+        jitter = float(rule.get("jitter_ms", jitter_ms or self.profile_data.get("jitter_ms", self.defaults.get("jitter_ms", 0))))
+        return (base_ms + profile_ms + rule_ms + jitter * _unit(self.seed, self.host, counter)) / 1000.0
+
+    def command_result(self, command: str, failure_rate: float = 0.0) -> dict[str, Any]:
+        rule = self.rule_for(command)
+        rate = float(rule.get("failure_rate", failure_rate))
+        if rate and _unit(self.seed, self.host, command) < rate:
+            return {
+                "rc": int(rule.get("failure_rc", 1)),
+                "stdout": self._render(rule.get("failure_stdout", "")),
+                "stderr": self._render(rule.get("failure_stderr", "simulated failure")),
+            }
+        return {
+            "rc": int(rule.get("rc", self.defaults.get("rc", 0))),
+            "stdout": self._render(rule.get("stdout", self.defaults.get("stdout", ""))),
+            "stderr": self._render(rule.get("stderr", self.defaults.get("stderr", ""))),
+        }
+
+    def facts(self) -> dict[str, Any]:
+        now = datetime.now().astimezone()
+        facts = {
+            "ansible_hostname": self.host.split(".")[0],
+            "ansible_fqdn": self.host,
+            "ansible_nodename": self.host,
+            "ansible_system": "Linux",
+            "ansible_os_family": "RedHat",
+            "ansible_distribution": "Rocky",
+            "ansible_distribution_major_version": "9",
+            "ansible_distribution_version": "9.4",
+            "ansible_architecture": "x86_64",
+            "ansible_kernel": "5.14.0-427.el9.x86_64",
+            "ansible_service_mgr": "systemd",
+            "ansible_pkg_mgr": "dnf",
+            "ansible_selinux": {"status": "enabled", "mode": "enforcing"},
+            "ansible_fips": True,
+            "ansible_date_time": {
+                "date": now.strftime("%Y-%m-%d"),
+                "time": now.strftime("%H:%M:%S"),
+                "epoch": str(int(now.timestamp())),
+                "iso8601": now.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+                "tz": now.strftime("%Z"),
+            },
+            "ansible_default_ipv4": {"address": f"10.{int(_unit(self.host) * 250)}.0.1"},
+        }
+        facts.update(self.model.get("facts") or {})
+        facts.update(self.profile_data.get("facts") or {})
+        return facts
+
+    def module_result(self, module: str, args: dict[str, Any]) -> dict[str, Any]:
+        path = args.get("path") or args.get("dest") or args.get("src") or ""
+        if module in {"setup", "gather_facts"}:
+            result: dict[str, Any] = {"ansible_facts": self.facts(), "changed": False}
+        elif module == "ping":
+            result = {"ping": "pong", "changed": False}
+        elif module == "stat":
+            result = {
+                "changed": False,
+                "stat": {
+                    "exists": True,
+                    "path": path,
+                    "isreg": True,
+                    "isdir": False,
+                    "mode": "0640",
+                    "uid": 0,
+                    "gid": 0,
+                    "pw_name": "root",
+                    "gr_name": "root",
+                    "size": 1024,
+                    "mtime": time.time(),
+                    "checksum": hashlib.sha1(path.encode("utf-8")).hexdigest(),
+                },
+            }
+        elif module == "file":
+            result = {"changed": False, "path": path, "state": args.get("state") or "file"}
+        elif module == "slurp":
+            content = self._render((self.model.get("files") or {}).get(path, f"simulated content of {path}\n"))
+            result = {"content": base64.b64encode(content.encode("utf-8")).decode("ascii"), "encoding": "base64", "source": path}
+        elif module == "find":
+            result = {"changed": False, "files": [], "matched": 0, "examined": 0}
+        else:
+            result = {"changed": False}
+        overrides = dict((self.model.get("modules") or {}).get(module) or {})
+        overrides.update((self.profile_data.get("modules") or {}).get(module) or {})
+        result.update(overrides)
+        return result
+
+
+class Connection(ConnectionBase):
+    """Connection plugin that executes nothing and answers from :class:`FleetModel`."""
+
+    transport = "simulated"
+    has_pipelining = True
+    always_pipeline_modules = True
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._executions = 0
+        self._fleet: FleetModel | None = None
+
+    def _model(self) -> FleetModel:
+        if self._fleet is None:
+            model_file = str(self.get_option("model_file") or DEFAULT_MODEL_FILE)
+            self._fleet = FleetModel(
+                load_model(model_file),
+                host=self._play_context.remote_addr or "simulated",
+                profile=str(self.get_option("profile") or "default"),
+                seed=str(self.get_option("seed") or ""),
+            )
+        return self._fleet
+
+    def _connect(self) -> "Connection":
+        if self.get_option("unreachable"):
+            raise AnsibleConnectionFailure(f"Simulated host {self._play_context.remote_addr} is unreachable")
+        self._connected = True
+        return self
+
+    def _respond(self, rule: dict[str, Any]) -> float:
+        self._executions += 1
+        seconds = self._model().latency(
+            rule, float(self.get_option("latency_ms")), float(self.get_option("jitter_ms")), self._executions
+        )
+        if seconds > 0:
+            time.sleep(seconds)
+        return seconds
+
+    def _command(self, command: str, module: str, check_mode: bool) -> dict[str, Any]:
+        fleet = self._model()
+        started = datetime.now()
+        if check_mode and module in {"command", "shell"}:
+            return {
+                "changed": False,
+                "skipped": True,
+                "msg": "Command would have run if not in check mode",
+                "cmd": command,
+                "rc": None,
+                "stdout": "",
+                "stderr": "",
+            }
+        elapsed = self._respond(fleet.rule_for(command))
+        outcome = fleet.command_result(command, float(self.get_option("failure_rate")))
+        result = {
+            "changed": True,
+            "cmd": command,
+            "start": started.strftime("%Y-%m-%d %H:%M:%S.%f"),
+            "end": (started + timedelta(seconds=elapsed)).strftime("%Y-%m-%d %H:%M:%S.%f"),
+            "delta": _delta(elapsed),
+            "msg": "",
+            **outcome,
+        }
+        if outcome["rc"] != 0:
+            result.update({"failed": True, "msg": "non-zero return code"})
+        return result
+
+    def exec_command(self, cmd: str, in_data: bytes | None = None, sudoable: bool = True) -> tuple[int, bytes, bytes]:
+        super().exec_command(cmd, in_data=in_data, sudoable=sudoable)
+
+        payload = parse_module_payload(in_data)
+        if payload is not None:
+            module, args = payload
+            if module in COMMAND_MODULES:
+                argv = args.get("argv")
+                command = " ".join(argv) if argv else str(args.get("_raw_params") or args.get("cmd") or "")
+                result = self._command(command, module, bool(args.get("_ansible_check_mode")))
+            else:
+                self._respond({})
+                result = self._model().module_result(module, args)
+            return 0, json.dumps(result).encode("utf-8"), b""
+
+        # Low-level shell plumbing issued by action plugins rather than modules.
+        tmpdir = _TMPDIR_RE.search(cmd)
+        if tmpdir and "mkdir" in cmd:
+            return 0, f"{tmpdir.group(1)}={SIMULATED_TMP}/{tmpdir.group(1)}\n".encode("utf-8"), b""
+        home = _ECHO_HOME_RE.match(cmd.strip())
+        if home:
+            user = home.group(1).split("/")[0]
+            return 0, (f"/home/{user}" if user and user != "root" else SIMULATED_HOME).encode("utf-8") + b"\n", b""
+        if cmd.lstrip().startswith(("rm -f -r", "chmod", "chown", "setfacl")):
+            return 0, b"", b""
+
+        result = self._command(cmd, "raw", False)
+        return int(result["rc"]), result["stdout"].encode("utf-8"), result["stderr"].encode("utf-8")
+
+    def put_file(self, in_path: str, out_path: str) -> None:
+        super().put_file(in_path, out_path)
+        self._respond({})
+
+    def fetch_file(self, in_path: str, out_path: str) -> None:
+        super().fetch_file(in_path, out_path)
+        self._respond({})
+        content = (self._model().model.get("files") or {}).get(in_path, f"simulated content of {in_path}\n")
+        Path(out_path).parent.mkdir(parents=True, exist_ok=True)
+        Path(out_path).write_text(self._model()._render(content), encoding="utf-8")
+
+    def close(self) -> None:
+        self._connected = False
+
+    def reset(self) -> None:
+        self._executions = 0
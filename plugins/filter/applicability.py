@@ -0,0 +1,145 @@
+"""Zone-aware control applicability filters for assessment aggregation."""
+from __future__ import annotations
+
+from typing import Any
+
+UNASSIGNED_ZONE = "unassigned"
+
+
+def _truthy(value: Any) -> bool:
+    if isinstance(value, str):
+        return value.strip().lower() in {"true", "yes", "1"}
+    return bool(value)
+
+
+def control_applicability(controls: list[dict[str, Any]], host_zones: dict[str, Any]) -> dict[str, Any]:
+    """Return the control x zone matrix and the host x control assignment derived from it.
+
+    ``host_zones`` maps every inventory host to its ``cui_zone``; hosts without one are
+    counted under ``unassigned`` so they never match a control. The result is computed once
+    per run and everything downstream is a dictionary lookup.
+    """
+    zones_by_control: dict[str, list[str]] = {}
+    controls_by_zone: dict[str, list[str]] = {}
+    for control in controls or []:
+        zones = sorted({str(zone) for zone in control.get("zones") or []})
+        zones_by_control[control["control_id"]] = zones
+        for zone in zones:
+            controls_by_zone.setdefault(zone, []).append(control["control_id"])
+
+    hosts_by_zone: dict[str, list[str]] = {}
+    normalized: dict[str, str] = {}
+    for host, zone in sorted((host_zones or {}).items()):
+        zone = str(zone) if zone not in (None, "") else UNASSIGNED_ZONE
+        normalized[host] = zone
+        hosts_by_zone.setdefault(zone, []).append(host)
+        controls_by_zone.setdefault(zone, [])
+
+    return {
+        "zones_by_control": zones_by_control,
+        "controls_by_zone": controls_by_zone,
+        "hosts_by_zone": hosts_by_zone,
+        "host_zones": normalized,
+        "host_control_counts": {host: len(controls_by_zone[zone]) for host, zone in normalized.items()},
+    }
+
+
+def _status(systems: list[dict[str, Any]], applicable_inventory: int) -> str:
+    if applicable_inventory == 0:
+        return "not_applicable"
+    if not systems:
+        return "not_assessed"
+    return "pass" if all(_truthy(system.get("host_passed")) for system in systems) else "fail"
+
+
+STATUS_REASONS = {
+    "pass": "All applicable systems passed verification checks",
+    "fail": "One or more applicable systems failed role verification checks",
+    "not_assessed": "No applicable systems were reachable for assessment",
+    "not_applicable": "No inventory systems are in the zones this control applies to",
+}
+
+
+def applicable_control_results(
+    controls: list[dict[str, Any]],
+    host_records: list[dict[str, Any]],
+    applicability: dict[str, Any],
+) -> list[dict[str, Any]]:
+    """Build control result records from only the assessed hosts in each control's zones.
+
+    Binary enclave logic is kept per control: a control passes only when every applicable
+    assessed host passed. Host records are grouped by zone once, so a public or management
+    host never lands in a restricted-only control.
+    """
+    host_zones = applicability.get("host_zones", {})
+    hosts_by_zone = applicability.get("hosts_by_zone", {})
+    records_by_zone: dict[str, list[dict[str, Any]]] = {}
+    for record in host_records or []:
+        zone = host_zones.get(record.get("hostname"), UNASSIGNED_ZONE)
+        records_by_zone.setdefault(zone, []).append(record)
+
+    results = []
+    for control in controls or []:
+        zones = applicability.get("zones_by_control", {}).get(control["control_id"], [])
+        systems = [record for zone in zones for record in records_by_zone.get(zone, [])]
+        applicable_inventory = sum(len(hosts_by_zone.get(zone, [])) for zone in zones)
+        status = _status(systems, applicable_inventory)
+        system_status = "pass" if status == "pass" else "fail"
+        results.append(
+            {
+                "control_id": control["control_id"],
+                "control_title": control.get("title", ""),
+                "family": control.get("family", ""),
+                "zones": zones,
+                "status": status,
+                "status_reason": STATUS_REASONS[status],
+                "applicable_systems": len(systems),
+                "passing_systems": len(systems) if status == "pass" else 0,
+                "systems": [{**record, "status": system_status} for record in systems],
+                "evidence_files": [],
+                "verification_commands": [],
+            }
+        )
+    return results
+
+
+def zone_control_results(control_results: list[dict[str, Any]], applicability: dict[str, Any]) -> dict[str, list]:
+    """Return per-zone control results, re-evaluated against only that zone's systems.
+
+    The lists have the same shape as the top-level ``controls`` so each can be fed to
+    ``sprs_score`` for a per-zone score.
+    """
+    host_zones = applicability.get("host_zones", {})
+    hosts_by_zone = applicability.get("hosts_by_zone", {})
+    by_zone: dict[str, list[dict[str, Any]]] = {}
+    for zone, control_ids in applicability.get("controls_by_zone", {}).items():
+        if not hosts_by_zone.get(zone):
+            continue
+        wanted = set(control_ids)
+        zone_results = []
+        for control in control_results or []:
+            if control["control_id"] not in wanted:
+                continue
+            systems = [
+                system for system in control.get("systems", []) if host_zones.get(system.get("hostname")) == zone
+            ]
+            status = _status(systems, len(hosts_by_zone[zone]))
+            zone_results.append(
+                {
+                    "control_id": control["control_id"],
+                    "family": control.get("family", ""),
+                    "status": status,
+                    "applicable_systems": len(systems),
+                }
+            )
+        by_zone[zone] = zone_results
+    return by_zone
+
+
+class FilterModule:
+    def filters(self) -> dict[str, Any]:
+        return {
+            "control_applicability": control_applicability,
+            "applicable_control_results": applicable_control_results,
+            "zone_control_results": zone_control_results,
+        }
@@ -0,0 +1,57 @@
+"""Backoff scheduling filters for re-assessing unreachable hosts."""
+from __future__ import annotations
+
+from typing import Any
+
+DEFAULT_BUDGET_SECONDS = 900
+DEFAULT_INITIAL_DELAY = 30
+DEFAULT_BACKOFF_FACTOR = 2.0
+DEFAULT_MAX_DELAY = 300
+DEFAULT_CONNECT_TIMEOUT = 20
+
+
+def retry_schedule(
+    budget_seconds: float = DEFAULT_BUDGET_SECONDS,
+    initial_delay: float = DEFAULT_INITIAL_DELAY,
+    backoff_factor: float = DEFAULT_BACKOFF_FACTOR,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    connect_timeout: float = DEFAULT_CONNECT_TIMEOUT,
+) -> list[dict[str, Any]]:
+    """Return exponentially spaced connection attempts that fit inside ``budget_seconds``.
+
+    Each attempt waits ``delay`` seconds and then tries to connect for up to ``timeout``
+    seconds; ``starts_after`` is the worst-case offset of the attempt from the start of
+    the retry pass. Attempts that could not finish inside the budget are dropped.
+    """
+    budget = float(budget_seconds or 0)
+    timeout = max(1, int(connect_timeout))
+    delay = max(0.0, float(initial_delay))
+    factor = max(1.0, float(backoff_factor))
+    ceiling = max(0.0, float(max_delay))
+
+    attempts: list[dict[str, Any]] = []
+    elapsed = 0.0
+    while True:
+        wait = min(delay, ceiling)
+        if elapsed + wait + timeout > budget:
+            break
+        attempts.append(
+            {
+                "attempt": len(attempts) + 1,
+                "delay": int(wait),
+                "timeout": timeout,
+                "starts_after": int(elapsed + wait),
+            }
+        )
+        elapsed += wait + timeout
+        delay *= factor
+    return attempts
+
+
+class FilterModule:
+    """Ansible filter plugin entrypoint."""
+
+    def filters(self) -> dict[str, Any]:
+        return {
+            "retry_schedule": retry_schedule,
+        }
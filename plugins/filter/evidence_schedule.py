@@ -0,0 +1,52 @@
+"""Launch scheduling filters for asynchronous SSP evidence collection."""
+from __future__ import annotations
+
+import math
+from typing import Any
+
+UNASSIGNED_ZONE = "unassigned"
+
+
+def evidence_waves(
+    host_zones: dict[str, Any] | None,
+    zone_caps: dict[str, Any] | None = None,
+) -> dict[str, Any]:
+    """Assign every host a launch wave so no capped zone runs more than its cap at once.
+
+    Hosts in zones without a cap all start in wave 0 and are only awaited at the end of
+    the sweep; hosts of a capped zone are split into consecutive waves of at most ``cap``
+    hosts, and each wave is awaited before the next one of that zone is launched.
+    """
+    caps = {str(zone): max(1, int(cap)) for zone, cap in (zone_caps or {}).items() if cap}
+    by_zone: dict[str, list[str]] = {}
+    for host, zone in (host_zones or {}).items():
+        by_zone.setdefault(str(zone or UNASSIGNED_ZONE), []).append(str(host))
+
+    host_wave: dict[str, int] = {}
+    waves = 1 if by_zone else 0
+    for zone, hosts in by_zone.items():
+        cap = caps.get(zone)
+        for index, host in enumerate(sorted(hosts)):
+            host_wave[host] = index // cap if cap else 0
+        if cap:
+            waves = max(waves, math.ceil(len(hosts) / cap))
+    return {
+        "waves": waves,
+        "host_wave": host_wave,
+        "capped_zones": sorted(zone for zone in caps if zone in by_zone),
+    }
+
+
+def poll_retries(deadline: Any, now: Any, delay: Any) -> int:
+    """Return how many ``async_status`` polls of ``delay`` seconds fit before ``deadline``."""
+    return max(1, int((float(deadline) - float(now)) // max(1, int(delay))))
+
+
+class FilterModule:
+    """Ansible filter plugin entrypoint."""
+
+    def filters(self) -> dict[str, Any]:
+        return {
+            "evidence_waves": evidence_waves,
+            "poll_retries": poll_retries,
+        }
@@ -0,0 +1,82 @@
+"""Compact, versioned role evidence payloads.
+
+Each role's `evidence.yml` used to serialize the whole registered `stat` and `command`
+loop results (module args, `stdout` and `stdout_lines`, timestamps, ...). Schema 2
+keeps only what an auditor needs to identify the evidence; full command output goes to
+the controller verify output store (`scripts/show_verify_output.py <output_sha256>`).
+
+  files     path, exists, mode, owner, mtime, checksum (sha256 when the stat task asks for it)
+  commands  id, rc, duration_seconds, output_sha256, output_bytes
+
+`upgrade_role_evidence` converts a legacy (schema 1) payload to schema 2.
+"""
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+from typing import Any
+
+PLUGIN_DIR = Path(__file__).resolve().parent
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+from verify_results import compact_verify_result  # noqa: E402
+
+SCHEMA_VERSION = 2
+COMMAND_FIELDS = ("id", "rc", "skipped", "duration_seconds", "output_sha256", "output_bytes")
+
+
+def compact_evidence_file(result: dict[str, Any]) -> dict[str, Any]:
+    """Reduce one registered ``stat`` loop result to the schema 2 file record."""
+    stat = result.get("stat") if isinstance(result.get("stat"), dict) else {}
+    item = result.get("item")
+    record: dict[str, Any] = {"path": stat.get("path") or (item if isinstance(item, str) else None)}
+    if result.get("skipped"):
+        record["skipped"] = True
+        return record
+    record["exists"] = bool(stat.get("exists"))
+    # The stat module reports the owner as pw_name.
+    for field, source in (("mode", "mode"), ("owner", "pw_name"), ("mtime", "mtime"), ("checksum", "checksum")):
+        if stat.get(source) is not None:
+            record[field] = stat[source]
+    return record
+
+
+def compact_evidence_files(results: list[dict[str, Any]] | None) -> list[dict[str, Any]]:
+    return [compact_evidence_file(result) for result in results or [] if isinstance(result, dict)]
+
+
+def compact_evidence_commands(
+    results: list[dict[str, Any]] | None,
+    store_dir: str | Path | None = None,
+) -> list[dict[str, Any]]:
+    """Reduce registered ``command`` loop results to schema 2 records, storing full output."""
+    records = []
+    for result in results or []:
+        if not isinstance(result, dict):
+            continue
+        compact = compact_verify_result(result, store_dir=store_dir, preview_chars=0)
+        records.append({field: compact[field] for field in COMMAND_FIELDS if field in compact})
+    return records
+
+
+def upgrade_role_evidence(payload: dict[str, Any], store_dir: str | Path | None = None) -> dict[str, Any]:
+    """Return ``payload`` in the current schema; schema 2 payloads are returned unchanged."""
+    if int(payload.get("schema_version") or 1) >= SCHEMA_VERSION:
+        return payload
+    upgraded = {key: value for key, value in payload.items() if key not in ("file_stats", "command_results")}
+    upgraded["schema_version"] = SCHEMA_VERSION
+    upgraded["files"] = compact_evidence_files(payload.get("file_stats"))
+    upgraded["commands"] = compact_evidence_commands(payload.get("command_results"), store_dir)
+    return upgraded
+
+
+class FilterModule:
+    """Ansible filter plugin entrypoint."""
+
+    def filters(self) -> dict[str, Any]:
+        return {
+            "compact_evidence_files": compact_evidence_files,
+            "compact_evidence_commands": compact_evidence_commands,
+            "upgrade_role_evidence": upgrade_role_evidence,
+        }
@@ -0,0 +1,158 @@
+"""Statistical host sampling filters for homogeneous node pools."""
+from __future__ import annotations
+
+import json
+import math
+import random
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_HISTORY_DIR = REPO_ROOT / "data" / "assessment_history"
+DEFAULT_CONFIDENCE = 0.95
+DEFAULT_TOLERABLE_DEFECT_RATE = 0.05
+UNKNOWN_FINGERPRINT = "unknown"
+
+
+def sample_size(
+    population: int,
+    confidence: float = DEFAULT_CONFIDENCE,
+    tolerable_defect_rate: float = DEFAULT_TOLERABLE_DEFECT_RATE,
+) -> int:
+    """Return the zero-failure acceptance sample size for a finite population.
+
+    Uses the hypergeometric distribution: the smallest ``n`` such that, if at least
+    ``ceil(tolerable_defect_rate * population)`` hosts were non-compliant, a random
+    sample of ``n`` would contain none of them with probability ``<= 1 - confidence``.
+    """
+    population = int(population)
+    if population <= 0:
+        return 0
+    confidence = float(confidence)
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be between 0 and 1")
+    defects = max(1, math.ceil(float(tolerable_defect_rate) * population))
+
+    miss_probability = 1.0
+    for drawn in range(population):
+        miss_probability *= (population - defects - drawn) / (population - drawn)
+        if miss_probability <= 1 - confidence:
+            return drawn + 1
+    return population
+
+
+def _is_unknown(fingerprint: str) -> bool:
+    # Fingerprints are "<zone>:<image or package hash>"; either half may be unknown.
+    return UNKNOWN_FINGERPRINT in fingerprint.split(":") or not fingerprint
+
+
+def _load_latest_assessment(history_dir: Path) -> dict[str, Any]:
+    if not history_dir.exists():
+        return {}
+    for candidate in sorted(history_dir.glob("*.json"), reverse=True):
+        try:
+            payload = json.loads(candidate.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            continue
+        if isinstance(payload, dict):
+            return payload
+    return {}
+
+
+def previous_failing_hosts(previous_assessment: dict[str, Any]) -> list[str]:
+    """Return hosts that failed any verification in a previous assessment payload.
+
+    Only ``host_passed`` counts: a failed control stamps ``status: fail`` on all of its
+    systems, including the hosts that passed.
+    """
+    failing: set[str] = set()
+    for control in previous_assessment.get("controls", []) or []:
+        for system in control.get("systems", []) or []:
+            if not isinstance(system, dict):
+                continue
+            if system.get("host_passed") is False:
+                failing.add(str(system.get("hostname", "")))
+    failing.discard("")
+    return sorted(failing)
+
+
+def changed_hosts(host_fingerprints: dict[str, str], previous_assessment: dict[str, Any]) -> list[str]:
+    """Return hosts whose fingerprint differs from (or is missing in) the previous run."""
+    previous = (previous_assessment.get("sampling") or {}).get("fingerprints") or {}
+    if not previous:
+        return []
+    return sorted(host for host, fingerprint in host_fingerprints.items() if previous.get(host) != fingerprint)
+
+
+def assessment_sample(
+    host_fingerprints: dict[str, str],
+    confidence: float = DEFAULT_CONFIDENCE,
+    tolerable_defect_rate: float = DEFAULT_TOLERABLE_DEFECT_RATE,
+    seed: str = "",
+    forced_hosts: list[str] | None = None,
+    previous_assessment: dict[str, Any] | None = None,
+    history_dir: str | Path | None = None,
+) -> dict[str, Any]:
+    """Group hosts by fingerprint and choose a statistically justified sample per group.
+
+    Hosts that failed last run, changed fingerprint since last run, have an unknown
+    fingerprint, or are listed in ``forced_hosts`` are always assessed and do not count
+    toward the random sample. The previous run is read from ``history_dir`` (default
+    ``data/assessment_history``) unless ``previous_assessment`` is given.
+    """
+    if previous_assessment is None:
+        previous_assessment = _load_latest_assessment(Path(history_dir or DEFAULT_HISTORY_DIR))
+
+    fingerprints = {str(host): str(fp or UNKNOWN_FINGERPRINT) for host, fp in (host_fingerprints or {}).items()}
+    mandatory = set(forced_hosts or [])
+    mandatory.update(previous_failing_hosts(previous_assessment))
+    mandatory.update(changed_hosts(fingerprints, previous_assessment))
+    mandatory.update(host for host, fp in fingerprints.items() if _is_unknown(fp))
+    mandatory &= set(fingerprints)
+
+    members: dict[str, list[str]] = {}
+    for host, fingerprint in fingerprints.items():
+        members.setdefault(fingerprint, []).append(host)
+
+    groups: list[dict[str, Any]] = []
+    selected: set[str] = set()
+    for fingerprint, hosts in sorted(members.items()):
+        hosts = sorted(hosts)
+        required = [host for host in hosts if host in mandatory]
+        candidates = [host for host in hosts if host not in mandatory]
+        size = min(len(candidates), sample_size(len(hosts), confidence, tolerable_defect_rate))
+        rng = random.Random(f"{seed}:{fingerprint}")
+        sampled = sorted(rng.sample(candidates, size)) if size < len(candidates) else candidates
+        chosen = sorted(set(required) | set(sampled))
+        selected.update(chosen)
+        groups.append(
+            {
+                "fingerprint": fingerprint,
+                "population": len(hosts),
+                "sample_size": size,
+                "mandatory_hosts": required,
+                "assessed_hosts": chosen,
+                "inferred_hosts": len(hosts) - len(chosen),
+            }
+        )
+
+    return {
+        "confidence": float(confidence),
+        "tolerable_defect_rate": float(tolerable_defect_rate),
+        "method": "hypergeometric_zero_acceptance",
+        "seed": seed,
+        "selected_hosts": sorted(selected),
+        "inferred_hosts": sorted(set(fingerprints) - selected),
+        "groups": groups,
+        "fingerprints": dict(sorted(fingerprints.items())),
+    }
+
+
+class FilterModule:
+    """Ansible filter plugin entrypoint."""
+
+    def filters(self) -> dict[str, Any]:
+        return {
+            "assessment_sample": assessment_sample,
+            "sample_size": sample_size,
+        }
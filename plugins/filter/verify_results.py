@@ -0,0 +1,135 @@
+"""Compact encoding for registered verify command results."""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+DEFAULT_STORE_DIR = REPO_ROOT / "data" / "verify_outputs"
+DEFAULT_PREVIEW_CHARS = 160
+
+
+def _store_root(store_dir: str | Path | None) -> Path:
+    root = Path(store_dir or os.environ.get("VERIFY_OUTPUT_STORE") or DEFAULT_STORE_DIR)
+    return root if root.is_absolute() else REPO_ROOT / root
+
+
+def object_path(output_sha256: str, store_dir: str | Path | None = None) -> Path:
+    """Return the side-store path for a full output document."""
+    return _store_root(store_dir) / "objects" / output_sha256[:2] / f"{output_sha256}.json"
+
+
+def _delta_seconds(delta: Any) -> float | None:
+    # The command module reports durations as "H:MM:SS.ffffff".
+    if not delta:
+        return None
+    try:
+        hours, minutes, seconds = str(delta).split(":")
+        return round(int(hours) * 3600 + int(minutes) * 60 + float(seconds), 3)
+    except ValueError:
+        return None
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    return value if isinstance(value, str) else str(value)
+
+
+def store_output(document: dict[str, Any], store_dir: str | Path | None = None) -> str:
+    """Write ``document`` to the content-addressed store and return its sha256."""
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    digest = hashlib.sha256(encoded).hexdigest()
+    target = object_path(digest, store_dir)
+    if target.exists():
+        return digest
+
+    target.parent.mkdir(parents=True, exist_ok=True)
+    # WHY: Forked workers may write the same object concurrently; rename keeps it atomic.
+    handle, temp_name = tempfile.mkstemp(dir=target.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(handle, "wb") as stream:
+            stream.write(encoded)
+        os.replace(temp_name, target)
+    except OSError:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
+    return digest
+
+
+def load_output(output_sha256: str, store_dir: str | Path | None = None) -> dict[str, Any]:
+    """Return the full output document previously stored under ``output_sha256``."""
+    return json.loads(object_path(output_sha256, store_dir).read_text(encoding="utf-8"))
+
+
+def compact_verify_result(
+    result: dict[str, Any],
+    store_dir: str | Path | None = None,
+    preview_chars: int = DEFAULT_PREVIEW_CHARS,
+) -> dict[str, Any]:
+    """Reduce one registered command loop result to rc, duration, output hash and preview."""
+    item = result.get("item") if isinstance(result.get("item"), dict) else {}
+    compact: dict[str, Any] = {"id": item.get("id", _text(result.get("item")))}
+    if result.get("skipped"):
+        compact.update({"rc": None, "skipped": True})
+        return compact
+
+    stdout = _text(result.get("stdout"))
+    stderr = _text(result.get("stderr"))
+    cmd = result.get("cmd", item.get("command", ""))
+    document = {
+        "cmd": cmd if isinstance(cmd, (str, list)) else _text(cmd),
+        "rc": result.get("rc"),
+        "stdout": stdout,
+        "stderr": stderr,
+    }
+    preview_source = stdout or stderr or _text(result.get("msg"))
+    limit = max(0, int(preview_chars))
+    compact.update(
+        {
+            "rc": result.get("rc"),
+            "duration_seconds": _delta_seconds(result.get("delta")),
+            "output_sha256": store_output(document, store_dir),
+            "output_bytes": len(stdout.encode("utf-8")) + len(stderr.encode("utf-8")),
+            "preview": preview_source[:limit],
+            "truncated": len(preview_source) > limit,
+        }
+    )
+    return compact
+
+
+def compact_verify_results(
+    results: list[dict[str, Any]] | None,
+    store_dir: str | Path | None = None,
+    preview_chars: int = DEFAULT_PREVIEW_CHARS,
+) -> list[dict[str, Any]]:
+    """Compact every result of a registered verify command loop."""
+    return [
+        compact_verify_result(result, store_dir=store_dir, preview_chars=preview_chars)
+        for result in results or []
+        if isinstance(result, dict)
+    ]
+
+
+def verify_output_refs(checks: list[dict[str, Any]] | None) -> list[dict[str, Any]]:
+    """Drop previews from compact checks, keeping only what identifies each stored output."""
+    return [
+        {key: check[key] for key in ("id", "rc", "output_sha256") if key in check}
+        for check in checks or []
+        if isinstance(check, dict)
+    ]
+
+
+class FilterModule:
+    """Ansible filter plugin entrypoint."""
+
+    def filters(self) -> dict[str, Any]:
+        return {
+            "compact_verify_results": compact_verify_results,
+            "verify_output_refs": verify_output_refs,
+        }
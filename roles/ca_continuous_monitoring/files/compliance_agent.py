@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+"""Continuous compliance agent: re-verify a role as soon as its files or services change.
+
+The ca_continuous_monitoring role renders a watch manifest listing, per compliance role,
+the evidence files, managed systemd units and read-only verify commands. This daemon
+watches those files with inotify and the units through systemd's D-Bus
+PropertiesChanged signals. After a short debounce it re-runs only the affected role's
+verify commands and pushes a compact event to the controller collector
+(scripts/compliance_collector.py). Events that cannot be delivered are spooled and
+resent.
+"""
+
+from __future__ import annotations
+
+import argparse
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import logging
+import os
+import shlex
+import socket
+import ssl
+import struct
+import subprocess
+import time
+import urllib.error
+import urllib.request
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+DEFAULT_MANIFEST = "/etc/cui-compliance-agent/watch.json"
+EVENT_SCHEMA_VERSION = 1
+PREVIEW_CHARS = 160
+
+SYSTEMD_BUS_NAME = "org.freedesktop.systemd1"
+SYSTEMD_PATH = "/org/freedesktop/systemd1"
+SYSTEMD_UNIT_PREFIX = "/org/freedesktop/systemd1/unit/"
+SYSTEMD_UNIT_INTERFACE = "org.freedesktop.systemd1.Unit"
+WATCHED_UNIT_PROPERTIES = {"ActiveState", "SubState", "UnitFileState"}
+
+# inotify(7) flags for watching the parent directory of each file, so in-place edits,
+# atomic replace-by-rename, permission changes and deletions are all seen.
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Push compliance drift events to the controller")
+    parser.add_argument("--manifest", default=DEFAULT_MANIFEST, help="Watch manifest rendered by Ansible")
+    parser.add_argument("--once", action="store_true", help="Verify every role once, push, and exit")
+    return parser.parse_args()
+
+
+def load_manifest(path: str | Path) -> dict[str, Any]:
+    manifest = json.loads(Path(path).read_text(encoding="utf-8"))
+    manifest.setdefault("roles", {})
+    return manifest
+
+
+def _unit_name(name: str) -> str:
+    return name if "." in name else f"{name}.service"
+
+
+def build_index(manifest: dict[str, Any]) -> tuple[dict[str, set[str]], dict[str, set[str]]]:
+    """Map watched file paths and unit names to the roles that own them."""
+    file_roles: dict[str, set[str]] = {}
+    unit_roles: dict[str, set[str]] = {}
+    for role, spec in manifest.get("roles", {}).items():
+        for path in spec.get("files", []):
+            file_roles.setdefault(os.path.normpath(path), set()).add(role)
+        for unit in spec.get("units", []):
+            unit_roles.setdefault(_unit_name(unit), set()).add(role)
+    return file_roles, unit_roles
+
+
+def unit_from_object_path(path: str) -> str | None:
+    """Decode a systemd unit object path (``auditd_2eservice``) back into its unit name."""
+    if not path.startswith(SYSTEMD_UNIT_PREFIX):
+        return None
+    encoded = path[len(SYSTEMD_UNIT_PREFIX):]
+    decoded = bytearray()
+    index = 0
+    while index < len(encoded):
+        escape = encoded[index + 1:index + 3]
+        if encoded[index] == "_" and len(escape) == 2:
+            try:
+                decoded.append(int(escape, 16))
+                index += 3
+                continue
+            except ValueError:
+                pass
+        decoded.extend(encoded[index].encode("utf-8"))
+        index += 1
+    return decoded.decode("utf-8", errors="replace")
+
+
+def _output_digest(command: str, rc: int | None, stdout: str, stderr: str) -> tuple[str, dict[str, Any]]:
+    # Same document and encoding as plugins/filter/verify_results.py, so the hash resolves
+    # in the controller verify output store.
+    document = {"cmd": command, "rc": rc, "stdout": stdout, "stderr": stderr}
+    encoded = json.dumps(document, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest(), document
+
+
+def run_check(check: dict[str, Any], timeout: float) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Run one verify command like ansible.builtin.command does and return ``(compact, document)``."""
+    command = str(check.get("command", ""))
+    started = time.monotonic()
+    try:
+        proc = subprocess.run(
+            shlex.split(command),
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+            check=False,
+        )
+        rc, stdout, stderr = proc.returncode, proc.stdout.rstrip("\n"), proc.stderr.rstrip("\n")
+    except subprocess.TimeoutExpired:
+        rc, stdout, stderr = None, "", f"timed out after {timeout}s"
+    except OSError as exc:
+        rc, stdout, stderr = 2, "", str(exc)
+    digest, document = _output_digest(command, rc, stdout, stderr)
+    preview = stdout or stderr
+    compact = {
+        "id": check.get("id", command),
+        "rc": rc,
+        "duration_seconds": round(time.monotonic() - started, 3),
+        "output_sha256": digest,
+        "output_bytes": len(stdout.encode("utf-8")) + len(stderr.encode("utf-8")),
+        "preview": preview[:PREVIEW_CHARS],
+        "truncated": len(preview) > PREVIEW_CHARS,
+    }
+    return compact, document
+
+
+def build_event(
+    manifest: dict[str, Any],
+    role: str,
+    triggers: list[dict[str, Any]],
+    checks: list[dict[str, Any]],
+    documents: dict[str, dict[str, Any]],
+    max_output_bytes: int = 65536,
+) -> dict[str, Any]:
+    """Assemble the compact event pushed to the collector for one role."""
+    # Full output travels only for failing checks, where operators need it.
+    failing_outputs = {
+        check["output_sha256"]: documents[check["output_sha256"]]
+        for check in checks
+        if check.get("rc") != 0
+        and check.get("output_sha256") in documents
+        and check.get("output_bytes", 0) <= max_output_bytes
+    }
+    return {
+        "schema_version": EVENT_SCHEMA_VERSION,
+        "host": manifest.get("host") or socket.getfqdn(),
+        "zone": manifest.get("zone"),
+        "role": role,
+        "detected_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "triggers": triggers[:20],
+        "compliant": bool(checks) and all(check.get("rc") == 0 for check in checks),
+        "checks": checks,
+        "outputs": failing_outputs,
+    }
+
+
+def verify_role(manifest: dict[str, Any], role: str, triggers: list[dict[str, Any]]) -> dict[str, Any]:
+    spec = manifest["roles"][role]
+    timeout = float(manifest.get("command_timeout", 30))
+    checks: list[dict[str, Any]] = []
+    documents: dict[str, dict[str, Any]] = {}
+    for check in spec.get("checks", []):
+        compact, document = run_check(check, timeout)
+        checks.append(compact)
+        documents[compact["output_sha256"]] = document
+    return build_event(manifest, role, triggers, checks, documents, int(manifest.get("max_output_bytes", 65536)))
+
+
+class EventSender:
+    """Deliver events to the collector, spooling anything that cannot be sent."""
+
+    def __init__(self, manifest: dict[str, Any]) -> None:
+        self.url = manifest.get("collector_url") or ""
+        self.spool = Path(manifest.get("spool_file") or "/var/spool/cui-compliance-agent/events.jsonl")
+        self.timeout = float(manifest.get("push_timeout", 10))
+        token_file = manifest.get("token_file")
+        self.token = Path(token_file).read_text(encoding="utf-8").strip() if token_file and Path(token_file).exists() else ""
+        self.context = ssl.create_default_context(cafile=manifest.get("ca_file") or None) if self.url.startswith("https") else None
+
+    def _post(self, events: list[dict[str, Any]]) -> None:
+        request = urllib.request.Request(
+            self.url,
+            data=json.dumps({"events": events}).encode("utf-8"),
+            headers={"Content-Type": "application/json", **({"Authorization": f"Bearer {self.token}"} if self.token else {})},
+            method="POST",
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout, context=self.context) as response:
+            if response.status >= 300:
+                raise urllib.error.HTTPError(self.url, response.status, "collector rejected events", response.headers, None)
+
+    def _spooled(self) -> list[dict[str, Any]]:
+        if not self.spool.exists():
+            return []
+        events = []
+        for line in self.spool.read_text(encoding="utf-8").splitlines():
+            try:
+                events.append(json.loads(line))
+            except ValueError:
+                continue
+        return events
+
+    def send(self, events: list[dict[str, Any]]) -> bool:
+        if not self.url:
+            for event in events:
+                logging.info("Drift event (no collector configured): %s", json.dumps(event, sort_keys=True))
+            return True
+        pending = self._spooled() + events
+        if not pending:
+            return True
+        try:
+            self._post(pending)
+        except (OSError, urllib.error.URLError) as exc:
+            logging.warning("Collector unreachable (%s); spooling %d event(s)", exc, len(events))
+            self.spool.parent.mkdir(parents=True, exist_ok=True)
+            with self.spool.open("a", encoding="utf-8") as stream:
+                for event in events:
+                    stream.write(json.dumps(event, sort_keys=True) + "\n")
+            return False
+        self.spool.unlink(missing_ok=True)
+        return True
+
+
+class Inotify:
+    """Minimal ctypes binding for inotify(7) directory watches."""
+
+    def __init__(self) -> None:
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self._libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directories: dict[int, str] = {}
+
+    def watch(self, directory: str) -> bool:
+        wd = self._libc.inotify_add_watch(self.fd, directory.encode("utf-8"), WATCH_MASK)
+        if wd < 0:
+            return False
+        self.directories[wd] = directory
+        return True
+
+    def read(self) -> list[str]:
+        """Return changed paths; an empty string marks a queue overflow."""
+        try:
+            data = os.read(self.fd, 65536)
+        except BlockingIOError:
+            return []
+        paths = []
+        offset = 0
+        while offset + _EVENT_HEADER.size <= len(data):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + _EVENT_HEADER.size:offset + _EVENT_HEADER.size + length].rstrip(b"\0").decode("utf-8", "replace")
+            offset += _EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                paths.append("")
+            elif wd in self.directories and name:
+                paths.append(os.path.join(self.directories[wd], name))
+        return paths
+
+
+class Agent:
+    """Debounce change signals per role and push one event per affected role."""
+
+    def __init__(self, manifest: dict[str, Any], sender: EventSender) -> None:
+        self.manifest = manifest
+        self.sender = sender
+        self.file_roles, self.unit_roles = build_index(manifest)
+        self.debounce = float(manifest.get("debounce_seconds", 2))
+        self.pending: dict[str, list[dict[str, Any]]] = {}
+        self._flush_scheduled = False
+
+    def queue(self, roles: set[str], trigger: dict[str, Any]) -> None:
+        for role in roles:
+            self.pending.setdefault(role, []).append(trigger)
+
+    def on_path(self, path: str) -> None:
+        if not path:
+            # The kernel dropped events; re-verify everything that watches files.
+            self.queue({role for roles in self.file_roles.values() for role in roles}, {"type": "overflow"})
+            return
+        roles = self.file_roles.get(os.path.normpath(path))
+        if roles:
+            self.queue(roles, {"type": "file", "path": path})
+
+    def on_unit(self, unit: str, properties: dict[str, Any]) -> None:
+        roles = self.unit_roles.get(unit)
+        if roles:
+            self.queue(roles, {"type": "service", "unit": unit, **{key: str(value) for key, value in properties.items()}})
+
+    def on_unit_files_changed(self) -> None:
+        self.queue({role for roles in self.unit_roles.values() for role in roles}, {"type": "unit_files"})
+
+    def flush(self) -> None:
+        pending, self.pending = self.pending, {}
+        events = [verify_role(self.manifest, role, triggers) for role, triggers in sorted(pending.items())]
+        for event in events:
+            logging.info("Role %s re-verified after %s: compliant=%s", event["role"], event["triggers"][0]["type"], event["compliant"])
+        if events:
+            self.sender.send(events)
+
+    def verify_all(self, reason: str) -> None:
+        self.queue(set(self.manifest["roles"]), {"type": reason})
+        self.flush()
+
+
+def _plain(value: Any) -> Any:
+    # dbus-python wraps values in dbus.* types; reduce them to JSON-friendly Python values.
+    if isinstance(value, (list, tuple)):
+        return [_plain(item) for item in value]
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, bool):
+        return bool(value)
+    if isinstance(value, int):
+        return int(value)
+    return str(value)
+
+
+def run(manifest: dict[str, Any]) -> int:
+    # WHY: Imported here so the pure helpers above stay importable without the system bindings.
+    import dbus  # type: ignore[import-not-found]
+    from dbus.mainloop.glib import DBusGMainLoop  # type: ignore[import-not-found]
+    from gi.repository import GLib  # type: ignore[import-not-found]
+
+    agent = Agent(manifest, EventSender(manifest))
+    inotify = Inotify()
+    for directory in sorted({os.path.dirname(path) for path in agent.file_roles}):
+        if not inotify.watch(directory):
+            logging.warning("Cannot watch %s; its files are only checked on service changes", directory)
+
+    def schedule_flush() -> None:
+        if agent.pending and not agent._flush_scheduled:
+            agent._flush_scheduled = True
+
+            def _flush() -> bool:
+                agent._flush_scheduled = False
+                agent.flush()
+                return False
+
+            GLib.timeout_add(int(agent.debounce * 1000), _flush)
+
+    def on_inotify(_fd: int, _condition: int) -> bool:
+        for path in inotify.read():
+            agent.on_path(path)
+        schedule_flush()
+        return True
+
+    def on_properties_changed(interface: str, changed: Any, invalidated: Any, path: str = "") -> None:
+        if interface != SYSTEMD_UNIT_INTERFACE:
+            return
+        names = set(_plain(changed)) | set(_plain(invalidated))
+        if not names & WATCHED_UNIT_PROPERTIES:
+            return
+        unit = unit_from_object_path(str(path))
+        if unit:
+            agent.on_unit(unit, {key: value for key, value in _plain(changed).items() if key in WATCHED_UNIT_PROPERTIES})
+            schedule_flush()
+
+    def on_unit_files_changed() -> None:
+        agent.on_unit_files_changed()
+        schedule_flush()
+
+    def retry_spool() -> bool:
+        agent.sender.send([])
+        return True
+
+    DBusGMainLoop(set_as_default=True)
+    bus = dbus.SystemBus()
+    # WHY: systemd only broadcasts unit change signals while at least one client is subscribed.
+    dbus.Interface(bus.get_object(SYSTEMD_BUS_NAME, SYSTEMD_PATH), f"{SYSTEMD_BUS_NAME}.Manager").Subscribe()
+    bus.add_signal_receiver(
+        on_properties_changed,
+        signal_name="PropertiesChanged",
+        dbus_interface="org.freedesktop.DBus.Properties",
+        bus_name=SYSTEMD_BUS_NAME,
+        path_keyword="path",
+    )
+    bus.add_signal_receiver(
+        on_unit_files_changed,
+        signal_name="UnitFilesChanged",
+        dbus_interface=f"{SYSTEMD_BUS_NAME}.Manager",
+        bus_name=SYSTEMD_BUS_NAME,
+    )
+    GLib.io_add_watch(inotify.fd, GLib.IO_IN, on_inotify)
+    GLib.timeout_add_seconds(int(manifest.get("spool_retry_seconds", 60)), retry_spool)
+
+    agent.verify_all("startup")
+    logging.info(
+        "Watching %d file(s) and %d unit(s) for %d role(s)",
+        len(agent.file_roles),
+        len(agent.unit_roles),
+        len(manifest["roles"]),
+    )
+    GLib.MainLoop().run()
+    return 0
+
+
+def main() -> int:
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    manifest = load_manifest(args.manifest)
+    if args.once:
+        agent = Agent(manifest, EventSender(manifest))
+        agent.verify_all("manual")
+        return 0
+    return run(manifest)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
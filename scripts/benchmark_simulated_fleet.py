@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""Benchmark playbooks against a simulated fleet and write a timing report.
+
+Each run generates a simulated inventory, runs the playbooks with the
+`simulated` connection plugin, and collects wall time plus the per-play, per-role and
+per-host breakdown from the `assessment_profile` callback. Assessment history, verify
+outputs, fact snapshots and profiles are written under the run directory, never into data/.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPT_DIR = REPO_ROOT / "scripts"
+if str(SCRIPT_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPT_DIR))
+
+import generate_simulated_fleet  # noqa: E402
+
+DEFAULT_OUTPUT_ROOT = REPO_ROOT / "data" / "benchmarks"
+DEFAULT_PLAYBOOKS = [REPO_ROOT / "playbooks" / "assess_flat.yml"]
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark playbooks against a simulated fleet")
+    parser.add_argument("--hosts", type=int, default=2000, help="Number of simulated hosts")
+    parser.add_argument(
+        "--playbook",
+        dest="playbooks",
+        type=Path,
+        action="append",
+        default=None,
+        help="Playbook to time (repeatable; default: playbooks/assess_flat.yml)",
+    )
+    parser.add_argument("--forks", type=int, default=50, help="Ansible forks")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Base per-execution latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Maximum extra per-execution latency")
+    parser.add_argument("--drift-rate", type=float, default=0.02, help="Fraction of hosts on the drifted profile")
+    parser.add_argument("--unreachable-rate", type=float, default=0.005, help="Fraction of unreachable hosts")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Per-command random failure rate")
+    parser.add_argument("--model", type=Path, default=None, help="Fleet model YAML for the connection plugin")
+    parser.add_argument("--seed", default="rcd-cui", help="Seed for host assignment and failure injection")
+    parser.add_argument(
+        "-e",
+        "--extra-vars",
+        action="append",
+        default=[],
+        help="Extra variables passed to every ansible-playbook run",
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=DEFAULT_OUTPUT_ROOT,
+        help="Directory for run artifacts and the benchmark report",
+    )
+    return parser.parse_args()
+
+
+def _latest_profile(profile_dir: Path, playbook: Path) -> dict[str, Any]:
+    candidates = sorted(profile_dir.glob(f"{playbook.stem}-*.json"))
+    if not candidates:
+        return {}
+    profile = json.loads(candidates[-1].read_text(encoding="utf-8"))
+    profile["profile_file"] = str(candidates[-1])
+    return profile
+
+
+def run_playbook(
+    playbook: Path,
+    inventory: Path,
+    run_dir: Path,
+    forks: int,
+    extra_vars: list[str],
+) -> dict[str, Any]:
+    """Run one playbook against the simulated inventory and return its timing record."""
+    profile_dir = run_dir / "profiles"
+    log_file = run_dir / f"{playbook.stem}.log"
+    env = dict(
+        os.environ,
+        ANSIBLE_CALLBACKS_ENABLED="assessment_profile",
+        ASSESSMENT_PROFILE_DIR=str(profile_dir),
+        VERIFY_OUTPUT_STORE=str(run_dir / "verify_outputs"),
+        FACT_SNAPSHOT_STORE=str(run_dir / "fact_snapshots"),
+        EXPECTED_STATE_CATALOG=str(run_dir / "expected_state"),
+        EVIDENCE_STORE=str(run_dir / "evidence_store"),
+    )
+    command = [
+        "ansible-playbook",
+        str(playbook),
+        "-i",
+        str(inventory),
+        "-f",
+        str(forks),
+        "-e",
+        f"assessment_history_dir={run_dir / 'assessment_history'}",
+    ]
+    for extra in extra_vars:
+        command.extend(["-e", extra])
+
+    started = time.monotonic()
+    with log_file.open("w", encoding="utf-8") as log:
+        result = subprocess.run(command, cwd=REPO_ROOT, env=env, stdout=log, stderr=subprocess.STDOUT, check=False)
+    wall_seconds = round(time.monotonic() - started, 3)
+
+    profile = _latest_profile(profile_dir, playbook)
+    host_count = profile.get("hosts_profiled")
+    return {
+        "playbook": str(playbook.relative_to(REPO_ROOT) if playbook.is_relative_to(REPO_ROOT) else playbook),
+        "returncode": result.returncode,
+        "wall_seconds": wall_seconds,
+        "hosts_per_minute": round(60 * host_count / wall_seconds, 1) if host_count and wall_seconds else None,
+        "plays": profile.get("plays", []),
+        "slowest_roles": sorted(
+            (
+                {"role": role, **stats}
+                for role, stats in (profile.get("roles") or {}).items()
+            ),
+            key=lambda entry: entry.get("total_seconds", 0),
+            reverse=True,
+        )[:5],
+        "slowest_hosts": (profile.get("slowest_hosts") or [])[:5],
+        "profile_file": profile.get("profile_file"),
+        "log_file": str(log_file),
+    }
+
+
+def _print_report(report: dict[str, Any]) -> None:
+    print(f"Simulated fleet: {report['fleet']['hosts']} hosts, {report['forks']} forks")
+    for run in report["runs"]:
+        status = "ok" if run["returncode"] == 0 else f"rc={run['returncode']}"
+        print(f"  {run['playbook']}: {run['wall_seconds']}s ({status}, {run['hosts_per_minute']} hosts/min)")
+        for play in run["plays"]:
+            print(f"    {play['seconds']:>9.3f}s  {play['play']}")
+
+
+def main() -> int:
+    args = parse_args()
+    stamp = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H-%M-%SZ")
+    run_dir = args.output_dir / f"run-{args.hosts}-{stamp}"
+    run_dir.mkdir(parents=True, exist_ok=True)
+
+    inventory = generate_simulated_fleet.write_inventory(
+        generate_simulated_fleet.build_inventory(
+            args.hosts,
+            latency_ms=args.latency_ms,
+            jitter_ms=args.jitter_ms,
+            drift_rate=args.drift_rate,
+            unreachable_rate=args.unreachable_rate,
+            failure_rate=args.failure_rate,
+            model=args.model,
+            seed=args.seed,
+        ),
+        run_dir / "inventory",
+    )
+
+    playbooks = [path if path.is_absolute() else REPO_ROOT / path for path in args.playbooks or DEFAULT_PLAYBOOKS]
+    report = {
+        "generated_at": stamp,
+        "fleet": {
+            "hosts": args.hosts,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "drift_rate": args.drift_rate,
+            "unreachable_rate": args.unreachable_rate,
+            "failure_rate": args.failure_rate,
+            "seed": args.seed,
+            "inventory": str(inventory),
+        },
+        "forks": args.forks,
+        "runs": [run_playbook(playbook, inventory, run_dir, args.forks, args.extra_vars) for playbook in playbooks],
+    }
+
+    report_file = run_dir / "report.json"
+    report_file.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    _print_report(report)
+    print(f"Benchmark report: {report_file}")
+    return 0 if all(run["returncode"] == 0 for run in report["runs"]) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
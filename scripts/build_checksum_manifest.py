@@ -0,0 +1,234 @@
+#!/usr/bin/env python3
+"""Build or verify the checksum manifest of an evidence directory.
+
+Files are hashed in a thread pool with large buffered reads (hashlib releases the GIL
+while hashing). Digests are reused from the previous JSON manifest for files whose size,
+mtime and inode are unchanged, so re-running after a partial change only hashes what
+changed. Hardlinked paths (the `by_family/` view) are hashed once per inode. Two
+manifests are written next to each other:
+
+  checksums.sha256  `sha256sum`-compatible, paths relative to the directory
+                    (`cd <dir> && sha256sum -c checksums.sha256`)
+  checksums.json    the same digests plus size/mtime/inode for the next incremental run
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+from stat import S_ISREG
+from typing import Any, Iterable
+
+TEXT_MANIFEST = "checksums.sha256"
+JSON_MANIFEST = "checksums.json"
+MANIFEST_VERSION = 1
+READ_SIZE = 1024 * 1024
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) * 4)
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build or verify an evidence checksum manifest")
+    parser.add_argument("root", type=Path, help="Directory to checksum")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS, help="Hashing threads")
+    parser.add_argument(
+        "--previous",
+        type=Path,
+        default=None,
+        help=f"JSON manifest to reuse unchanged digests from (default: <root>/{JSON_MANIFEST})",
+    )
+    parser.add_argument("--full", action="store_true", help="Hash every file, ignoring the previous manifest")
+    parser.add_argument("--verify", action="store_true", help=f"Verify <root>/{TEXT_MANIFEST} instead of building")
+    return parser.parse_args()
+
+
+def sha256_file(path: Path) -> str:
+    digest = hashlib.sha256()
+    with path.open("rb", buffering=0) as handle:
+        for block in iter(lambda: handle.read(READ_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _iter_files(root: Path) -> Iterable[tuple[str, os.stat_result]]:
+    skip = {TEXT_MANIFEST, JSON_MANIFEST}
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = Path(dirpath) / name
+            relative = path.relative_to(root).as_posix()
+            if relative in skip or name.startswith(".tmp-"):
+                continue
+            info = path.lstat()
+            if S_ISREG(info.st_mode):
+                yield relative, info
+
+
+def load_json_manifest(path: Path) -> dict[str, dict[str, Any]]:
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != MANIFEST_VERSION:
+        return {}
+    return data.get("files") or {}
+
+
+def build_manifest(
+    root: Path,
+    previous: dict[str, dict[str, Any]] | None = None,
+    jobs: int = DEFAULT_JOBS,
+) -> tuple[dict[str, dict[str, Any]], dict[str, int]]:
+    """Return ``(files, stats)`` for every regular file under ``root``."""
+    previous = previous or {}
+    files: dict[str, dict[str, Any]] = {}
+    pending: list[str] = []
+    first_path: dict[tuple[int, int], str] = {}
+    linked: list[tuple[str, str]] = []
+    stats = {"files": 0, "hashed": 0, "reused": 0, "linked": 0, "bytes_hashed": 0}
+    for relative, stat in _iter_files(root):
+        entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "inode": stat.st_ino}
+        files[relative] = entry
+        inode = (stat.st_dev, stat.st_ino)
+        if stat.st_nlink > 1 and inode in first_path:
+            linked.append((relative, first_path[inode]))
+            continue
+        first_path[inode] = relative
+        old = previous.get(relative)
+        if old and all(old.get(key) == value for key, value in entry.items()) and old.get("sha256"):
+            entry["sha256"] = old["sha256"]
+            stats["reused"] += 1
+        else:
+            pending.append(relative)
+            stats["bytes_hashed"] += stat.st_size
+
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for relative, digest in zip(pending, pool.map(lambda rel: sha256_file(root / rel), pending)):
+            files[relative]["sha256"] = digest
+    for relative, source in linked:
+        files[relative]["sha256"] = files[source]["sha256"]
+    stats["hashed"] = len(pending)
+    stats["linked"] = len(linked)
+    stats["files"] = len(files)
+    return files, stats
+
+
+def _escape(relative: str) -> tuple[str, str]:
+    # GNU sha256sum prefixes the line with a backslash when the name needs escaping.
+    if "\\" in relative or "\n" in relative:
+        return "\\", relative.replace("\\", "\\\\").replace("\n", "\\n")
+    return "", relative
+
+
+def _unescape(name: str) -> str:
+    out, index = [], 0
+    while index < len(name):
+        char = name[index]
+        if char == "\\" and index + 1 < len(name):
+            out.append("\n" if name[index + 1] == "n" else name[index + 1])
+            index += 2
+        else:
+            out.append(char)
+            index += 1
+    return "".join(out)
+
+
+def format_text_manifest(files: dict[str, dict[str, Any]]) -> str:
+    lines = []
+    for relative in sorted(files):
+        prefix, name = _escape(relative)
+        lines.append(f"{prefix}{files[relative]['sha256']}  {name}")
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def parse_text_manifest(text: str) -> dict[str, str]:
+    """Return ``{relative_path: sha256}`` from ``sha256sum`` output."""
+    entries: dict[str, str] = {}
+    for line in text.splitlines():
+        escaped = line.startswith("\\")
+        if escaped:
+            line = line[1:]
+        digest, sep, name = line.partition("  ")
+        if not sep:
+            digest, sep, name = line.partition(" *")
+        if not sep or len(digest) != 64:
+            continue
+        name = _unescape(name) if escaped else name
+        entries[name[2:] if name.startswith("./") else name] = digest
+    return entries
+
+
+def _atomic_write(path: Path, text: str) -> None:
+    tmp = path.with_name(f".tmp-{path.name}")
+    tmp.write_text(text, encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def write_manifests(root: Path, files: dict[str, dict[str, Any]]) -> None:
+    _atomic_write(root / TEXT_MANIFEST, format_text_manifest(files))
+    document = {
+        "version": MANIFEST_VERSION,
+        "algorithm": "sha256",
+        "generated_at": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "files": dict(sorted(files.items())),
+    }
+    _atomic_write(root / JSON_MANIFEST, json.dumps(document, indent=2))
+
+
+def verify_manifest(root: Path, expected: dict[str, str], jobs: int = DEFAULT_JOBS) -> dict[str, list[str]]:
+    """Check ``expected`` digests against the files under ``root`` in parallel."""
+
+    def check(relative: str) -> str:
+        path = root / relative
+        if not path.is_file():
+            return "missing"
+        return "ok" if sha256_file(path) == expected[relative] else "mismatch"
+
+    result: dict[str, list[str]] = {"ok": [], "mismatch": [], "missing": []}
+    names = sorted(expected)
+    with ThreadPoolExecutor(max_workers=max(1, jobs)) as pool:
+        for relative, status in zip(names, pool.map(check, names)):
+            result[status].append(relative)
+    return result
+
+
+def main() -> int:
+    args = parse_args()
+    root = args.root
+    if not root.is_dir():
+        print(f"ERROR: Directory does not exist: {root}", file=sys.stderr)
+        return 2
+
+    started = time.monotonic()
+    if args.verify:
+        manifest = root / TEXT_MANIFEST
+        if not manifest.exists():
+            print(f"ERROR: {manifest} not found", file=sys.stderr)
+            return 2
+        result = verify_manifest(root, parse_text_manifest(manifest.read_text(encoding="utf-8")), args.jobs)
+        for status in ("mismatch", "missing"):
+            for relative in result[status]:
+                print(f"{relative}: {status.upper()}")
+        print(
+            f"Verified {len(result['ok'])} file(s); {len(result['mismatch'])} mismatched, "
+            f"{len(result['missing'])} missing in {time.monotonic() - started:.2f}s"
+        )
+        return 1 if result["mismatch"] or result["missing"] else 0
+
+    previous = {} if args.full else load_json_manifest(args.previous or root / JSON_MANIFEST)
+    files, stats = build_manifest(root, previous, args.jobs)
+    write_manifests(root, files)
+    print(
+        f"Checksummed {stats['files']} file(s): hashed {stats['hashed']} ({stats['bytes_hashed']} bytes), "
+        f"reused {stats['reused']}, {stats['linked']} hardlink(s) in {time.monotonic() - started:.2f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""Compile the assess/evidence role loops into static, flattened playbooks.
+
+`playbooks/assess.yml` and `playbooks/evidence.yml` loop `include_role` over every
+deployed role, and every role re-includes `common/validate_zone.yml`. This script
+inlines each role's `verify.yml`/`evidence.yml` tasks into one generated role
+(`roles/compiled_compliance`) with zone validation done once per host, merges role
+defaults/vars at their original precedence, and writes `playbooks/*_flat.yml` that
+import it statically.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import re
+import sys
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+ROLES_DIR = REPO_ROOT / "roles"
+PLAYBOOKS_DIR = REPO_ROOT / "playbooks"
+ROLE_LIST_FILE = PLAYBOOKS_DIR / "vars" / "compliance_roles.yml"
+COMPILED_ROLE = "compiled_compliance"
+VALIDATE_ZONE_FILE = ROLES_DIR / "common" / "tasks" / "validate_zone.yml"
+GROUP_VARS_DIR = REPO_ROOT / "inventory" / "group_vars"
+
+GENERATED_HEADER = (
+    "---\n"
+    "# GENERATED by scripts/compile_playbooks.py from {source}. Do not edit by hand;\n"
+    "# run `make compile-playbooks` after changing roles or the source playbook.\n"
+)
+
+# (source playbook, compiled playbook, role task file, register name for per-role results)
+PLAYBOOK_TARGETS = [
+    ("assess.yml", "assess_flat.yml", "verify", "verify_role_runs"),
+    ("evidence.yml", "evidence_flat.yml", "evidence", None),
+]
+
+INCLUDE_ACTIONS = {
+    "include_role",
+    "ansible.builtin.include_role",
+    "import_role",
+    "ansible.builtin.import_role",
+    "include_tasks",
+    "ansible.builtin.include_tasks",
+    "import_tasks",
+    "ansible.builtin.import_tasks",
+}
+ROLE_LOOP_ACTIONS = {"include_role", "ansible.builtin.include_role"}
+
+
+class CompileError(RuntimeError):
+    """Raised when roles cannot be flattened without changing behaviour."""
+
+
+class _Dumper(yaml.SafeDumper):
+    """Dump block-style YAML with indented sequences and literal multi-line strings."""
+
+    def increase_indent(self, flow: bool = False, indentless: bool = False) -> None:
+        super().increase_indent(flow, False)
+
+
+def _str_representer(dumper: yaml.SafeDumper, data: str) -> yaml.ScalarNode:
+    style = None
+    if "\n" in data:
+        style = "|"
+    elif "{{" in data or "{%" in data or "'" in data:
+        style = '"'
+    return dumper.represent_scalar("tag:yaml.org,2002:str", data, style=style)
+
+
+def _none_representer(dumper: yaml.SafeDumper, data: None) -> yaml.ScalarNode:
+    return dumper.represent_scalar("tag:yaml.org,2002:null", "")
+
+
+_Dumper.add_representer(str, _str_representer)
+_Dumper.add_representer(type(None), _none_representer)
+
+
+def _dump(data: Any) -> str:
+    rendered = yaml.dump(data, Dumper=_Dumper, sort_keys=False, width=4096, allow_unicode=True)
+    # Separate top-level tasks/plays with a blank line like the hand-written playbooks.
+    return rendered.replace("\n- ", "\n\n- ") if isinstance(data, list) else rendered
+
+
+def _load(path: Path) -> Any:
+    if not path.exists():
+        return None
+    return yaml.safe_load(path.read_text(encoding="utf-8"))
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compile flattened assess/evidence playbooks")
+    parser.add_argument(
+        "--check",
+        action="store_true",
+        help="Exit non-zero if the checked-in compiled files are out of date",
+    )
+    return parser.parse_args()
+
+
+def load_role_list(path: Path = ROLE_LIST_FILE) -> list[str]:
+    data = _load(path) or {}
+    roles = data.get("deployed_roles", [])
+    if not isinstance(roles, list) or not roles:
+        raise CompileError(f"No deployed_roles found in {path}")
+    return [str(role) for role in roles]
+
+
+def _is_zone_validation(task: dict[str, Any]) -> bool:
+    for action in INCLUDE_ACTIONS:
+        args = task.get(action)
+        if args is None:
+            continue
+        if isinstance(args, dict):
+            target = str(args.get("tasks_from") or args.get("file") or "")
+        else:
+            target = str(args)
+        if Path(target).stem == "validate_zone":
+            return True
+    return False
+
+
+def _task_identity(task: dict[str, Any]) -> str:
+    body = {key: value for key, value in task.items() if key not in {"name", "tags"}}
+    return yaml.safe_dump(body, sort_keys=True)
+
+
+def _merge_vars(roles: list[str], relative: str) -> dict[str, Any]:
+    merged: dict[str, Any] = {}
+    owners: dict[str, str] = {}
+    for role in roles:
+        data = _load(ROLES_DIR / role / relative) or {}
+        for key, value in data.items():
+            if key in merged and merged[key] != value:
+                raise CompileError(f"{relative}: {key} differs between {owners[key]} and {role}")
+            merged[key] = value
+            owners.setdefault(key, role)
+    return merged
+
+
+_TAG_VAR_RE = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+def _inventory_values(variable: str, group_vars_dir: Path = GROUP_VARS_DIR) -> list[str]:
+    """Return every value ``variable`` is given in inventory group_vars (e.g. each cui_zone)."""
+    values: set[str] = set()
+    for path in sorted(group_vars_dir.glob("*.yml")):
+        value = (_load(path) or {}).get(variable)
+        if isinstance(value, (str, int)) and not isinstance(value, bool):
+            values.add(str(value))
+    return sorted(values)
+
+
+def _tag_expression(tag: str) -> str:
+    """Render a templated tag such as ``zone_{{ cui_zone }}`` as a Jinja expression."""
+    parts: list[str] = []
+    position = 0
+    for match in _TAG_VAR_RE.finditer(tag):
+        if match.start() > position:
+            parts.append(repr(tag[position : match.start()]))
+        parts.append(match.group(1))
+        position = match.end()
+    if position < len(tag):
+        parts.append(repr(tag[position:]))
+    return " ~ ".join(parts)
+
+
+def _static_tags(tasks: list[dict[str, Any]], values: dict[str, list[str]] | None = None) -> list[dict[str, Any]]:
+    """Expand templated tags into one static tag per inventory value.
+
+    Ansible filters statically imported tasks by tag at play compile time, before any
+    inventory variables exist, so ``zone_{{ cui_zone }}`` becomes ``zone_internal``,
+    ``zone_restricted`` and so on. A guard keeps ``--tags zone_restricted`` limited to the
+    hosts whose own tag was selected, as the include loop did.
+    """
+    values = values if values is not None else {}
+    for task in tasks:
+        guards: list[str] = []
+        tags: list[Any] = []
+        for tag in task.get("tags") or []:
+            variables = _TAG_VAR_RE.findall(tag) if isinstance(tag, str) else []
+            if len(variables) != 1:
+                tags.append(tag)
+                continue
+            variable = variables[0]
+            if variable not in values:
+                values[variable] = _inventory_values(variable)
+            if not values[variable]:
+                raise CompileError(f"Tag {tag} uses {variable}, which no inventory group_vars file sets")
+            expanded = [_TAG_VAR_RE.sub(value, tag) for value in values[variable]]
+            tags.extend(expanded)
+            guards.append(
+                f"ansible_run_tags | intersect({expanded!r}) | length == 0"
+                f" or ({_tag_expression(tag)}) in ansible_run_tags"
+            )
+        if task.get("tags"):
+            task["tags"] = tags
+        if guards:
+            when = task.get("when")
+            task["when"] = guards + (when if isinstance(when, list) else [] if when is None else [when])
+        for section in ("block", "rescue", "always"):
+            if isinstance(task.get(section), list):
+                _static_tags(task[section], values)
+    return tasks
+
+
+def _role_tags(tasks: list[dict[str, Any]]) -> list[str]:
+    tags: list[str] = []
+    for task in tasks:
+        for tag in task.get("tags", []) or []:
+            if tag not in tags:
+                tags.append(tag)
+    return tags
+
+
+def _role_task_files(roles: list[str], task_file: str) -> dict[str, list[dict[str, Any]]]:
+    loaded: dict[str, list[dict[str, Any]]] = {}
+    for role in roles:
+        tasks = _load(ROLES_DIR / role / "tasks" / f"{task_file}.yml") or []
+        loaded[role] = [task for task in tasks if not _is_zone_validation(task)]
+    return loaded
+
+
+def compile_role_tasks(roles: list[str], task_file: str, results_var: str | None) -> list[dict[str, Any]]:
+    """Return the flattened task list for one role task file (verify or evidence)."""
+    role_tasks = _role_task_files(roles, task_file)
+
+    zone_tasks = _static_tags(copy.deepcopy(_load(VALIDATE_ZONE_FILE) or []))
+    for task in zone_tasks:
+        task["name"] = f"{task['name']} (once per host)"
+    header: list[dict[str, Any]] = list(zone_tasks)
+
+    # WHY: Setup tasks repeated verbatim by several roles (e.g. the evidence dir) run once up front.
+    usage: dict[str, int] = {}
+    for tasks in role_tasks.values():
+        for identity in {_task_identity(task) for task in tasks}:
+            usage[identity] = usage.get(identity, 0) + 1
+    hoisted: set[str] = set()
+
+    role_blocks: list[dict[str, Any]] = []
+    for role, tasks in role_tasks.items():
+        body: list[dict[str, Any]] = []
+        for task in tasks:
+            identity = _task_identity(task)
+            if usage[identity] > 1:
+                if identity not in hoisted:
+                    hoisted.add(identity)
+                    shared = copy.deepcopy(task)
+                    shared["name"] = shared["name"].split(" for ", 1)[0]
+                    shared["tags"] = ["always"]
+                    header.append(shared)
+                continue
+            body.append(_static_tags([copy.deepcopy(task)])[0])
+
+        if not body:
+            continue
+
+        block: dict[str, Any] = {
+            "name": f"{task_file.capitalize()} {role}",
+            "when": f"'{role}' in deployed_roles",
+            "vars": {"compiled_from_role": role},
+            "tags": _role_tags(body),
+            "block": body,
+        }
+        if results_var:
+            block["rescue"] = [
+                {
+                    "name": f"Record {task_file} failure for {role}",
+                    "ansible.builtin.set_fact": {
+                        "compiled_failed_roles": f"{{{{ compiled_failed_roles | default([]) + ['{role}'] }}}}"
+                    },
+                }
+            ]
+        role_blocks.append(block)
+
+    compiled = header + role_blocks
+    if results_var:
+        # WHY: Keep the include-loop register shape so downstream aggregation is unchanged.
+        compiled.append(
+            {
+                "name": f"Summarize per-role {task_file} results",
+                "ansible.builtin.set_fact": {
+                    results_var: (
+                        "{%- set runs = [] -%}"
+                        "{%- for role in deployed_roles -%}"
+                        "{%- set _ = runs.append({'item': role, "
+                        "'failed': role in (compiled_failed_roles | default([]))}) -%}"
+                        "{%- endfor -%}"
+                        "{{ {'results': runs} }}"
+                    )
+                },
+                "tags": ["always"],
+            }
+        )
+    return compiled
+
+
+def compile_playbook(source: Path, task_file: str) -> list[dict[str, Any]]:
+    """Replace each role include loop in ``source`` with a static import of the compiled role."""
+    plays = copy.deepcopy(_load(source))
+    replaced = 0
+    for play in plays:
+        tasks = play.get("tasks", [])
+        for index, task in enumerate(tasks):
+            action = next((key for key in ROLE_LOOP_ACTIONS if key in task), None)
+            if action is None or str(task[action].get("tasks_from", "")) != f"{task_file}.yml":
+                continue
+            compiled_task: dict[str, Any] = {
+                "name": f"{task['name']} (compiled)",
+                "ansible.builtin.import_role": {"name": COMPILED_ROLE, "tasks_from": f"{task_file}.yml"},
+            }
+            extra = {key: value for key, value in task.items() if key in {"vars", "tags"}}
+            compiled_task.update(extra)
+            tasks[index] = compiled_task
+            replaced += 1
+    if not replaced:
+        raise CompileError(f"Expected a {task_file}.yml include loop in {source}, found none")
+    return plays
+
+
+def render_outputs(roles: list[str] | None = None) -> dict[Path, str]:
+    """Return every generated file path mapped to its rendered content."""
+    roles = roles if roles is not None else load_role_list()
+    role_dir = ROLES_DIR / COMPILED_ROLE
+    source_note = "roles/*/{defaults,vars}/main.yml"
+    outputs: dict[Path, str] = {
+        role_dir / "defaults" / "main.yml": GENERATED_HEADER.format(source=source_note)
+        + _dump(_merge_vars(roles, "defaults/main.yml")),
+        role_dir / "vars" / "main.yml": GENERATED_HEADER.format(source=source_note)
+        + _dump(_merge_vars(roles, "vars/main.yml")),
+        role_dir / "meta" / "main.yml": GENERATED_HEADER.format(source="compiled role metadata")
+        + _dump(
+            {
+                "galaxy_info": {
+                    "role_name": COMPILED_ROLE,
+                    "author": "rcd-cui",
+                    "description": "Flattened verify/evidence tasks for all deployed CUI roles",
+                    "license": "MIT",
+                    "min_ansible_version": "2.15",
+                },
+                # WHY: Compiled tasks are read-only; meta dependencies would re-run deploy main.yml.
+                "dependencies": [],
+            }
+        ),
+    }
+
+    for source_name, target_name, task_file, results_var in PLAYBOOK_TARGETS:
+        tasks_path = role_dir / "tasks" / f"{task_file}.yml"
+        outputs[tasks_path] = GENERATED_HEADER.format(source=f"roles/*/tasks/{task_file}.yml") + _dump(
+            compile_role_tasks(roles, task_file, results_var)
+        )
+        source = PLAYBOOKS_DIR / source_name
+        outputs[PLAYBOOKS_DIR / target_name] = GENERATED_HEADER.format(
+            source=f"playbooks/{source_name}"
+        ) + _dump(compile_playbook(source, task_file))
+    return outputs
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        outputs = render_outputs()
+    except CompileError as exc:
+        print(f"ERROR: {exc}", file=sys.stderr)
+        return 2
+
+    stale = [path for path, content in outputs.items() if not path.exists() or path.read_text(encoding="utf-8") != content]
+    if args.check:
+        if stale:
+            for path in stale:
+                print(f"Out of date: {path.relative_to(REPO_ROOT)}", file=sys.stderr)
+            print("Run `make compile-playbooks` and commit the result.", file=sys.stderr)
+            return 1
+        print(f"Compiled playbooks are up to date ({len(outputs)} files)")
+        return 0
+
+    for path in stale:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(outputs[path], encoding="utf-8")
+    print(f"Compiled {len(outputs)} files ({len(stale)} updated)")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,363 @@
+#!/usr/bin/env python3
+"""Collect continuous compliance agent events and keep a live assessment current.
+
+Agents deployed by the ca_continuous_monitoring role POST compact drift events here
+whenever a watched file or service changes. Each event updates one host/role result in
+``data/assessment_live/current.json``. That file is a copy of the latest nightly
+assessment with the same control, SPRS and coverage fields, so the SPRS and POA&M reports
+can read it with ``--input``. A newer nightly assessment replaces the live copy.
+"""
+from __future__ import annotations
+
+import argparse
+import copy
+import hmac
+import ipaddress
+import json
+import os
+import ssl
+import sys
+import tempfile
+import threading
+from datetime import datetime, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_HISTORY_DIR = REPO_ROOT / "data" / "assessment_history"
+DEFAULT_LIVE_DIR = REPO_ROOT / "data" / "assessment_live"
+MAX_BODY_BYTES = 4 * 1024 * 1024
+
+PLUGIN_DIR = REPO_ROOT / "plugins" / "filter"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import sprs  # noqa: E402
+import verify_results  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Receive continuous compliance events from host agents")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    serve = subparsers.add_parser("serve", help="Listen for agent events")
+    serve.add_argument(
+        "--bind",
+        default="127.0.0.1",
+        help="Listen address; anything but loopback requires an agent token",
+    )
+    serve.add_argument("--port", type=int, default=8471, help="Listen port")
+    serve.add_argument(
+        "--token-file",
+        type=Path,
+        default=None,
+        help="File holding the shared agent token (default: $COMPLIANCE_COLLECTOR_TOKEN)",
+    )
+    serve.add_argument("--tls-cert", type=Path, default=None, help="Serve HTTPS with this certificate")
+    serve.add_argument("--tls-key", type=Path, default=None, help="Private key for --tls-cert")
+
+    ingest = subparsers.add_parser("ingest", help="Apply events from a JSON file (e.g. a copied agent spool)")
+    ingest.add_argument("events_file", type=Path, help="JSON document with an events list, or JSON lines")
+
+    for sub in (serve, ingest):
+        sub.add_argument("--history-dir", type=Path, default=DEFAULT_HISTORY_DIR, help="Nightly assessment JSON directory")
+        sub.add_argument("--live-dir", type=Path, default=DEFAULT_LIVE_DIR, help="Live assessment directory")
+        sub.add_argument("--store-dir", type=Path, default=None, help="Verify output store (default: data/verify_outputs)")
+    return parser.parse_args()
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def _write_json(path: Path, document: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    handle, temp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    try:
+        with os.fdopen(handle, "w", encoding="utf-8") as stream:
+            json.dump(document, stream, indent=2)
+        os.replace(temp_name, path)
+    except OSError:
+        if os.path.exists(temp_name):
+            os.unlink(temp_name)
+        raise
+
+
+def _latest_assessment_file(history_dir: Path) -> Path | None:
+    candidates = sorted(history_dir.glob("*.json"))
+    return candidates[-1] if candidates else None
+
+
+def load_live_assessment(live_dir: Path, history_dir: Path) -> dict[str, Any]:
+    """Return the live assessment, reseeding it when a newer nightly assessment exists."""
+    latest = _latest_assessment_file(history_dir)
+    current_file = live_dir / "current.json"
+    if current_file.exists():
+        current = json.loads(current_file.read_text(encoding="utf-8"))
+        if latest is None or current.get("live", {}).get("based_on") == latest.name:
+            return current
+
+    base = json.loads(latest.read_text(encoding="utf-8")) if latest else {"controls": [], "coverage": {}}
+    live = copy.deepcopy(base)
+    live["live"] = {
+        "based_on": latest.name if latest else None,
+        "based_on_assessment_id": base.get("assessment_id"),
+        "seeded_at": _now(),
+        "updated_at": None,
+        "events_applied": 0,
+        "drift": {},
+    }
+    return live
+
+
+def validate_event(event: Any) -> str | None:
+    """Return a reason the event is malformed, or None."""
+    if not isinstance(event, dict):
+        return "event is not an object"
+    for key, kind in (("host", str), ("role", str), ("compliant", bool), ("checks", list)):
+        if not isinstance(event.get(key), kind):
+            return f"event field {key!r} missing or not {kind.__name__}"
+    return None
+
+
+def _recompute_control(control: dict[str, Any]) -> None:
+    # Same binary enclave rule as playbooks/assess.yml: a control passes only when every
+    # assessed system passed.
+    systems = control.get("systems") or []
+    if not systems:
+        return
+    for system in systems:
+        # Older assessments only carry the per-system status; pin it before it is rewritten.
+        system.setdefault("host_passed", system.get("status") == "pass")
+    passed = all(system["host_passed"] for system in systems)
+    status = "pass" if passed else "fail"
+    control["status"] = status
+    control["status_reason"] = (
+        "All applicable systems passed verification checks"
+        if passed
+        else "One or more systems failed role verification checks"
+    )
+    control["applicable_systems"] = len(systems)
+    control["passing_systems"] = len(systems) if passed else 0
+    for system in systems:
+        system["status"] = status
+
+
+def apply_event(assessment: dict[str, Any], event: dict[str, Any]) -> dict[str, Any]:
+    """Fold one agent event into ``assessment`` in place and return it."""
+    host, role, compliant = event["host"], event["role"], bool(event["compliant"])
+    detected_at = event.get("detected_at") or _now()
+
+    for control in assessment.get("controls", []):
+        systems = control.setdefault("systems", [])
+        record = next((system for system in systems if system.get("hostname") == host), None)
+        # Assessments list each control's zones; a host outside them does not affect it.
+        if record is None and "zones" in control and event.get("zone") not in control["zones"]:
+            continue
+        if record is None:
+            record = {"hostname": host, "zone": event.get("zone") or "unknown", "role_results": {}}
+            systems.append(record)
+        elif "role_results" not in record:
+            # Without per-role results, keep the nightly outcome for the roles not re-verified.
+            record["role_results"] = {}
+            record["baseline_passed"] = record.get("host_passed", record.get("status") == "pass")
+        record["role_results"][role] = compliant
+        record["host_passed"] = record.get("baseline_passed", True) and all(
+            bool(value) for value in record["role_results"].values()
+        )
+        record["assessed_at"] = detected_at
+        _recompute_control(control)
+
+    coverage = assessment.setdefault("coverage", {})
+    not_assessed = [entry for entry in coverage.get("not_assessed") or [] if entry.get("hostname") != host]
+    if len(not_assessed) != len(coverage.get("not_assessed") or []):
+        coverage["not_assessed"] = not_assessed
+        coverage["assessed_systems"] = int(coverage.get("assessed_systems") or 0) + 1
+
+    outputs = assessment.setdefault("verification_outputs", {"store": "data/verify_outputs", "hosts": {}})
+    outputs.setdefault("hosts", {}).setdefault(host, {})[role] = verify_results.verify_output_refs(event["checks"])
+
+    controls = {"controls": assessment.get("controls", [])}
+    assessment["sprs_score"] = sprs.sprs_score(controls)
+    assessment["sprs_breakdown"] = sprs.sprs_breakdown(controls)
+
+    live = assessment.setdefault("live", {"drift": {}, "events_applied": 0})
+    drifted = set(live.setdefault("drift", {}).get(host, []))
+    if compliant:
+        drifted.discard(role)
+    else:
+        drifted.add(role)
+    if drifted:
+        live["drift"][host] = sorted(drifted)
+    else:
+        live["drift"].pop(host, None)
+    live["events_applied"] = int(live.get("events_applied") or 0) + 1
+    live["updated_at"] = _now()
+    live["last_event"] = {
+        "host": host,
+        "role": role,
+        "compliant": compliant,
+        "detected_at": detected_at,
+        "triggers": event.get("triggers", [])[:5],
+    }
+    return assessment
+
+
+class Collector:
+    """Serialize event application and persistence for concurrent agent pushes."""
+
+    def __init__(self, history_dir: Path, live_dir: Path, store_dir: Path | None = None) -> None:
+        self.history_dir = history_dir
+        self.live_dir = live_dir
+        self.store_dir = store_dir
+        self._lock = threading.Lock()
+
+    def ingest(self, events: list[Any]) -> dict[str, Any]:
+        accepted, rejected = 0, []
+        with self._lock:
+            assessment = load_live_assessment(self.live_dir, self.history_dir)
+            log_file = self.live_dir / "events.jsonl"
+            log_file.parent.mkdir(parents=True, exist_ok=True)
+            with log_file.open("a", encoding="utf-8") as log:
+                for event in events:
+                    reason = validate_event(event)
+                    if reason:
+                        rejected.append(reason)
+                        continue
+                    # Only keep documents whose content matches the hash the agent claims; an
+                    # event carrying a tampered or corrupt output is not applied at all.
+                    mismatched = [
+                        digest
+                        for digest, document in (event.get("outputs") or {}).items()
+                        if isinstance(document, dict) and verify_results.store_output(document, self.store_dir) != digest
+                    ]
+                    if mismatched:
+                        rejected.extend(f"output {digest} does not match its content" for digest in mismatched)
+                        continue
+                    apply_event(assessment, event)
+                    log.write(json.dumps({k: v for k, v in event.items() if k != "outputs"}, sort_keys=True) + "\n")
+                    accepted += 1
+            if accepted:
+                _write_json(self.live_dir / "current.json", assessment)
+        return {"accepted": accepted, "rejected": rejected}
+
+
+def _handler(collector: Collector, token: str) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "rcd-cui-collector"
+
+        def _reply(self, status: HTTPStatus, body: dict[str, Any]) -> None:
+            data = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def _authorized(self) -> bool:
+            if not token:
+                return True
+            supplied = self.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+            return hmac.compare_digest(supplied, token)
+
+        def do_GET(self) -> None:  # noqa: N802
+            if self.path == "/healthz":
+                self._reply(HTTPStatus.OK, {"status": "ok"})
+            elif self.path == "/current" and self._authorized():
+                self._reply(HTTPStatus.OK, load_live_assessment(collector.live_dir, collector.history_dir))
+            else:
+                self._reply(HTTPStatus.NOT_FOUND, {"error": "not found"})
+
+        def do_POST(self) -> None:  # noqa: N802
+            if self.path != "/events":
+                self._reply(HTTPStatus.NOT_FOUND, {"error": "not found"})
+                return
+            if not self._authorized():
+                self._reply(HTTPStatus.UNAUTHORIZED, {"error": "invalid token"})
+                return
+            length = int(self.headers.get("Content-Length") or 0)
+            if length <= 0 or length > MAX_BODY_BYTES:
+                self._reply(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, {"error": "body missing or too large"})
+                return
+            try:
+                payload = json.loads(self.rfile.read(length))
+            except ValueError:
+                self._reply(HTTPStatus.BAD_REQUEST, {"error": "invalid JSON"})
+                return
+            events = payload.get("events") if isinstance(payload, dict) else None
+            if not isinstance(events, list):
+                self._reply(HTTPStatus.BAD_REQUEST, {"error": "expected an events list"})
+                return
+            self._reply(HTTPStatus.OK, collector.ingest(events))
+
+        def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+            print(f"{self.address_string()} {format % args}", file=sys.stderr)
+
+    return Handler
+
+
+def is_loopback(bind: str) -> bool:
+    """Return whether ``bind`` only accepts connections from this machine."""
+    if bind == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(bind).is_loopback
+    except ValueError:
+        return False
+
+
+def _read_events(path: Path) -> list[Any]:
+    text = path.read_text(encoding="utf-8")
+    try:
+        document = json.loads(text)
+    except ValueError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+    return document.get("events", []) if isinstance(document, dict) else document
+
+
+def main() -> int:
+    args = parse_args()
+    collector = Collector(args.history_dir, args.live_dir, args.store_dir)
+
+    if args.command == "ingest":
+        result = collector.ingest(_read_events(args.events_file))
+        print(f"Applied {result['accepted']} event(s) to {args.live_dir / 'current.json'}")
+        for reason in result["rejected"]:
+            print(f"WARNING: {reason}", file=sys.stderr)
+        return 0 if not result["rejected"] else 1
+
+    token = (
+        args.token_file.read_text(encoding="utf-8").strip()
+        if args.token_file
+        else os.environ.get("COMPLIANCE_COLLECTOR_TOKEN", "")
+    )
+    if not token and not is_loopback(args.bind):
+        print(
+            f"ERROR: refusing to accept unauthenticated events on {args.bind}; "
+            "set --token-file or $COMPLIANCE_COLLECTOR_TOKEN, or bind to 127.0.0.1",
+            file=sys.stderr,
+        )
+        return 2
+    if not token:
+        print("WARNING: no agent token configured; accepting unauthenticated events", file=sys.stderr)
+    server = ThreadingHTTPServer((args.bind, args.port), _handler(collector, token))
+    if args.tls_cert:
+        context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        context.minimum_version = ssl.TLSVersion.TLSv1_2
+        context.load_cert_chain(args.tls_cert, args.tls_key)
+        server.socket = context.wrap_socket(server.socket, server_side=True)
+    scheme = "https" if args.tls_cert else "http"
+    if scheme == "http" and not is_loopback(args.bind):
+        print("WARNING: serving plain HTTP; agents need compliance_collector_scheme: http", file=sys.stderr)
+    print(f"Collecting compliance events on {scheme}://{args.bind}:{args.port}/events -> {args.live_dir}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
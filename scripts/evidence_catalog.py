@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""Index an SSP evidence directory in one SQLite catalog.
+
+The finalize play of `playbooks/ssp_evidence.yml` writes `evidence_catalog.sqlite` into
+the evidence root after the checksum step. It is built from data that already exists at
+that point, so no file is read or hashed again:
+
+  evidence store manifests   host, family, artifact, command, collection time
+  checksums.json             sha256 and size of every file
+  control_mapping.yml        the control IDs of each family
+
+`generate_narratives.py`, `generate_dashboard.py` and `generate_auditor_package.py` query
+the catalog instead of walking the evidence tree. For a directory without a catalog,
+`open_catalog` indexes it with a single walk into an in-memory database.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import evidence_store  # noqa: E402
+from build_checksum_manifest import JSON_MANIFEST, load_json_manifest  # noqa: E402
+from models import load_yaml_cached  # noqa: E402
+
+CATALOG_NAME = "evidence_catalog.sqlite"
+CATALOG_GLOB = f"*/evidence/evidence-*/{CATALOG_NAME}"
+DEFAULT_CONTROL_MAPPING = REPO_ROOT / "roles" / "common" / "vars" / "control_mapping.yml"
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE meta (key TEXT PRIMARY KEY, value TEXT);
+CREATE TABLE artifacts (
+    id INTEGER PRIMARY KEY,
+    run TEXT,
+    path TEXT UNIQUE NOT NULL,
+    family_path TEXT,
+    host TEXT,
+    family TEXT,
+    artifact TEXT,
+    command TEXT,
+    collected TEXT,
+    sha256 TEXT,
+    size INTEGER
+);
+CREATE TABLE artifact_controls (artifact_id INTEGER NOT NULL, control_id TEXT NOT NULL);
+CREATE INDEX artifacts_family ON artifacts (family, path);
+CREATE INDEX artifacts_host ON artifacts (host, path);
+CREATE INDEX artifact_controls_control ON artifact_controls (control_id, artifact_id);
+"""
+COLUMNS = ("run", "path", "family_path", "host", "family", "artifact", "command", "collected", "sha256", "size")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Build or query the SSP evidence catalog")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help=f"Write <evidence_root>/{CATALOG_NAME}")
+    build_parser.add_argument("evidence_root", type=Path, help="Evidence directory (evidence-<stamp>)")
+    build_parser.add_argument("--run", default=None, help="Evidence store run ID (default: evidence_root name)")
+    build_parser.add_argument(
+        "--store-dir",
+        type=Path,
+        default=None,
+        help="Evidence store (default: $EVIDENCE_STORE or data/evidence_store)",
+    )
+    build_parser.add_argument("--control-mapping", type=Path, default=DEFAULT_CONTROL_MAPPING)
+
+    query_parser = subparsers.add_parser("query", help="Print matching artifacts as JSON lines")
+    query_parser.add_argument("evidence_dir", type=Path, help="Evidence root or a parent holding evidence runs")
+    query_parser.add_argument("--control", default=None, help="Control ID, e.g. 3.5.3")
+    query_parser.add_argument("--family", default=None)
+    query_parser.add_argument("--host", default=None)
+    query_parser.add_argument("--limit", type=int, default=None)
+    return parser.parse_args()
+
+
+def family_controls(mapping_path: Path = DEFAULT_CONTROL_MAPPING) -> dict[str, list[str]]:
+    controls: dict[str, list[str]] = {}
+    for control in load_yaml_cached(mapping_path).get("controls", []):
+        controls.setdefault(str(control.get("family", "")), []).append(str(control["control_id"]))
+    return controls
+
+
+def _create(path: Path | str) -> sqlite3.Connection:
+    connection = sqlite3.connect(str(path))
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+    return connection
+
+
+def _insert(connection: sqlite3.Connection, rows: Iterable[dict[str, Any]], controls: dict[str, list[str]]) -> int:
+    count = 0
+    for row in rows:
+        cursor = connection.execute(
+            f"INSERT INTO artifacts ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})",
+            [row.get(column) for column in COLUMNS],
+        )
+        connection.executemany(
+            "INSERT INTO artifact_controls (artifact_id, control_id) VALUES (?, ?)",
+            [(cursor.lastrowid, control_id) for control_id in controls.get(row.get("family") or "", [])],
+        )
+        count += 1
+    return count
+
+
+def catalog_rows(
+    evidence_root: Path, run: str, store_dir: str | Path | None = None
+) -> list[dict[str, Any]]:
+    """Return one row per physical evidence file, from manifests and ``checksums.json``."""
+    checksums = load_json_manifest(evidence_root / JSON_MANIFEST)
+    rows: dict[str, dict[str, Any]] = {}
+    for relative, entry in checksums.items():
+        if Path(relative).name.startswith("."):
+            continue
+        host = None
+        parts = relative.split("/")
+        if parts[0] in ("by_system", "inventory") and len(parts) >= 2:
+            host = parts[1] if parts[0] == "by_system" else Path(parts[1]).stem
+        rows[relative] = {
+            "run": run,
+            "path": relative,
+            "host": host,
+            "sha256": entry.get("sha256"),
+            "size": entry.get("size"),
+        }
+
+    for manifest in evidence_store.load_manifests(run, store_dir):
+        host = manifest["host"]
+        for artifact in manifest.get("artifacts", []):
+            row = rows.get(f"by_system/{host}/{artifact['filename']}")
+            if row is None:
+                continue
+            family_path = f"by_family/{artifact['family']}/{host}_{artifact['filename']}"
+            # A hardlinked family view is the same physical file as its by_system entry.
+            if rows.pop(family_path, None) is not None:
+                row["family_path"] = family_path
+            row.update(
+                family=artifact["family"],
+                artifact=artifact["id"],
+                command=artifact["command"],
+                collected=artifact.get("collected") or manifest.get("collected"),
+            )
+    return sorted(rows.values(), key=lambda row: row["path"])
+
+
+def build_catalog(
+    evidence_root: Path,
+    run: str | None = None,
+    store_dir: str | Path | None = None,
+    mapping_path: Path = DEFAULT_CONTROL_MAPPING,
+) -> tuple[Path, int]:
+    """Write ``<evidence_root>/evidence_catalog.sqlite`` atomically; return its path and row count."""
+    evidence_root = Path(evidence_root)
+    run = run or evidence_root.resolve().name
+    fd, tmp_name = tempfile.mkstemp(dir=evidence_root, prefix=".tmp-", suffix=".sqlite")
+    os.close(fd)
+    os.unlink(tmp_name)
+    connection = _create(tmp_name)
+    try:
+        with connection:
+            count = _insert(connection, catalog_rows(evidence_root, run, store_dir), family_controls(mapping_path))
+            connection.executemany(
+                "INSERT INTO meta (key, value) VALUES (?, ?)",
+                [("schema_version", str(SCHEMA_VERSION)), ("run", run)],
+            )
+    finally:
+        connection.close()
+    path = evidence_root / CATALOG_NAME
+    os.replace(tmp_name, path)
+    return path, count
+
+
+def find_catalog(evidence_dir: Path) -> Path | None:
+    """Return the catalog of ``evidence_dir``, or of its newest evidence run below it."""
+    direct = Path(evidence_dir) / CATALOG_NAME
+    if direct.is_file():
+        return direct
+    # <date>/evidence/evidence-<UTC stamp> sorts chronologically.
+    candidates = sorted(Path(evidence_dir).glob(CATALOG_GLOB))
+    return candidates[-1] if candidates else None
+
+
+def index_directory(root: Path, mapping_path: Path = DEFAULT_CONTROL_MAPPING) -> sqlite3.Connection:
+    """Index a directory without a catalog in one walk; families are taken from path tokens."""
+    controls = family_controls(mapping_path)
+    families = set(controls)
+    rows = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(name for name in dirnames if not name.startswith("."))
+        for name in sorted(filenames):
+            if name.startswith("."):
+                continue
+            path = Path(dirpath) / name
+            relative = path.relative_to(root).as_posix()
+            tokens = re.split(r"[/_.\-]", relative)
+            family = next((token for token in tokens if token in families), None)
+            rows.append({"path": relative, "family": family, "size": path.stat().st_size})
+    connection = _create(":memory:")
+    _insert(connection, rows, controls)
+    return connection
+
+
+def open_catalog(evidence_dir: Path) -> tuple[sqlite3.Connection | None, Path]:
+    """Return ``(connection, root)``; paths in the catalog are relative to ``root``."""
+    evidence_dir = Path(evidence_dir)
+    catalog = find_catalog(evidence_dir)
+    if catalog is not None:
+        connection = sqlite3.connect(f"file:{catalog}?mode=ro", uri=True)
+        connection.row_factory = sqlite3.Row
+        return connection, catalog.parent
+    if not evidence_dir.is_dir():
+        return None, evidence_dir
+    return index_directory(evidence_dir), evidence_dir
+
+
+def query(
+    connection: sqlite3.Connection | None,
+    control_id: str | None = None,
+    family: str | None = None,
+    host: str | None = None,
+    limit: int | None = None,
+) -> list[dict[str, Any]]:
+    """Return catalog rows ordered by path, optionally filtered by control, family or host."""
+    if connection is None:
+        return []
+    sql = "SELECT artifacts.* FROM artifacts"
+    clauses: list[str] = []
+    params: list[Any] = []
+    if control_id is not None:
+        sql += " JOIN artifact_controls ON artifact_controls.artifact_id = artifacts.id"
+        clauses.append("artifact_controls.control_id = ?")
+        params.append(control_id)
+    if family is not None:
+        clauses.append("artifacts.family = ?")
+        params.append(family)
+    if host is not None:
+        clauses.append("artifacts.host = ?")
+        params.append(host)
+    if clauses:
+        sql += " WHERE " + " AND ".join(clauses)
+    sql += " ORDER BY artifacts.path"
+    if limit is not None:
+        sql += " LIMIT ?"
+        params.append(limit)
+    return [dict(row) for row in connection.execute(sql, params)]
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "build":
+        if not args.evidence_root.is_dir():
+            print(f"ERROR: Directory does not exist: {args.evidence_root}", file=sys.stderr)
+            return 2
+        path, count = build_catalog(args.evidence_root, args.run, args.store_dir, args.control_mapping)
+        print(f"Cataloged {count} evidence file(s) in {path}")
+        return 0
+
+    connection, root = open_catalog(args.evidence_dir)
+    for row in query(connection, args.control, args.family, args.host, args.limit):
+        print(json.dumps({**row, "path": str(root / row["path"])}, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""Retention and delta packaging for dated SSP evidence runs.
+
+Every `make evidence` leaves `docs/auditor_packages/<date>/evidence/evidence-<stamp>/`
+and a `<date>.tar.gz`, and consecutive days are nearly identical. `gc` walks the runs in
+order and keeps a full snapshot every `--full-every` days. Each run in between becomes a
+delta against the last full snapshot: files whose SHA-256 (from the run's
+`checksums.json`) matches the snapshot are deleted and listed in `delta.json`. The dated
+archives of processed days are removed as well. `reconstruct` rebuilds any day's complete
+directory and `<date>.tar.gz` on demand.
+
+  delta.json   {"version": 1, "base": "<date>/evidence/evidence-<stamp>",
+                "unchanged": {"<relative path>": "<sha256>", ...}}
+
+A full snapshot and its deltas expire together, once the newest of them is older than
+`--max-age-days` (0 keeps everything).
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tarfile
+import tempfile
+from dataclasses import dataclass, field
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from build_checksum_manifest import JSON_MANIFEST, build_manifest, load_json_manifest, sha256_file  # noqa: E402
+
+DEFAULT_ROOT = REPO_ROOT / "docs" / "auditor_packages"
+DELTA_NAME = "delta.json"
+DELTA_VERSION = 1
+RUN_GLOB = "*/evidence/evidence-*"
+# Per-run files that always differ and are never shared with the snapshot.
+RUN_LOCAL_FILES = {DELTA_NAME}
+
+
+@dataclass
+class Run:
+    path: Path
+    day: date
+    kind: str = "full"
+    base: Path | None = None
+    members: list["Run"] = field(default_factory=list)
+
+    def relative(self, root: Path) -> str:
+        return self.path.relative_to(root).as_posix()
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Garbage-collect and reconstruct dated evidence packages")
+    parser.add_argument("--root", type=Path, default=DEFAULT_ROOT, help="Auditor package root (docs/auditor_packages)")
+    parser.add_argument("--full-every", type=int, default=7, help="Days between full snapshots")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    gc_parser = subparsers.add_parser("gc", help="Convert runs between full snapshots to deltas and expire old ones")
+    gc_parser.add_argument("--keep-recent", type=int, default=1, help="Newest runs to leave untouched")
+    gc_parser.add_argument("--max-age-days", type=int, default=0, help="Expire snapshot groups older than this")
+    gc_parser.add_argument("--dry-run", action="store_true", help="Report what would be reclaimed")
+
+    reconstruct_parser = subparsers.add_parser("reconstruct", help="Rebuild one day's full package")
+    reconstruct_parser.add_argument("day", help="Package date (YYYY-MM-DD)")
+    reconstruct_parser.add_argument(
+        "--output", type=Path, default=None, help="Directory for <date>/ and <date>.tar.gz (default: --root)"
+    )
+    reconstruct_parser.add_argument("--no-archive", action="store_true", help="Only rebuild the directory")
+
+    subparsers.add_parser("status", help="List runs with their snapshot kind")
+    return parser.parse_args()
+
+
+def _resolve(path: Path) -> Path:
+    return path if path.is_absolute() else REPO_ROOT / path
+
+
+def _parse_day(name: str) -> date | None:
+    try:
+        return date.fromisoformat(name)
+    except ValueError:
+        return None
+
+
+def load_delta(run_path: Path) -> dict[str, Any] | None:
+    path = run_path / DELTA_NAME
+    if not path.is_file():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))
+
+
+def plan_runs(root: Path, full_every: int) -> list[Run]:
+    """Return all runs, oldest first, classified as full snapshots or deltas.
+
+    Runs already stored as deltas keep their recorded base, so re-running ``gc`` never
+    changes an earlier decision.
+    """
+    runs = []
+    for path in sorted(root.glob(RUN_GLOB)):
+        day = _parse_day(path.parents[1].name)
+        if day is not None and path.is_dir():
+            runs.append(Run(path=path, day=day))
+
+    last_full: Run | None = None
+    by_path = {run.path: run for run in runs}
+    for run in runs:
+        delta = load_delta(run.path)
+        if delta is not None:
+            run.kind = "delta"
+            run.base = root / delta["base"]
+            if run.base in by_path:
+                by_path[run.base].members.append(run)
+            continue
+        if last_full is None or (run.day - last_full.day).days >= max(1, full_every):
+            last_full = run
+            continue
+        run.kind = "pending-delta"
+        run.base = last_full.path
+        last_full.members.append(run)
+    return runs
+
+
+def _file_digests(run_path: Path) -> dict[str, dict[str, Any]]:
+    files = load_json_manifest(run_path / JSON_MANIFEST)
+    return files or build_manifest(run_path)[0]
+
+
+def _remove_empty_dirs(root: Path) -> None:
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        if Path(dirpath) != root and not dirnames and not filenames:
+            Path(dirpath).rmdir()
+
+
+def convert_to_delta(run: Run, root: Path, dry_run: bool = False) -> int:
+    """Replace files shared with the run's snapshot by ``delta.json``; return bytes reclaimed."""
+    if run.base is None:
+        raise ValueError(f"{run.path} has no snapshot to delta against")
+    base_files = _file_digests(run.base)
+    unchanged: dict[str, str] = {}
+    reclaimed = 0
+    seen_inodes: set[tuple[int, int]] = set()
+    for relative, entry in sorted(_file_digests(run.path).items()):
+        if relative in RUN_LOCAL_FILES or not (run.path / relative).is_file():
+            continue
+        base_entry = base_files.get(relative)
+        if base_entry is None or base_entry.get("sha256") != entry.get("sha256"):
+            continue
+        unchanged[relative] = entry["sha256"]
+        info = (run.path / relative).stat()
+        if (info.st_dev, info.st_ino) not in seen_inodes:
+            seen_inodes.add((info.st_dev, info.st_ino))
+            reclaimed += info.st_size
+    if dry_run:
+        return reclaimed
+
+    document = {
+        "version": DELTA_VERSION,
+        "base": run.base.relative_to(root).as_posix(),
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "unchanged": unchanged,
+    }
+    # Write the delta record before deleting anything so an interrupted run is recoverable.
+    tmp = run.path / f".tmp-{DELTA_NAME}"
+    tmp.write_text(json.dumps(document, indent=2, sort_keys=True), encoding="utf-8")
+    os.replace(tmp, run.path / DELTA_NAME)
+    for relative in unchanged:
+        (run.path / relative).unlink()
+    _remove_empty_dirs(run.path)
+    return reclaimed
+
+
+def _tree_size(path: Path) -> int:
+    seen: set[tuple[int, int]] = set()
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for name in filenames:
+            info = (Path(dirpath) / name).lstat()
+            if (info.st_dev, info.st_ino) not in seen:
+                seen.add((info.st_dev, info.st_ino))
+                total += info.st_size
+    return total
+
+
+def collect_garbage(
+    root: Path,
+    full_every: int = 7,
+    keep_recent: int = 1,
+    max_age_days: int = 0,
+    today: date | None = None,
+    dry_run: bool = False,
+) -> dict[str, Any]:
+    """Apply the retention policy under ``root`` and return what was reclaimed."""
+    runs = plan_runs(root, full_every)
+    recent = {run.path for run in runs[-keep_recent:]} if keep_recent > 0 else set()
+    today = today or date.today()
+    report: dict[str, Any] = {"converted": [], "expired": [], "archives_removed": [], "reclaimed_bytes": 0}
+
+    expired_days: set[Path] = set()
+    if max_age_days > 0:
+        for run in runs:
+            if run.kind != "full":
+                continue
+            group = [run, *run.members]
+            if any(member.path in recent for member in group):
+                continue
+            if all((today - member.day).days > max_age_days for member in group):
+                for member in group:
+                    report["expired"].append(member.relative(root))
+                    report["reclaimed_bytes"] += _tree_size(member.path)
+                    if not dry_run:
+                        shutil.rmtree(member.path)
+                    expired_days.add(member.path.parents[1])
+
+    touched_days: set[Path] = set()
+    for run in runs:
+        if run.kind != "pending-delta" or run.path in recent or run.relative(root) in report["expired"]:
+            continue
+        if run.base is None or not run.base.is_dir():
+            continue
+        report["reclaimed_bytes"] += convert_to_delta(run, root, dry_run)
+        report["converted"].append(run.relative(root))
+        touched_days.add(run.path.parents[1])
+
+    # Dated archives duplicate their directory; `reconstruct` rebuilds them on demand.
+    recent_days = {path.parents[1] for path in recent}
+    for run in runs:
+        day_dir = run.path.parents[1]
+        archive = root / f"{day_dir.name}.tar.gz"
+        if day_dir in recent_days or not archive.is_file() or str(archive) in report["archives_removed"]:
+            continue
+        report["archives_removed"].append(str(archive))
+        report["reclaimed_bytes"] += archive.stat().st_size
+        if not dry_run:
+            archive.unlink()
+
+    for day_dir in expired_days | touched_days:
+        if not dry_run and day_dir.is_dir():
+            _remove_empty_dirs(day_dir)
+            if not any(day_dir.iterdir()):
+                day_dir.rmdir()
+    return report
+
+
+def reconstruct(root: Path, day: str, output: Path | None = None, archive: bool = True) -> Path:
+    """Rebuild ``<output>/<day>/`` with every delta filled from its snapshot; return the result path."""
+    source = root / day
+    if not source.is_dir():
+        raise FileNotFoundError(f"no package directory for {day} under {root}")
+    output = output or root
+    output.mkdir(parents=True, exist_ok=True)
+    staging = Path(tempfile.mkdtemp(dir=output, prefix=".tmp-reconstruct-"))
+    try:
+        target = staging / day
+        shutil.copytree(source, target, copy_function=os.link)
+        for run_path in sorted(target.glob("evidence/evidence-*")):
+            delta = load_delta(run_path)
+            if delta is None:
+                continue
+            base = root / delta["base"]
+            base_files = _file_digests(base)
+            for relative, sha256 in delta["unchanged"].items():
+                # The link shares the base inode, so hash the file itself, not only its manifest entry.
+                if base_files.get(relative, {}).get("sha256") != sha256 or sha256_file(base / relative) != sha256:
+                    raise ValueError(f"{base}/{relative} no longer matches {day} ({sha256})")
+                destination = run_path / relative
+                destination.parent.mkdir(parents=True, exist_ok=True)
+                os.link(base / relative, destination)
+            (run_path / DELTA_NAME).unlink()
+
+        if not archive:
+            final = output / day
+            if final.resolve() == source.resolve():
+                raise ValueError("reconstructing in place needs --output or an archive")
+            shutil.rmtree(final, ignore_errors=True)
+            os.replace(target, final)
+            return final
+        archive_path = output / f"{day}.tar.gz"
+        tmp_archive = staging / archive_path.name
+        with tarfile.open(tmp_archive, "w:gz") as handle:
+            handle.add(target, arcname=day)
+        os.replace(tmp_archive, archive_path)
+        return archive_path
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def main() -> int:
+    args = parse_args()
+    root = _resolve(args.root)
+    if not root.is_dir():
+        print(f"ERROR: Directory does not exist: {root}", file=sys.stderr)
+        return 2
+
+    if args.command == "status":
+        for run in plan_runs(root, args.full_every):
+            base = f" (base {run.base.relative_to(root).as_posix()})" if run.base else ""
+            print(f"{run.relative(root)}: {run.kind}{base}")
+        return 0
+
+    if args.command == "reconstruct":
+        try:
+            result = reconstruct(root, args.day, _resolve(args.output) if args.output else None, not args.no_archive)
+        except (FileNotFoundError, ValueError) as exc:
+            print(f"ERROR: {exc}", file=sys.stderr)
+            return 1
+        print(f"Reconstructed {args.day}: {result}")
+        return 0
+
+    report = collect_garbage(root, args.full_every, args.keep_recent, args.max_age_days, dry_run=args.dry_run)
+    verb = "Would reclaim" if args.dry_run else "Reclaimed"
+    print(
+        f"{verb} {report['reclaimed_bytes']} bytes: {len(report['converted'])} run(s) to deltas, "
+        f"{len(report['expired'])} expired, {len(report['archives_removed'])} archive(s) removed"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,373 @@
+#!/usr/bin/env python3
+"""Content-addressed SSP evidence store with per-host manifests.
+
+Command output such as `sshd -T` or `nft list ruleset` is byte-identical across most
+nodes of a pool, so it is stored once and referenced by hash. The store lives in
+`$EVIDENCE_STORE` (default `data/evidence_store`):
+
+  objects/<aa>/<sha256>         redacted command output, one file per unique content
+  raw_index/<version>/<aa>/<sha256>
+                                hash of the redacted object for a raw output hash under
+                                one redaction pattern pack version, so identical raw
+                                output is redacted only once per pack
+  manifests/<run>/<host>.json   host, zone, collection time, inventory summary and the
+                                object hashes of every artifact's stdout/stderr, the
+                                pattern pack version they were redacted with, plus its
+                                host-side source fingerprint
+
+Artifacts whose fingerprint matches the host's latest manifest are not re-run on the
+host; the new manifest references the previous objects and is marked `reused`. Output
+redacted with an older pattern pack is never reused: the host collects it again.
+
+The auditor-facing `by_system/`, `by_family/` and `inventory/` views are materialized
+from the manifests on demand. Each artifact is written once under `by_system/`; its
+`by_family/` entry is a hardlink to that file, or, with `--family-view index` (for
+archive formats that cannot store hardlinks), a generated `by_family/<family>/index.txt`
+that lists the `by_system/` paths.
+"""
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterable
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_STORE_DIR = REPO_ROOT / "data" / "evidence_store"
+VIEWS = ("by_system", "by_family", "inventory")
+FAMILY_VIEWS = ("link", "index")
+FAMILY_INDEX_NAME = "index.txt"
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from redact_secrets import load_pattern_pack, redact_text  # noqa: E402
+
+
+def store_root(store_dir: str | Path | None = None) -> Path:
+    root = Path(store_dir or os.environ.get("EVIDENCE_STORE") or DEFAULT_STORE_DIR)
+    return root if root.is_absolute() else REPO_ROOT / root
+
+
+def object_path(sha256: str, store_dir: str | Path | None = None) -> Path:
+    return store_root(store_dir) / "objects" / sha256[:2] / sha256
+
+
+def _atomic_write(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp_name, path)
+
+
+def put_blob(data: bytes, store_dir: str | Path | None = None) -> str:
+    """Store ``data`` under its SHA-256 unless it is already present and return the hash."""
+    sha256 = hashlib.sha256(data).hexdigest()
+    path = object_path(sha256, store_dir)
+    if not path.exists():
+        _atomic_write(path, data)
+    return sha256
+
+
+def read_blob(sha256: str, store_dir: str | Path | None = None) -> bytes:
+    return object_path(sha256, store_dir).read_bytes()
+
+
+@lru_cache(maxsize=4096)
+def _object_text(path: Path) -> str:
+    # Objects never change once written, so views of many hosts decode each one once.
+    return path.read_bytes().decode("utf-8")
+
+
+def normalize_output(data: bytes) -> str:
+    # Match the command module, which strips trailing newlines from captured output.
+    return data.decode("utf-8", errors="replace").rstrip("\r\n")
+
+
+def redaction_version() -> str:
+    """Return the version of the redaction pattern pack objects are redacted with."""
+    return load_pattern_pack().version
+
+
+def put_output(raw: bytes, store_dir: str | Path | None = None) -> tuple[str, bool]:
+    """Store redacted command output and return ``(object_sha256, redacted_now)``.
+
+    Redaction runs only the first time a given raw output is seen under the current
+    pattern pack; later hosts with the same bytes resolve through ``raw_index``.
+    """
+    raw_sha256 = hashlib.sha256(raw).hexdigest()
+    index = store_root(store_dir) / "raw_index" / redaction_version()[:16] / raw_sha256[:2] / raw_sha256
+    if index.exists():
+        sha256 = index.read_text(encoding="utf-8").strip()
+        if object_path(sha256, store_dir).exists():
+            return sha256, False
+    redacted, _ = redact_text(normalize_output(raw))
+    sha256 = put_blob(redacted.encode("utf-8"), store_dir)
+    _atomic_write(index, sha256.encode("utf-8"))
+    return sha256, True
+
+
+def manifest_path(run: str, host: str, store_dir: str | Path | None = None) -> Path:
+    return store_root(store_dir) / "manifests" / run / f"{host}.json"
+
+
+def write_manifest(run: str, manifest: dict[str, Any], store_dir: str | Path | None = None) -> Path:
+    path = manifest_path(run, manifest["host"], store_dir)
+    _atomic_write(path, json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+    return path
+
+
+def load_manifests(run: str, store_dir: str | Path | None = None) -> list[dict[str, Any]]:
+    run_dir = store_root(store_dir) / "manifests" / run
+    return [json.loads(path.read_text(encoding="utf-8")) for path in sorted(run_dir.glob("*.json"))]
+
+
+def list_runs(store_dir: str | Path | None = None) -> list[str]:
+    """Return the run IDs in the store, oldest first (``evidence-<UTC stamp>`` sorts by time)."""
+    manifests = store_root(store_dir) / "manifests"
+    return sorted(path.name for path in manifests.iterdir() if path.is_dir()) if manifests.is_dir() else []
+
+
+def previous_manifest(host: str, run: str, store_dir: str | Path | None = None) -> dict[str, Any] | None:
+    """Return the newest manifest of ``host`` from a run before ``run``."""
+    for previous in reversed([name for name in list_runs(store_dir) if name < run]):
+        path = manifest_path(previous, host, store_dir)
+        if path.exists():
+            return json.loads(path.read_text(encoding="utf-8"))
+    return None
+
+
+def _objects_exist(artifact: dict[str, Any], store_dir: str | Path | None) -> bool:
+    return all(
+        object_path(artifact[stream], store_dir).exists() for stream in ("stdout", "stderr") if artifact.get(stream)
+    )
+
+
+def reusable(artifact: dict[str, Any], store_dir: str | Path | None = None) -> bool:
+    """Whether a later run may link to ``artifact``'s objects instead of collecting it again."""
+    return (
+        not artifact.get("timed_out")
+        and artifact.get("redaction_version") == redaction_version()
+        and _objects_exist(artifact, store_dir)
+    )
+
+
+def latest_fingerprints(store_dir: str | Path | None = None) -> dict[str, dict[str, str]]:
+    """Return ``{host: {artifact_id: fingerprint}}`` from each host's newest manifest.
+
+    Only artifacts whose objects are still in the store are listed, so a host is never told
+    to skip output the controller can no longer link. Output of a timed-out command is
+    partial, and output redacted with another pattern pack may hold secrets the current
+    one removes; neither is offered for reuse.
+    """
+    fingerprints: dict[str, dict[str, str]] = {}
+    for run in reversed(list_runs(store_dir)):
+        for manifest in load_manifests(run, store_dir):
+            if manifest["host"] in fingerprints:
+                continue
+            fingerprints[manifest["host"]] = {
+                artifact["id"]: artifact["fingerprint"]
+                for artifact in manifest.get("artifacts", [])
+                if artifact.get("fingerprint") and reusable(artifact, store_dir)
+            }
+    return fingerprints
+
+
+def _header(artifact: dict[str, Any], manifest: dict[str, Any]) -> str:
+    lines = [
+        f"# command: {artifact['command']}",
+        f"# host: {manifest['host']}",
+        f"# zone: {manifest.get('zone', 'unknown')}",
+    ]
+    # A reused artifact keeps the time its output was actually collected.
+    lines.append(f"# collected: {artifact.get('collected') or manifest.get('collected', '')}")
+    return "\n".join(lines) + "\n"
+
+
+def _truncation_marker(limit: int | None) -> str:
+    if limit is None:
+        return ""
+    return f"# [truncated: output exceeded the {limit}-byte evidence cap; only the first {limit} bytes were collected]\n"
+
+
+def _timeout_marker(seconds: int | None) -> str:
+    if seconds is None:
+        return ""
+    return f"# [timed out: the command was stopped after {seconds} seconds; output above is partial]\n"
+
+
+def render_artifact(artifact: dict[str, Any], manifest: dict[str, Any], store_dir: str | Path | None = None) -> str:
+    """Return the auditor-facing file content of one artifact (shared by both views)."""
+    truncated = artifact.get("truncated") or {}
+    stdout = _object_text(object_path(artifact["stdout"], store_dir))
+    content = _header(artifact, manifest) + stdout + "\n" + _truncation_marker(truncated.get("stdout"))
+    content += _timeout_marker(artifact.get("timed_out"))
+    if artifact.get("stderr"):
+        stderr = _object_text(object_path(artifact["stderr"], store_dir))
+        if stderr:
+            content += f"# stderr:\n{stderr}\n" + _truncation_marker(truncated.get("stderr"))
+    return content
+
+
+def _link(source: Path, path: Path) -> bool:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.unlink(missing_ok=True)
+    try:
+        os.link(source, path)
+    except OSError:
+        return False
+    return True
+
+
+def _write_family_indexes(output_root: Path, entries: dict[str, list[tuple[str, str]]]) -> int:
+    for family, rows in entries.items():
+        path = output_root / "by_family" / family / FAMILY_INDEX_NAME
+        path.parent.mkdir(parents=True, exist_ok=True)
+        lines = [f"# {family} evidence; each entry is <host>_<file> -> <path relative to this file>"]
+        lines += [f"{name} -> {target}" for name, target in sorted(rows)]
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return len(entries)
+
+
+def materialize(
+    run: str,
+    output_root: str | Path,
+    store_dir: str | Path | None = None,
+    views: Iterable[str] = VIEWS,
+    family_view: str = "link",
+) -> dict[str, int]:
+    """Write the requested views of ``run`` under ``output_root``.
+
+    Returns counts of physical ``files`` written, ``links`` created and family ``indexes``.
+    ``by_family`` falls back to a real file per artifact when ``by_system`` is not written
+    or the filesystem refuses the hardlink.
+    """
+    output_root = Path(output_root)
+    views = set(views)
+    counts = {"files": 0, "links": 0, "indexes": 0}
+    index_entries: dict[str, list[tuple[str, str]]] = {}
+    for manifest in load_manifests(run, store_dir):
+        host = manifest["host"]
+        for artifact in manifest.get("artifacts", []):
+            system_path = output_root / "by_system" / host / artifact["filename"]
+            if "by_system" in views:
+                system_path.parent.mkdir(parents=True, exist_ok=True)
+                system_path.write_text(render_artifact(artifact, manifest, store_dir), encoding="utf-8")
+                counts["files"] += 1
+            if "by_family" not in views:
+                continue
+            family_name = f"{host}_{artifact['filename']}"
+            if "by_system" in views and family_view == "index":
+                target = f"../../by_system/{host}/{artifact['filename']}"
+                index_entries.setdefault(artifact["family"], []).append((family_name, target))
+                continue
+            path = output_root / "by_family" / artifact["family"] / family_name
+            if "by_system" in views and _link(system_path, path):
+                counts["links"] += 1
+                continue
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(render_artifact(artifact, manifest, store_dir), encoding="utf-8")
+            counts["files"] += 1
+        if "inventory" in views and "inventory" in manifest:
+            path = output_root / "inventory" / f"{host}.json"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(manifest["inventory"], indent=4, sort_keys=True), encoding="utf-8")
+            counts["files"] += 1
+    counts["indexes"] = _write_family_indexes(output_root, index_entries)
+    return counts
+
+
+def run_stats(run: str, store_dir: str | Path | None = None) -> dict[str, Any]:
+    """Return references, unique objects, bytes and reused vs collected artifacts for ``run``."""
+    references = 0
+    logical = 0
+    unique: set[str] = set()
+    reused: dict[str, list[str]] = {}
+    collected = 0
+    for manifest in load_manifests(run, store_dir):
+        for artifact in manifest.get("artifacts", []):
+            if artifact.get("reused"):
+                reused.setdefault(manifest["host"], []).append(artifact["id"])
+            else:
+                collected += 1
+            for stream in ("stdout", "stderr"):
+                sha256 = artifact.get(stream)
+                if not sha256:
+                    continue
+                references += 1
+                logical += object_path(sha256, store_dir).stat().st_size
+                unique.add(sha256)
+    stored = sum(object_path(sha256, store_dir).stat().st_size for sha256 in unique)
+    return {
+        "run": run,
+        "references": references,
+        "unique_objects": len(unique),
+        "logical_bytes": logical,
+        "stored_bytes": stored,
+        "artifacts_collected": collected,
+        "artifacts_reused": sum(len(ids) for ids in reused.values()),
+        "reused_by_host": reused,
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Materialize or inspect the SSP evidence store")
+    parser.add_argument(
+        "--store-dir",
+        type=Path,
+        default=None,
+        help="Evidence store (default: $EVIDENCE_STORE or data/evidence_store)",
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    materialize_parser = subparsers.add_parser("materialize", help="Write auditor views for one run")
+    materialize_parser.add_argument("run", help="Run ID (the evidence-<stamp> directory name)")
+    materialize_parser.add_argument("output_root", type=Path, help="Directory to write views into")
+    materialize_parser.add_argument(
+        "--view", action="append", choices=VIEWS, default=None, help="View to write (repeatable; default all)"
+    )
+    materialize_parser.add_argument(
+        "--family-view",
+        choices=FAMILY_VIEWS,
+        default="link",
+        help="by_family as hardlinks into by_system (default) or as a generated index per family",
+    )
+
+    stats_parser = subparsers.add_parser("stats", help="Show deduplication statistics for one run")
+    stats_parser.add_argument("run", help="Run ID")
+
+    subparsers.add_parser(
+        "fingerprints", help="Print each host's latest artifact fingerprints as JSON (for incremental collection)"
+    )
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    if args.command == "fingerprints":
+        print(json.dumps(latest_fingerprints(args.store_dir), sort_keys=True))
+        return 0
+    if not (store_root(args.store_dir) / "manifests" / args.run).is_dir():
+        print(f"ERROR: no manifests for run {args.run}", file=sys.stderr)
+        return 1
+    if args.command == "materialize":
+        counts = materialize(args.run, args.output_root, args.store_dir, args.view or VIEWS, args.family_view)
+        print(
+            f"Materialized {counts['files']} file(s), {counts['links']} hardlink(s) and "
+            f"{counts['indexes']} family index(es) for {args.run} into {args.output_root}"
+        )
+        return 0
+
+    print(json.dumps(run_stats(args.run, args.store_dir), indent=2, sort_keys=True))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
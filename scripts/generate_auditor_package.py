@@ -6,6 +6,7 @@ import csv
 import json
 import shutil
 import subprocess
+import sys
 import tarfile
 from datetime import datetime, timezone
 from pathlib import Path
@@ -14,6 +15,11 @@ from typing import Any
 import yaml
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import evidence_catalog  # noqa: E402
 
 
 def parse_args() -> argparse.Namespace:
@@ -97,7 +103,27 @@ def _copy_tree_if_exists(source: Path, destination: Path) -> int:
     return count
 
 
-def _manifest(path: Path, package_dir: Path, total_controls: int) -> None:
+def _evidence_summary(catalog_path: Path | None, destination: Path) -> dict[str, Any] | None:
+    """Copy the latest evidence catalog into the package and summarize it without a tree walk."""
+    if catalog_path is None:
+        return None
+    _copy_tree_if_exists(catalog_path, destination)
+    connection, _ = evidence_catalog.open_catalog(catalog_path.parent)
+    try:
+        rows = evidence_catalog.query(connection)
+    finally:
+        connection.close()
+    return {
+        "catalog": destination.name,
+        "run": catalog_path.parent.name,
+        "files": len(rows),
+        "bytes": sum(row["size"] or 0 for row in rows),
+        "hosts": len({row["host"] for row in rows if row["host"]}),
+        "families": sorted({row["family"] for row in rows if row["family"]}),
+    }
+
+
+def _manifest(path: Path, package_dir: Path, total_controls: int, evidence: dict[str, Any] | None) -> None:
     files = [str(p.relative_to(package_dir)) for p in sorted(package_dir.rglob("*")) if p.is_file()]
     payload: dict[str, Any] = {
         "package_id": datetime.now(timezone.utc).strftime("pkg-%Y%m%d%H%M%S"),
@@ -105,6 +131,7 @@ def _manifest(path: Path, package_dir: Path, total_controls: int) -> None:
         "cmmc_level": "Level 2",
         "total_controls": total_controls,
         "files": files,
+        "evidence": evidence,
     }
     path.write_text(json.dumps(payload, indent=2), encoding="utf-8")
 
@@ -149,6 +176,11 @@ def main() -> int:
             "No evidence archive found. Run make evidence first.\n", encoding="utf-8"
         )
 
+    evidence = _evidence_summary(
+        evidence_catalog.find_catalog(REPO_ROOT / "docs" / "auditor_packages"),
+        sections["03_evidence"] / evidence_catalog.CATALOG_NAME,
+    )
+
     sprs_report = _latest("reports/sprs_*.md")
     if sprs_report:
         _copy_tree_if_exists(sprs_report, sections["04_sprs"] / sprs_report.name)
@@ -163,7 +195,7 @@ def main() -> int:
     _copy_tree_if_exists(REPO_ROOT / "docs" / "odp_values.yml", sections["07_odp_values"] / "odp_values.yml")
 
     manifest_path = package_dir / "manifest.json"
-    _manifest(manifest_path, package_dir, total_controls)
+    _manifest(manifest_path, package_dir, total_controls, evidence)
 
     tar_path = output_dir / f"{stamp}.tar.gz"
     _compress(package_dir, tar_path)
@@ -14,9 +14,12 @@ from jinja2 import Environment, FileSystemLoader, StrictUndefined
 
 REPO_ROOT = Path(__file__).resolve().parents[1]
 PLUGIN_DIR = REPO_ROOT / "plugins" / "filter"
-if str(PLUGIN_DIR) not in sys.path:
-    sys.path.insert(0, str(PLUGIN_DIR))
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+for path in (PLUGIN_DIR, SCRIPTS_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
 
+import evidence_catalog  # noqa: E402
 import sprs  # noqa: E402
 
 
@@ -137,10 +140,11 @@ def _collect_narratives(path: Path) -> list[dict[str, str]]:
 
 
 def _collect_evidence_links(path: Path) -> list[dict[str, str]]:
-    if not path.exists():
-        return []
-    files = [p for p in sorted(path.rglob("*")) if p.is_file() and not p.name.startswith(".")]
-    return [{"label": p.name, "path": str(p)} for p in files[:75]]
+    catalog, root = evidence_catalog.open_catalog(path)
+    return [
+        {"label": Path(row["path"]).name, "path": str(root / row["path"])}
+        for row in evidence_catalog.query(catalog, limit=75)
+    ]
 
 
 def _environment() -> Environment:
@@ -15,6 +15,7 @@ REPO_ROOT = SCRIPT_DIR.parent
 if str(SCRIPT_DIR) not in sys.path:
     sys.path.insert(0, str(SCRIPT_DIR))
 
+import evidence_catalog  # noqa: E402
 from models import ControlMappingData, load_yaml_cached  # noqa: E402
 
 
@@ -66,20 +67,21 @@ def _slug(control_id: str) -> str:
     return control_id.replace(".", "_")
 
 
-def _find_evidence_refs(evidence_dir: Path, family: str) -> list[dict[str, str]]:
+def _display_path(path: Path) -> str:
+    try:
+        return str(path.relative_to(REPO_ROOT))
+    except ValueError:
+        return str(path)
+
+
+def _find_evidence_refs(catalog: Any, root: Path, control: Any) -> list[dict[str, str]]:
     refs: list[dict[str, str]] = []
-    if not evidence_dir.exists():
-        return refs
-
-    candidates = sorted(evidence_dir.rglob(f"*{family}*"))
-    for candidate in candidates[:5]:
-        if candidate.is_file():
-            refs.append(
-                {
-                    "file_path": str(candidate.relative_to(REPO_ROOT)),
-                    "description": f"Evidence artifact related to {family} control implementation",
-                }
-            )
+    for row in evidence_catalog.query(catalog, control_id=control.control_id, limit=5):
+        if row.get("command"):
+            description = f"Output of `{row['command']}` on {row['host']}, collected {row['collected']}"
+        else:
+            description = f"Evidence artifact related to {control.family} control implementation"
+        refs.append({"file_path": _display_path(root / row["path"]), "description": description})
     return refs
 
 
@@ -122,13 +124,14 @@ def main() -> int:
     output_dir = args.output_dir if args.output_dir.is_absolute() else REPO_ROOT / args.output_dir
     output_dir.mkdir(parents=True, exist_ok=True)
 
+    catalog, catalog_root = evidence_catalog.open_catalog(evidence_dir)
     generated_at = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
     for control in sorted(mapping.controls, key=lambda item: item.control_id):
         content = template.render(
             control=control,
             generated_at=generated_at,
             implementation_description=_implementation_description(control),
-            evidence_references=_find_evidence_refs(evidence_dir, control.family),
+            evidence_references=_find_evidence_refs(catalog, catalog_root, control),
         )
         output_file = output_dir / f"control_{_slug(control.control_id)}.md"
         output_file.write_text(content, encoding="utf-8")
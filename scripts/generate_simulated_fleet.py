@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+"""Generate an inventory of simulated hosts for local playbook benchmarking.
+
+Hosts use the `simulated` connection plugin (plugins/connection/simulated.py), so no
+machine is contacted. The inventory directory links `group_vars` to the real inventory so
+zone tailoring applies exactly as it does in production.
+"""
+from __future__ import annotations
+
+import argparse
+import os
+import random
+from pathlib import Path
+from typing import Any
+
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_OUTPUT_ROOT = REPO_ROOT / "data" / "benchmarks"
+INVENTORY_GROUP_VARS = REPO_ROOT / "inventory" / "group_vars"
+
+# Rough shape of an HPC enclave: mostly restricted compute nodes.
+DEFAULT_ZONE_WEIGHTS = {"restricted": 0.9, "internal": 0.05, "management": 0.02, "public": 0.03}
+ZONE_PREFIXES = {"restricted": "compute", "internal": "login", "management": "mgmt", "public": "web"}
+
+
+def parse_weights(text: str) -> dict[str, float]:
+    weights: dict[str, float] = {}
+    for part in text.split(","):
+        if not part.strip():
+            continue
+        zone, _, value = part.partition("=")
+        if zone.strip() not in ZONE_PREFIXES:
+            raise argparse.ArgumentTypeError(f"Unknown zone {zone!r}; expected one of {sorted(ZONE_PREFIXES)}")
+        weights[zone.strip()] = float(value)
+    if not weights or sum(weights.values()) <= 0:
+        raise argparse.ArgumentTypeError("Zone weights must include at least one positive weight")
+    return weights
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate a simulated fleet inventory")
+    parser.add_argument("--hosts", type=int, default=2000, help="Number of simulated hosts")
+    parser.add_argument(
+        "--output-dir",
+        type=Path,
+        default=None,
+        help="Inventory directory (default: data/benchmarks/fleet-<hosts>)",
+    )
+    parser.add_argument(
+        "--zones",
+        type=parse_weights,
+        default=DEFAULT_ZONE_WEIGHTS,
+        help="Zone weights, e.g. restricted=0.9,internal=0.05,management=0.02,public=0.03",
+    )
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="Base per-execution latency")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Maximum extra per-execution latency")
+    parser.add_argument("--drift-rate", type=float, default=0.02, help="Fraction of hosts on the drifted profile")
+    parser.add_argument("--slow-rate", type=float, default=0.01, help="Fraction of hosts on the slow profile")
+    parser.add_argument("--unreachable-rate", type=float, default=0.005, help="Fraction of unreachable hosts")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="Per-command random failure rate")
+    parser.add_argument("--model", type=Path, default=None, help="Fleet model YAML for the connection plugin")
+    parser.add_argument("--seed", default="rcd-cui", help="Seed for host assignment and failure injection")
+    return parser.parse_args()
+
+
+def _zone_counts(total: int, weights: dict[str, float]) -> dict[str, int]:
+    scale = sum(weights.values())
+    counts = {zone: int(total * weight / scale) for zone, weight in weights.items()}
+    # Hand the rounding remainder to the heaviest zone.
+    counts[max(weights, key=weights.get)] += total - sum(counts.values())
+    return counts
+
+
+def build_inventory(
+    hosts: int,
+    zones: dict[str, float] | None = None,
+    latency_ms: float = 20.0,
+    jitter_ms: float = 10.0,
+    drift_rate: float = 0.02,
+    slow_rate: float = 0.01,
+    unreachable_rate: float = 0.005,
+    failure_rate: float = 0.0,
+    model: Path | None = None,
+    seed: str = "rcd-cui",
+) -> dict[str, Any]:
+    """Return an Ansible YAML inventory describing ``hosts`` simulated nodes."""
+    rng = random.Random(seed)
+    fleet_vars: dict[str, Any] = {
+        "ansible_connection": "simulated",
+        "ansible_become": False,
+        "ansible_python_interpreter": "/usr/bin/python3",
+        "ansible_simulated_latency_ms": latency_ms,
+        "ansible_simulated_jitter_ms": jitter_ms,
+        "ansible_simulated_failure_rate": failure_rate,
+        "ansible_simulated_seed": seed,
+    }
+    if model is not None:
+        fleet_vars["ansible_simulated_model"] = str(model.resolve())
+
+    children: dict[str, Any] = {}
+    for zone, count in _zone_counts(hosts, zones or DEFAULT_ZONE_WEIGHTS).items():
+        members: dict[str, Any] = {}
+        for index in range(1, count + 1):
+            host_vars: dict[str, Any] = {}
+            draw = rng.random()
+            if draw < drift_rate:
+                host_vars["ansible_simulated_profile"] = "drifted"
+            elif draw < drift_rate + slow_rate:
+                host_vars["ansible_simulated_profile"] = "slow"
+            if rng.random() < unreachable_rate:
+                host_vars["ansible_simulated_unreachable"] = True
+            members[f"sim-{ZONE_PREFIXES[zone]}{index:05d}"] = host_vars or None
+        if members:
+            children[zone] = {"hosts": members}
+
+    return {"all": {"vars": fleet_vars, "children": children}}
+
+
+def write_inventory(inventory: dict[str, Any], output_dir: Path) -> Path:
+    """Write ``hosts.yml`` into ``output_dir`` and link the real group_vars beside it."""
+    output_dir.mkdir(parents=True, exist_ok=True)
+    inventory_file = output_dir / "hosts.yml"
+    inventory_file.write_text(
+        "---\n# Generated by scripts/generate_simulated_fleet.py\n"
+        + yaml.safe_dump(inventory, sort_keys=False, default_flow_style=False),
+        encoding="utf-8",
+    )
+    group_vars = output_dir / "group_vars"
+    if not group_vars.exists():
+        group_vars.symlink_to(os.path.relpath(INVENTORY_GROUP_VARS, output_dir), target_is_directory=True)
+    return inventory_file
+
+
+def main() -> int:
+    args = parse_args()
+    output_dir = args.output_dir or DEFAULT_OUTPUT_ROOT / f"fleet-{args.hosts}"
+    inventory = build_inventory(
+        args.hosts,
+        zones=args.zones,
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        drift_rate=args.drift_rate,
+        slow_rate=args.slow_rate,
+        unreachable_rate=args.unreachable_rate,
+        failure_rate=args.failure_rate,
+        model=args.model,
+        seed=args.seed,
+    )
+    inventory_file = write_inventory(inventory, output_dir)
+    print(f"Simulated fleet of {args.hosts} hosts written to {inventory_file}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,33 +1,82 @@
 #!/usr/bin/env python3
-"""Redact secrets from evidence artifacts while preserving file structure."""
+"""Redact secrets from evidence artifacts while preserving file structure.
+
+Secret patterns come from a YAML pattern pack (`data/redaction_patterns.yml`, or
+`--patterns`). They are applied one after another, each to the output of the one before,
+so a match of one pattern never hides a secret from an earlier one. Each pattern lists
+the literals its matches start with (`password`, `-----begin`, `akia`, ...), and its regex
+is only tried where one of them occurs, so text without any of them costs one lowercase
+copy and a few substring searches.
+
+Directories are redacted in a process pool (`--jobs`, default: one worker per CPU). Files
+are handed to workers in chunks of roughly `CHUNK_BYTES`, so thousands of small evidence
+files cost a few round trips instead of one each, while a large log is a chunk of its own.
+
+Files are redacted as a stream: text is read in `STREAM_CHUNK_CHARS` pieces and only the
+part up to a safe line boundary is redacted and written, so memory does not grow with the
+file. Every pattern is its own stage over the previous stage's output, and a boundary is
+safe for a stage when no match of its pattern can cross it: it is not inside an open
+block (`block_begin`, e.g. `BEGIN ... PRIVATE KEY`) and does not follow text a match may
+continue from (`continues_after`, e.g. a keyword or `=`/`:` with its value on the next
+line). A block with no end within `STREAM_CARRY_LIMIT` characters is given up on, as is
+a single line longer than that limit.
+
+Results are cached by input SHA-256 under the pattern pack version in
+`$REDACTION_CACHE` (default `data/redaction_cache`): the redaction count and the SHA-256
+of the output. A file whose redacted output is already in place is neither scanned nor
+rewritten, so its mtime survives for later incremental steps (checksums, retention).
+`--clear-cache` invalidates every cached result; editing the pattern pack invalidates
+them implicitly.
+
+Compressed files (`.gz`, `.xz`, and `.zst` when the `zstandard` module is installed) are
+decompressed, redacted and recompressed in one streaming pass, and tar archives (plain or
+compressed) are rewritten member by member without extracting them to disk: only the
+member being redacted is held, in memory up to `MEMBER_SPOOL_BYTES` and in a temporary
+file beyond that. Rotated logs (`slurmctld.log.1`, `secure-20261019.gz`) count as text by
+the name before the rotation suffix. A compressed file or archive without secrets is
+left byte for byte as it was.
+"""
 from __future__ import annotations
 
 import argparse
+import bisect
+import codecs
+import copy
+import gzip
+import hashlib
+import io
+import json
+import lzma
+import os
 import re
-from pathlib import Path
-from typing import Iterable
-
-REDACTION_PATTERNS: list[tuple[re.Pattern[str], str | re.Callable[[re.Match[str]], str]]] = [
-    (
-        re.compile(
-            r"(?im)\b(password|passwd|secret|token|credential)\b(\s*[=:]\s*)([\"']?)([^\"'\s#]+)(\3)"
-        ),
-        lambda m: f"{m.group(1)}{m.group(2)}{m.group(3)}[REDACTED]{m.group(3)}",
-    ),
-    (
-        re.compile(r"(?im)\b(api[_-]?key|apikey|access_key|secret_key)\b(\s*[=:]\s*)([\"']?)([^\"'\s#]+)(\3)"),
-        lambda m: f"{m.group(1)}{m.group(2)}{m.group(3)}[REDACTED]{m.group(3)}",
-    ),
-    (
-        re.compile(r"(?s)-----BEGIN[ A-Z]*PRIVATE KEY-----.*?-----END[ A-Z]*PRIVATE KEY-----"),
-        "[REDACTED PRIVATE KEY]",
-    ),
-    (re.compile(r"\b(?:AKIA|ABIA|ACCA|ASIA)[A-Z0-9]{16}\b"), "[REDACTED]"),
-    (
-        re.compile(r"(?im)\b(ikey|skey)\b(\s*[=:]\s*)([A-Za-z0-9]{20,})"),
-        lambda m: f"{m.group(1)}{m.group(2)}[REDACTED]",
-    ),
-]
+import shutil
+import sys
+import tarfile
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache, partial
+from pathlib import Path, PurePosixPath
+from typing import IO, Any, Iterable, Iterator
+
+import yaml
+
+try:
+    import zstandard
+except ImportError:  # optional: .zst files are skipped without it
+    zstandard = None
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+REPO_ROOT = SCRIPTS_DIR.parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from build_checksum_manifest import sha256_file  # noqa: E402
+
+DEFAULT_PATTERN_PACK = REPO_ROOT / "data" / "redaction_patterns.yml"
+DEFAULT_CACHE_DIR = REPO_ROOT / "data" / "redaction_cache"
+PATTERN_FLAGS = {"ignorecase": "i", "dotall": "s"}
 
 TEXT_FILE_SUFFIXES = {
     ".txt",
@@ -47,85 +96,751 @@ TEXT_FILE_SUFFIXES = {
     "",
 }
 
+DEFAULT_JOBS = os.cpu_count() or 1
+CHUNK_BYTES = 4 * 1024 * 1024
+STREAM_CHUNK_CHARS = 1024 * 1024
+STREAM_CARRY_LIMIT = 16 * 1024 * 1024
+# Longest text a `continues_after` expression needs to see before a line break.
+CONTINUATION_WINDOW = 64
+MEMBER_SPOOL_BYTES = 16 * 1024 * 1024
+# Name suffix -> (compression, whether the file is always a tar archive).
+PACKED_SUFFIXES = {
+    ".tar": (None, True),
+    ".gz": ("gzip", False),
+    ".tgz": ("gzip", True),
+    ".xz": ("xz", False),
+    ".txz": ("xz", True),
+    ".zst": ("zstd", False),
+    ".tzst": ("zstd", True),
+}
+ROTATION_SUFFIX = re.compile(r"\.\d+$")
+GROUP_REFERENCE = re.compile(r"\\(?:g<(\w+)>|(\d{1,2}))")
 
-def redact_text(text: str) -> tuple[str, int]:
-    redaction_count = 0
-    updated = text
-    for pattern, replacement in REDACTION_PATTERNS:
-        updated, count = pattern.subn(replacement, updated)
-        redaction_count += count
-    return updated, redaction_count
 
+@dataclass(frozen=True)
+class RedactionPattern:
+    id: str
+    regex: str
+    replacement: str
+    literals: tuple[str, ...]
+    flags: tuple[str, ...] = ()
+    continues_after: str | None = None
+    block_begin: str | None = None
 
-def redact_file(source_file: Path, destination_file: Path | None = None) -> int:
-    """Redact one file and return number of replacements applied."""
+    def scoped(self, source: str) -> str:
+        flags = "".join(PATTERN_FLAGS[flag] for flag in self.flags)
+        return f"(?{flags}:{source})" if flags else f"(?:{source})"
+
+
+class PatternPack:
+    """Redaction patterns applied pass by pass, in order, behind one literal prefilter."""
+
+    def __init__(self, patterns: list[RedactionPattern], version: str) -> None:
+        self.patterns = patterns
+        self.version = version
+        for pattern in patterns:
+            if not pattern.literals:
+                raise ValueError(f"redaction pattern {pattern.id}: at least one literal is required")
+        self.regexes = [re.compile(pattern.scoped(pattern.regex)) for pattern in patterns]
+        self._continues = [
+            re.compile(f"{pattern.scoped(pattern.continues_after)}\\Z") if pattern.continues_after else None
+            for pattern in patterns
+        ]
+        self._block_begin = [
+            re.compile(pattern.scoped(pattern.block_begin)) if pattern.block_begin else None for pattern in patterns
+        ]
+        owners: dict[str, set[int]] = {}
+        for index, pattern in enumerate(patterns):
+            for literal in pattern.literals:
+                owners.setdefault(literal.lower(), set()).add(index)
+        # The prefilter reports the longest literal at a position; the patterns of every
+        # shorter literal that is a prefix of it (secret in secret_key) hit there too.
+        self._hit_patterns = {
+            literal: tuple(sorted({index for other in owners if literal.startswith(other) for index in owners[other]}))
+            for literal in owners
+        }
+        self._prefilter = re.compile(_literal_trie(list(owners)))
+        self._reach = max(len(literal) for literal in owners) - 1
+        self._templates = [_parse_template(pattern.replacement) for pattern in patterns]
+
+    def literal_hits(self, text: str, start: int = 0, end: int | None = None) -> dict[int, list[int]] | None:
+        """Map each pattern index to the offsets in ``text[start:end]`` where one of its literals starts.
+
+        One scan of all literals over the lowercased text. Returns None when lowercasing
+        changes the text length (a few non-ASCII characters), so offsets would not line up.
+        """
+        end = len(text) if end is None else end
+        lowered = text[start:end].lower()
+        if len(lowered) != end - start:
+            return None
+        hits: dict[int, list[int]] = {}
+        search = self._prefilter.search
+        match = search(lowered)
+        while match:
+            for index in self._hit_patterns[match.group()]:
+                hits.setdefault(index, []).append(start + match.start())
+            # Literals may overlap (a password inside MyPassword_token), so resume one further.
+            match = search(lowered, match.start() + 1)
+        return hits
+
+    def finditer(
+        self, index: int, text: str, start: int = 0, end: int | None = None, positions: list[int] | None = None
+    ) -> Iterator[re.Match[str]]:
+        """Yield the matches ``regexes[index].finditer`` would, trying the regex only at literal hits.
+
+        ``positions`` are this pattern's literal hits in ``text`` when the caller already has them.
+        """
+        end = len(text) if end is None else end
+        regex = self.regexes[index]
+        if positions is None:
+            hits = self.literal_hits(text, start, end)
+            if hits is None:
+                yield from regex.finditer(text, start, end)
+                return
+            positions = hits.get(index, [])
+        position = start
+        for hit in positions:
+            if hit >= end:
+                break
+            if hit < position:
+                continue
+            match = regex.match(text, hit, end)
+            if match:
+                yield match
+                position = match.end()
+
+    def edit(
+        self, index: int, text: str, positions: list[int] | None = None
+    ) -> tuple[str, list[tuple[int, int, int]]]:
+        """Apply pattern ``index`` to ``text``; return it with each replaced ``(start, end, new length)``."""
+        replacement = self.patterns[index].replacement
+        template = self._templates[index]
+        parts: list[str] = []
+        edits: list[tuple[int, int, int]] = []
+        last = 0
+        for match in self.finditer(index, text, positions=positions):
+            if template is None:
+                redacted = match.expand(replacement)
+            else:
+                redacted = "".join(part if isinstance(part, str) else match.group(part) or "" for part in template)
+            parts += [text[last : match.start()], redacted]
+            edits.append((match.start(), match.end(), len(redacted)))
+            last = match.end()
+        if not parts:
+            return text, edits
+        parts.append(text[last:])
+        return "".join(parts), edits
+
+    def sub(self, index: int, text: str, positions: list[int] | None = None) -> tuple[str, int]:
+        """Apply pattern ``index`` to ``text`` like ``regexes[index].subn``."""
+        text, edits = self.edit(index, text, positions)
+        return text, len(edits)
+
+    def shift_hits(
+        self, hits: dict[int, list[int]], edits: list[tuple[int, int, int]], text: str, after: int = -1
+    ) -> dict[int, list[int]] | None:
+        """Move the hits of patterns after ``after`` past ``edits`` into the edited ``text``.
+
+        Hits a literal could share with an edited span are dropped, and only the text
+        around each edit is scanned again, so a replacement never costs a full rescan.
+        """
+        spans = []
+        delta = 0
+        for start, end, length in edits:
+            spans.append((start - self._reach, end, start + delta - self._reach, start + delta + length))
+            delta += length - (end - start)
+        shifted: dict[int, list[int]] = {}
+        for index, positions in hits.items():
+            if index <= after:
+                continue
+            kept = []
+            span, delta = 0, 0
+            for hit in positions:
+                while span < len(spans) and hit >= spans[span][1]:
+                    delta = spans[span][3] - spans[span][1]
+                    span += 1
+                if span < len(spans) and hit >= spans[span][0]:
+                    continue
+                kept.append(hit + delta)
+            shifted[index] = kept
+        windows: list[list[int]] = []
+        for _, _, start, end in spans:
+            if windows and start <= windows[-1][1]:
+                windows[-1][1] = end
+            else:
+                windows.append([max(start, 0), end])
+        for start, end in windows:
+            found = self.literal_hits(text, start, min(len(text), end + self._reach))
+            if found is None:
+                return None
+            for index, positions in found.items():
+                if index > after:
+                    shifted.setdefault(index, []).extend(hit for hit in positions if hit < end)
+        return {index: sorted(positions) for index, positions in shifted.items() if positions}
+
+    def redact(self, text: str) -> tuple[str, int]:
+        count = 0
+        hits = self.literal_hits(text)
+        for index in range(len(self.patterns)):
+            if hits is not None and index not in hits:
+                continue
+            text, edits = self.edit(index, text, None if hits is None else hits[index])
+            if edits:
+                count += len(edits)
+                # Later patterns see earlier replacements, exactly as separate passes would.
+                hits = None if hits is None else self.shift_hits(hits, edits, text, index)
+        return text, count
+
+    def _open_block(self, index: int, buffer: str, end: int, positions: list[int] | None = None) -> int | None:
+        """Return the first block start in ``buffer[:end]`` that no match of pattern ``index`` covers."""
+        block_begin = self._block_begin[index]
+        if block_begin is None:
+            return None
+        spans = iter([match.span() for match in self.finditer(index, buffer, 0, end, positions)])
+        span = next(spans, None)
+        for begin in block_begin.finditer(buffer, 0, end):
+            while span is not None and span[1] <= begin.start():
+                span = next(spans, None)
+            # A whole block would have matched here; an uncovered start is still open.
+            if span is None or begin.start() < span[0]:
+                return begin.start()
+        return None
+
+    def safe_cut(self, index: int, buffer: str, positions: list[int] | None = None) -> int:
+        """Return the end of the longest prefix of ``buffer`` pattern ``index`` redacts like the whole text."""
+        end = buffer.rfind("\n") + 1
+        continues = self._continues[index]
+        while end:
+            open_block = self._open_block(index, buffer, end, positions)
+            if open_block is not None:
+                end = buffer.rfind("\n", 0, open_block) + 1
+                continue
+            tail = buffer[max(0, end - 4096) : end].rstrip()[-CONTINUATION_WINDOW:]
+            if continues is not None and continues.search(tail):
+                end = buffer.rfind("\n", 0, end - 1) + 1
+                continue
+            return end
+        return 0
+
+
+def _parse_template(replacement: str) -> list[str | int] | None:
+    """Split a replacement into text and group references once, instead of on every match.
+
+    Returns None for templates with other escapes; those still go through ``Match.expand``.
+    """
+    parts: list[str | int] = []
+    last = 0
+    for reference in GROUP_REFERENCE.finditer(replacement):
+        parts.append(replacement[last : reference.start()])
+        name = reference.group(1) or reference.group(2)
+        parts.append(int(name) if name.isdigit() else name)
+        last = reference.end()
+    parts.append(replacement[last:])
+    if any(isinstance(part, str) and "\\" in part for part in parts):
+        return None
+    return parts
+
+
+def _literal_trie(literals: list[str]) -> str:
+    """Return one regex matching the longest of ``literals`` at a position, factored as a trie."""
+    trie: dict[str, Any] = {}
+    for literal in literals:
+        node = trie
+        for char in literal:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def render(node: dict[str, Any]) -> str:
+        branches = [re.escape(char) + render(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        group = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        if "" not in node:
+            return group
+        return f"{group}?" if len(branches) == 1 and len(branches[0]) == 1 else f"(?:{'|'.join(branches)})?"
+
+    return render(trie)
+
+
+@lru_cache(maxsize=8)
+def load_pattern_pack(path: str | Path = DEFAULT_PATTERN_PACK) -> PatternPack:
+    """Compile the pattern pack at ``path``; its version is the SHA-256 of the file."""
+    raw = Path(path).read_bytes()
+    data = yaml.safe_load(raw) or {}
+    patterns = []
+    for entry in data.get("patterns") or []:
+        unknown = set(entry.get("flags") or []) - set(PATTERN_FLAGS)
+        if unknown:
+            raise ValueError(f"{path}: pattern {entry.get('id')} has unknown flags {sorted(unknown)}")
+        patterns.append(
+            RedactionPattern(
+                id=str(entry["id"]),
+                regex=str(entry["regex"]),
+                replacement=str(entry["replacement"]),
+                literals=tuple(str(literal) for literal in entry.get("literals") or []),
+                flags=tuple(entry.get("flags") or []),
+                continues_after=entry.get("continues_after"),
+                block_begin=entry.get("block_begin"),
+            )
+        )
+    if not patterns:
+        raise ValueError(f"{path} defines no redaction patterns")
+    return PatternPack(patterns, hashlib.sha256(raw).hexdigest())
+
+
+def redact_text(text: str, pack: PatternPack | None = None) -> tuple[str, int]:
+    return (pack or load_pattern_pack()).redact(text)
+
+
+def redact_stream(
+    source: IO[str],
+    destination: IO[str],
+    chunk_chars: int = STREAM_CHUNK_CHARS,
+    pack: PatternPack | None = None,
+) -> int:
+    """Redact ``source`` into ``destination`` with bounded memory; return the replacement count.
+
+    The output is identical to ``redact_text`` over the whole input. Each pattern is a
+    stage with its own carried text: it redacts the output of the stage before it, up to
+    the last line break none of its own matches can cross.
+    """
+    pack = pack or load_pattern_pack()
+    carries = [""] * len(pack.patterns)
+    count = 0
+    while True:
+        chunk = source.read(chunk_chars)
+        # A short read is the end of the input.
+        final = len(chunk) < chunk_chars
+        # Stage i holds the text just before stage i-1's carry, so until a stage replaces
+        # something, every stage buffer is a slice of this pipeline: one literal scan serves all.
+        pipeline = "".join(reversed(carries)) + chunk
+        hits = pack.literal_hits(pipeline)
+        offset = len(pipeline) - len(chunk)
+        text = chunk
+        for index, carry in enumerate(carries):
+            buffer = carry + text
+            offset -= len(carry)
+            positions = None
+            if hits is not None:
+                found = hits.get(index, [])
+                first = bisect.bisect_left(found, offset)
+                last = bisect.bisect_left(found, offset + len(buffer))
+                positions = [hit - offset for hit in found[first:last]]
+            if final:
+                cut = len(buffer)
+            else:
+                cut = pack.safe_cut(index, buffer, positions)
+                if not cut and len(buffer) >= STREAM_CARRY_LIMIT:
+                    cut = buffer.rfind("\n") + 1 or len(buffer)
+            text, edits = pack.edit(index, buffer[:cut], positions)
+            if edits and hits is not None:
+                count += len(edits)
+                pipeline = pipeline[:offset] + text + pipeline[offset + cut :]
+                edits = [(start + offset, end + offset, length) for start, end, length in edits]
+                hits = pack.shift_hits(hits, edits, pipeline, index)
+            else:
+                count += len(edits)
+            carries[index] = buffer[cut:]
+        destination.write(text)
+        if final:
+            return count
+
+
+def cache_root(cache_dir: str | Path | None = None) -> Path:
+    root = Path(cache_dir or os.environ.get("REDACTION_CACHE") or DEFAULT_CACHE_DIR)
+    return root if root.is_absolute() else REPO_ROOT / root
+
+
+class RedactionCache:
+    """Redaction results keyed by input SHA-256, one JSON entry per input under the pack version."""
+
+    def __init__(self, cache_dir: str | Path | None, pack_version: str) -> None:
+        self.root = cache_root(cache_dir) / pack_version[:16]
+
+    def _path(self, digest: str) -> Path:
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def get(self, digest: str) -> dict[str, Any] | None:
+        try:
+            return json.loads(self._path(digest).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, digest: str, count: int, output_sha256: str) -> None:
+        path = self._path(digest)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump({"count": count, "output_sha256": output_sha256}, handle)
+        os.replace(tmp_name, path)
+
+
+def clear_cache(cache_dir: str | Path | None = None) -> int:
+    """Remove every cached redaction result and return how many there were."""
+    root = cache_root(cache_dir)
+    entries = sum(1 for _ in root.glob("*/*/*.json"))
+    for version_dir in root.iterdir() if root.is_dir() else []:
+        if version_dir.is_dir():
+            shutil.rmtree(version_dir)
+    return entries
+
+
+def _is_text_name(name: str) -> bool:
+    if Path(name).suffix.lower() in TEXT_FILE_SUFFIXES:
+        return True
+    # Rotated logs keep their type before the rotation number (slurmctld.log.1, messages.1).
+    return Path(ROTATION_SUFFIX.sub("", name)).suffix.lower() in TEXT_FILE_SUFFIXES
+
+
+def _packing(path: Path) -> tuple[str | None, bool] | None:
+    """Return ``(compression, is_tar)`` for a compressed file or tar archive, else None."""
+    name = path.name.lower()
+    suffix = Path(name).suffix
+    if suffix not in PACKED_SUFFIXES:
+        return None
+    compression, is_tar = PACKED_SUFFIXES[suffix]
+    return compression, is_tar or name[: -len(suffix)].endswith(".tar")
+
+
+@contextmanager
+def _open_packed(path: Path, mode: str, compression: str | None, name: str = "") -> Iterator[IO[bytes]]:
+    """Open ``path`` (``rb`` or ``wb``) as one stream through its compression."""
+    with path.open(mode) as raw:
+        if compression == "gzip":
+            # A fixed mtime keeps recompressed output reproducible, so the cache sees it unchanged.
+            stream = gzip.GzipFile(filename=name, mode=mode, fileobj=raw, compresslevel=6, mtime=0)
+        elif compression == "xz":
+            stream = lzma.LZMAFile(raw, mode)
+        elif compression == "zstd":
+            if zstandard is None:
+                raise RuntimeError(f"{path}: the zstandard module is required for .zst files")
+            if mode == "rb":
+                stream = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+            else:
+                stream = zstandard.ZstdCompressor().stream_writer(raw)
+        else:
+            yield raw
+            return
+        with stream:
+            yield stream
+
+
+def _redact_compressed(
+    source_file: Path, destination_file: Path, compression: str, name: str, pack: PatternPack | None
+) -> int:
+    with _open_packed(source_file, "rb", compression) as packed_source, _open_packed(
+        destination_file, "wb", compression, name
+    ) as packed_destination:
+        source = io.TextIOWrapper(packed_source, encoding="utf-8", errors="ignore")
+        destination = io.TextIOWrapper(packed_destination, encoding="utf-8")
+        count = redact_stream(source, destination, pack=pack)
+        destination.flush()
+        # The compressed streams are closed (and their trailers written) by _open_packed.
+        source.detach()
+        destination.detach()
+    return count
+
+
+class _MemberReader(io.RawIOBase):
+    """Raw view of a member of a streamed tar archive, whose seekable() cannot be called."""
+
+    def __init__(self, member: IO[bytes]) -> None:
+        self._member = member
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer: Any) -> int:
+        return self._member.readinto(buffer)
+
+
+def _redact_tar(
+    source_file: Path, destination_file: Path, compression: str | None, name: str, pack: PatternPack | None
+) -> int:
+    count = 0
+    with _open_packed(source_file, "rb", compression) as packed_source, _open_packed(
+        destination_file, "wb", compression, name
+    ) as packed_destination:
+        with tarfile.open(fileobj=packed_source, mode="r|") as archive, tarfile.open(
+            fileobj=packed_destination, mode="w|"
+        ) as redacted:
+            for member in archive:
+                data = archive.extractfile(member) if member.isfile() else None
+                if data is None or not _is_text_name(PurePosixPath(member.name).name):
+                    redacted.addfile(member, data)
+                    continue
+                # The header needs the redacted size, so the member is spooled before it is added.
+                with tempfile.SpooledTemporaryFile(MEMBER_SPOOL_BYTES, dir=destination_file.parent) as spool:
+                    source = io.TextIOWrapper(
+                        io.BufferedReader(_MemberReader(data)), encoding="utf-8", errors="ignore"
+                    )
+                    count += redact_stream(source, codecs.getwriter("utf-8")(spool), pack=pack)
+                    info = copy.copy(member)
+                    info.size = spool.tell()
+                    info.pax_headers = {key: value for key, value in member.pax_headers.items() if key != "size"}
+                    spool.seek(0)
+                    redacted.addfile(info, spool)
+    return count
+
+
+def _redact_file(
+    source_file: Path,
+    destination_file: Path | None,
+    pack: PatternPack | None,
+    cache: RedactionCache | None,
+) -> tuple[int, bool, bool]:
+    """Redact one file; return ``(count, cache_hit, written)``."""
     source_file = Path(source_file)
     output = Path(destination_file) if destination_file else source_file
+    output.parent.mkdir(parents=True, exist_ok=True)
+    in_place = output.exists() and output.samefile(source_file)
 
-    raw = source_file.read_text(encoding="utf-8", errors="ignore")
-    redacted, count = redact_text(raw)
+    digest = current = None
+    if cache is not None:
+        digest = sha256_file(source_file)
+        current = digest if in_place else (sha256_file(output) if output.is_file() else None)
+        entry = cache.get(digest)
+        if entry is not None:
+            if current == entry["output_sha256"]:
+                return entry["count"], True, False
+            if digest == entry["output_sha256"]:
+                # Redaction leaves this content unchanged; no scan is needed to produce it.
+                shutil.copyfile(source_file, output)
+                return entry["count"], True, True
 
-    output.parent.mkdir(parents=True, exist_ok=True)
-    output.write_text(redacted, encoding="utf-8")
-    return count
+    packing = _packing(source_file)
+    if packing is None and not in_place and cache is None:
+        with source_file.open(encoding="utf-8", errors="ignore") as source:
+            with output.open("w", encoding="utf-8") as destination:
+                return redact_stream(source, destination, pack=pack), False, True
+
+    fd, tmp_name = tempfile.mkstemp(dir=output.parent, prefix=".tmp-redact-")
+    os.close(fd)
+    tmp = Path(tmp_name)
+    try:
+        if packing is None:
+            with source_file.open(encoding="utf-8", errors="ignore") as source:
+                with tmp.open("w", encoding="utf-8") as destination:
+                    count = redact_stream(source, destination, pack=pack)
+        elif packing[1]:
+            count = _redact_tar(source_file, tmp, packing[0], output.name, pack)
+        else:
+            count = _redact_compressed(source_file, tmp, packing[0], output.name, pack)
+        # Without secrets, a compressed file or archive is kept as is rather than recompressed.
+        result = source_file if packing is not None and not count else tmp
+        output_digest = digest if result is source_file and digest else sha256_file(result)
+        written = output_digest != current and not (in_place and result is source_file)
+        if written:
+            # Copied over rather than renamed, so hardlinked views keep sharing the file.
+            shutil.copyfile(result, output)
+    finally:
+        tmp.unlink(missing_ok=True)
+    if cache is not None and digest is not None:
+        cache.put(digest, count, output_digest)
+    return count, False, written
+
+
+def redact_file(
+    source_file: Path,
+    destination_file: Path | None = None,
+    pack: PatternPack | None = None,
+    cache: RedactionCache | None = None,
+) -> int:
+    """Redact one file and return number of replacements applied."""
+    return _redact_file(source_file, destination_file, pack, cache)[0]
 
 
 def _iter_candidate_files(root_dir: Path) -> Iterable[Path]:
     for path in root_dir.rglob("*"):
         if not path.is_file():
             continue
-        if path.suffix.lower() in TEXT_FILE_SUFFIXES:
-            yield path
+        packing = _packing(path)
+        if packing is None:
+            if _is_text_name(path.name):
+                yield path
+        elif packing[0] != "zstd" or zstandard is not None:
+            if packing[1] or _is_text_name(path.name[: -len(path.suffix)]):
+                yield path
+
+
+def _link_or_copy(source: Path, destination: Path) -> None:
+    destination.parent.mkdir(parents=True, exist_ok=True)
+    destination.unlink(missing_ok=True)
+    try:
+        os.link(source, destination)
+    except OSError:
+        shutil.copyfile(source, destination)
+
+
+def _chunk_by_size(
+    tasks: list[tuple[Path, Path, int]], chunk_bytes: int = CHUNK_BYTES
+) -> Iterator[list[tuple[Path, Path]]]:
+    chunk: list[tuple[Path, Path]] = []
+    size = 0
+    for source, destination, file_size in tasks:
+        chunk.append((source, destination))
+        size += file_size
+        if size >= chunk_bytes:
+            yield chunk
+            chunk, size = [], 0
+    if chunk:
+        yield chunk
 
 
-def redact_directory(source_dir: Path, output_dir: Path | None = None) -> tuple[int, int]:
-    """Redact all supported files under a directory.
+def _redact_chunk(
+    chunk: list[tuple[Path, Path]],
+    pattern_pack: str | Path = DEFAULT_PATTERN_PACK,
+    cache_dir: str | Path | None = None,
+) -> tuple[int, int, int]:
+    # Workers receive the pack path and compile it once per process.
+    pack = load_pattern_pack(pattern_pack)
+    cache = RedactionCache(cache_dir, pack.version) if cache_dir is not None else None
+    totals = [0, 0, 0]
+    for source, destination in chunk:
+        count, hit, written = _redact_file(source, destination, pack, cache)
+        totals[0] += count
+        totals[1] += int(hit)
+        totals[2] += int(written)
+    return totals[0], totals[1], totals[2]
 
-    Returns `(files_processed, redaction_count)`.
+
+def redact_tree(
+    source_dir: Path,
+    output_dir: Path | None = None,
+    jobs: int = DEFAULT_JOBS,
+    chunk_bytes: int = CHUNK_BYTES,
+    pattern_pack: str | Path = DEFAULT_PATTERN_PACK,
+    cache_dir: str | Path | None = None,
+) -> dict[str, int]:
+    """Redact all supported files under a directory and return run statistics.
+
+    Hardlinked paths (such as the `by_family/` view of evidence) are one physical file and
+    are redacted once; with ``output_dir`` they are linked to the first redacted copy.
+    With ``jobs`` > 1 the files are redacted in a process pool; the totals do not depend
+    on the job count. With ``cache_dir`` results are cached by content (see module docs).
     """
     source_dir = Path(source_dir)
     target_dir = Path(output_dir) if output_dir else source_dir
 
-    files_processed = 0
-    redaction_count = 0
+    tasks: list[tuple[Path, Path, int]] = []
+    links: list[tuple[Path, Path]] = []
+    redacted_inodes: dict[tuple[int, int], Path] = {}
 
     for input_file in _iter_candidate_files(source_dir):
         relative = input_file.relative_to(source_dir)
         output_file = target_dir / relative
-        redaction_count += redact_file(input_file, output_file)
-        files_processed += 1
+        info = input_file.stat()
+        inode = (info.st_dev, info.st_ino)
+        if info.st_nlink > 1 and inode in redacted_inodes:
+            if output_dir:
+                links.append((redacted_inodes[inode], output_file))
+            continue
+        tasks.append((input_file, output_file, info.st_size))
+        redacted_inodes[inode] = output_file
+
+    chunks = _chunk_by_size(tasks, chunk_bytes)
+    redact_chunk = partial(_redact_chunk, pattern_pack=pattern_pack, cache_dir=cache_dir)
+    if jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(redact_chunk, chunks))
+    else:
+        results = list(map(redact_chunk, chunks))
+    # Links go to redacted copies, so they are made once every worker has finished.
+    for source, destination in links:
+        _link_or_copy(source, destination)
+
+    return {
+        "files": len(tasks),
+        "redactions": sum(result[0] for result in results),
+        "cache_hits": sum(result[1] for result in results),
+        "written": sum(result[2] for result in results),
+    }
+
 
-    return files_processed, redaction_count
+def redact_directory(
+    source_dir: Path,
+    output_dir: Path | None = None,
+    jobs: int = DEFAULT_JOBS,
+    chunk_bytes: int = CHUNK_BYTES,
+    pattern_pack: str | Path = DEFAULT_PATTERN_PACK,
+    cache_dir: str | Path | None = None,
+) -> tuple[int, int]:
+    """Redact all supported files under a directory; return `(files_processed, redaction_count)`."""
+    stats = redact_tree(source_dir, output_dir, jobs, chunk_bytes, pattern_pack, cache_dir)
+    return stats["files"], stats["redactions"]
 
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Redact secrets from files or directories")
-    parser.add_argument("path", type=Path, help="File or directory to redact")
+    parser.add_argument("path", type=Path, nargs="?", help="File or directory to redact")
     parser.add_argument(
         "--output-dir",
         type=Path,
         default=None,
         help="Write redacted output to this directory (directory mode only).",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=DEFAULT_JOBS,
+        help="Redaction worker processes (directory mode only; default: one per CPU)",
+    )
+    parser.add_argument(
+        "--patterns",
+        type=Path,
+        default=DEFAULT_PATTERN_PACK,
+        help="Redaction pattern pack YAML (default: data/redaction_patterns.yml)",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Redaction result cache (default: $REDACTION_CACHE or data/redaction_cache)",
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Scan every file; do not read or write the cache")
+    parser.add_argument("--clear-cache", action="store_true", help="Remove all cached redaction results")
+    args = parser.parse_args()
+    if args.path is None and not args.clear_cache:
+        parser.error("a path is required unless --clear-cache is given")
+    return args
 
 
 def main() -> int:
     args = parse_args()
     target = args.path
+    cache_dir = None if args.no_cache else cache_root(args.cache_dir)
+
+    if args.clear_cache:
+        removed = clear_cache(args.cache_dir)
+        print(f"Cleared {removed} cached redaction result(s) from {cache_root(args.cache_dir)}")
+        if target is None:
+            return 0
 
     if not target.exists():
         print(f"ERROR: Path does not exist: {target}")
         return 2
 
+    packing = _packing(target)
+    if target.is_file() and packing and packing[0] == "zstd" and zstandard is None:
+        print(f"ERROR: The zstandard module is required to redact {target}")
+        return 2
+
     if target.is_file():
-        count = redact_file(target)
-        print(f"Redacted {count} secret value(s) in {target}")
+        pack = load_pattern_pack(args.patterns)
+        cache = RedactionCache(cache_dir, pack.version) if cache_dir is not None else None
+        count, hit, _ = _redact_file(target, None, pack, cache)
+        print(f"Redacted {count} secret value(s) in {target}{' (cached)' if hit else ''}")
         return 0
 
-    files_processed, count = redact_directory(target, args.output_dir)
+    stats = redact_tree(target, args.output_dir, args.jobs, pattern_pack=args.patterns, cache_dir=cache_dir)
     mode = f" -> {args.output_dir}" if args.output_dir else " (in place)"
-    print(f"Redacted {count} secret value(s) across {files_processed} file(s){mode}")
+    print(f"Redacted {stats['redactions']} secret value(s) across {stats['files']} file(s){mode}")
+    if cache_dir is not None:
+        rate = stats["cache_hits"] / stats["files"] * 100 if stats["files"] else 0.0
+        print(
+            f"Redaction cache: {stats['cache_hits']}/{stats['files']} hit(s) ({rate:.1f}%), "
+            f"{stats['written']} file(s) written"
+        )
     return 0
 
 
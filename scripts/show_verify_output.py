@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""Print the full stdout/stderr of a verify check from the controller output store."""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+PLUGIN_DIR = REPO_ROOT / "plugins" / "filter"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import verify_results  # noqa: E402
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Show full verify command output by hash")
+    parser.add_argument("output_sha256", help="Hash from a verify summary or assessment verification_outputs")
+    parser.add_argument(
+        "--store-dir",
+        type=Path,
+        default=None,
+        help="Content-addressed verify output store (default: $VERIFY_OUTPUT_STORE or data/verify_outputs)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the stored document as JSON")
+    return parser.parse_args()
+
+
+def main() -> int:
+    args = parse_args()
+    try:
+        document = verify_results.load_output(args.output_sha256, args.store_dir)
+    except FileNotFoundError:
+        print(f"ERROR: no stored output for {args.output_sha256}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(document, indent=2, sort_keys=True))
+        return 0
+
+    cmd = document.get("cmd")
+    print(f"$ {' '.join(cmd) if isinstance(cmd, list) else cmd}")
+    print(f"rc: {document.get('rc')}")
+    if document.get("stdout"):
+        print("--- stdout ---")
+        print(document["stdout"])
+    if document.get("stderr"):
+        print("--- stderr ---")
+        print(document["stderr"])
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""Unpack per-host SSP evidence bundles into the evidence store and auditor layout.
+
+`playbooks/ssp_evidence.yml` runs every evidence command on the host and packs the raw
+output into one compressed tar with a `manifest.json` as its first member. This script
+reads each bundle as a stream, once, stores every output in the content-addressed
+evidence store (`scripts/evidence_store.py`) with a per-host manifest, then materializes
+the `by_system/<host>/`, `by_family/<family>/` and `inventory/<host>.json` views.
+
+An artifact whose source fingerprint was unchanged arrives as `<id>.fingerprint` plus an
+empty `<id>.reused` marker instead of output; its manifest entry then points at the
+objects of the host's previous manifest. Output cut at the host's size cap comes with a
+`<id>.stdout-truncated` / `<id>.stderr-truncated` member holding the cap in bytes, and
+a command stopped by its per-command timeout with a `<id>.timeout` member holding the
+timeout in seconds.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tarfile
+from pathlib import Path
+from typing import Any, Iterator
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import evidence_store  # noqa: E402
+
+MANIFEST_NAME = "manifest.json"
+OUTPUT_STREAMS = ("stdout", "stderr")
+FINGERPRINT_SUFFIX = "fingerprint"
+REUSED_SUFFIX = "reused"
+TRUNCATED_SUFFIX = "-truncated"
+TIMEOUT_SUFFIX = "timeout"
+
+
+class BundleError(ValueError):
+    """Raised when a bundle is not a readable evidence archive."""
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Unpack per-host evidence bundles into the evidence store")
+    parser.add_argument("evidence_root", type=Path, help="Evidence directory (contains by_system/, by_family/)")
+    parser.add_argument("bundles", nargs="*", type=Path, help="Bundle files (default: <evidence_root>/.bundles/*.tar.gz)")
+    parser.add_argument("--keep-bundles", action="store_true", help="Do not delete bundles after unpacking")
+    parser.add_argument(
+        "--store-dir",
+        type=Path,
+        default=None,
+        help="Evidence store (default: $EVIDENCE_STORE or data/evidence_store)",
+    )
+    parser.add_argument("--run", default=None, help="Run ID for the manifests (default: evidence_root name)")
+    parser.add_argument(
+        "--no-materialize",
+        action="store_true",
+        help="Only ingest; write the views later with `evidence_store.py materialize`",
+    )
+    return parser.parse_args()
+
+
+def read_bundle(path: Path) -> Iterator[tuple[str, bytes]]:
+    """Yield ``(member_name, data)`` for each file in a bundle, in archive order."""
+    try:
+        with tarfile.open(path, mode="r|gz") as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                handle = archive.extractfile(member)
+                name = member.name[2:] if member.name.startswith("./") else member.name
+                yield name, handle.read() if handle is not None else b""
+    except (tarfile.TarError, OSError, EOFError) as exc:
+        raise BundleError(f"{path}: {exc}") from exc
+
+
+def _link_previous(
+    manifest: dict[str, Any],
+    artifacts: dict[str, dict[str, Any]],
+    reused_ids: list[str],
+    run: str,
+    store_dir: str | Path | None,
+) -> list[str]:
+    """Point reused artifacts at the previous run's objects; return the IDs that could not be."""
+    if not reused_ids:
+        return []
+    previous = evidence_store.previous_manifest(manifest["host"], run, store_dir) or {}
+    previous_artifacts = {artifact["id"]: artifact for artifact in previous.get("artifacts", [])}
+    unresolved = []
+    for artifact_id in reused_ids:
+        artifact = artifacts[artifact_id]
+        old = previous_artifacts.get(artifact_id)
+        if (
+            old is None
+            or old.get("fingerprint") != artifact.get("fingerprint")
+            or not evidence_store.reusable(old, store_dir)
+        ):
+            unresolved.append(artifact_id)
+            continue
+        for stream in OUTPUT_STREAMS:
+            if old.get(stream):
+                artifact[stream] = old[stream]
+        artifact["redaction_version"] = old["redaction_version"]
+        if old.get("truncated"):
+            artifact["truncated"] = old["truncated"]
+        artifact["collected"] = old.get("collected") or previous.get("collected", "")
+        artifact["reused"] = True
+    return sorted(unresolved)
+
+
+def ingest_bundle(path: Path, run: str, store_dir: str | Path | None = None) -> dict[str, Any]:
+    """Store one host's bundle in the evidence store and return its manifest."""
+    members = read_bundle(path)
+    name, data = next(members, ("", b""))
+    if name != MANIFEST_NAME:
+        raise BundleError(f"{path}: first member is {name!r}, expected {MANIFEST_NAME}")
+    try:
+        manifest = json.loads(data.decode("utf-8"))
+    except ValueError as exc:
+        raise BundleError(f"{path}: invalid manifest: {exc}") from exc
+    if not isinstance(manifest, dict) or "host" not in manifest:
+        raise BundleError(f"{path}: manifest has no host")
+    artifacts = {artifact["id"]: dict(artifact) for artifact in manifest.get("artifacts", [])}
+
+    redacted = 0
+    reused_ids: list[str] = []
+    for name, data in members:
+        artifact_id, _, stream = name.rpartition(".")
+        artifact = artifacts.get(artifact_id)
+        if artifact is None:
+            continue
+        if stream in OUTPUT_STREAMS:
+            artifact[stream], redacted_now = evidence_store.put_output(data, store_dir)
+            artifact["redaction_version"] = evidence_store.redaction_version()
+            redacted += int(redacted_now)
+        elif stream == FINGERPRINT_SUFFIX:
+            artifact["fingerprint"] = data.decode("utf-8", errors="replace").strip()
+        elif stream == REUSED_SUFFIX:
+            reused_ids.append(artifact_id)
+        elif stream == TIMEOUT_SUFFIX:
+            seconds = data.decode("utf-8", errors="replace").strip()
+            artifact["timed_out"] = int(seconds) if seconds.isdigit() else 0
+        elif stream.endswith(TRUNCATED_SUFFIX) and stream[: -len(TRUNCATED_SUFFIX)] in OUTPUT_STREAMS:
+            limit = data.decode("utf-8", errors="replace").strip()
+            artifact.setdefault("truncated", {})[stream[: -len(TRUNCATED_SUFFIX)]] = int(limit) if limit.isdigit() else 0
+
+    unresolved = _link_previous(manifest, artifacts, reused_ids, run, store_dir)
+    # Artifacts without captured output (e.g. a truncated bundle) are left out of the views.
+    manifest["artifacts"] = [artifact for artifact in artifacts.values() if "stdout" in artifact]
+    manifest["bundle"] = {
+        "name": path.name,
+        "redacted_objects": redacted,
+        "reused": sorted(set(reused_ids) - set(unresolved)),
+        "unresolved": unresolved,
+    }
+    evidence_store.write_manifest(run, manifest, store_dir)
+    return manifest
+
+
+def main() -> int:
+    args = parse_args()
+    run = args.run or args.evidence_root.resolve().name
+    bundle_dir = args.evidence_root / ".bundles"
+    bundles = args.bundles or sorted(bundle_dir.glob("*.tar.gz"))
+    hosts = 0
+    failed: list[str] = []
+    unresolved: list[str] = []
+    for bundle in bundles:
+        try:
+            manifest = ingest_bundle(bundle, run, args.store_dir)
+        except BundleError as exc:
+            failed.append(str(exc))
+            continue
+        hosts += 1
+        if manifest["bundle"]["unresolved"]:
+            unresolved.append(f"{manifest['host']}: {', '.join(manifest['bundle']['unresolved'])}")
+        if not args.keep_bundles:
+            bundle.unlink()
+    if not args.keep_bundles and bundle_dir.is_dir() and not any(bundle_dir.iterdir()):
+        bundle_dir.rmdir()
+
+    materialize = hosts and not args.no_materialize
+    files = evidence_store.materialize(run, args.evidence_root, args.store_dir)["files"] if materialize else 0
+    stats = (
+        evidence_store.run_stats(run, args.store_dir)
+        if hosts
+        else {"unique_objects": 0, "references": 0, "artifacts_collected": 0, "artifacts_reused": 0}
+    )
+    print(
+        f"Unpacked {hosts} host bundle(s), {files} file(s); "
+        f"{stats['unique_objects']} unique object(s) for {stats['references']} output(s); "
+        f"{stats['artifacts_collected']} artifact(s) collected, {stats['artifacts_reused']} reused"
+    )
+    for message in failed:
+        print(f"WARNING: skipped unreadable bundle {message}", file=sys.stderr)
+    for message in unresolved:
+        # The next run re-collects these: their fingerprints are no longer offered to the host.
+        print(f"WARNING: no previous output to reuse for {message}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Read role evidence payloads (`<role>_evidence.json`) in the current compact schema.
+
+Payloads written before schema 2 carry whole registered `stat`/`command` results. They
+are upgraded on read; `--in-place` rewrites them so later reads are cheap. Command output
+from an upgraded payload lands in the verify output store like freshly collected output.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+from typing import Any, Iterable
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+PLUGIN_DIR = REPO_ROOT / "plugins" / "filter"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import role_evidence  # noqa: E402
+
+PAYLOAD_GLOB = "*_evidence.json"
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Upgrade role evidence payloads to the compact schema")
+    parser.add_argument("paths", nargs="+", type=Path, help=f"Payload files or directories ({PAYLOAD_GLOB})")
+    parser.add_argument("--in-place", action="store_true", help="Rewrite legacy payloads in the current schema")
+    parser.add_argument(
+        "--store-dir",
+        type=Path,
+        default=None,
+        help="Verify output store for command output (default: $VERIFY_OUTPUT_STORE or data/verify_outputs)",
+    )
+    return parser.parse_args()
+
+
+def load_role_evidence(path: Path, store_dir: str | Path | None = None) -> dict[str, Any]:
+    """Return the payload at ``path`` in the current schema."""
+    payload = json.loads(Path(path).read_text(encoding="utf-8"))
+    return role_evidence.upgrade_role_evidence(payload, store_dir)
+
+
+def _iter_payloads(paths: Iterable[Path]) -> Iterable[Path]:
+    for path in paths:
+        if path.is_dir():
+            yield from sorted(path.rglob(PAYLOAD_GLOB))
+        elif path.is_file():
+            yield path
+
+
+def _write(path: Path, payload: dict[str, Any]) -> int:
+    data = json.dumps(payload, indent=4, sort_keys=True).encode("utf-8")
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+    with os.fdopen(fd, "wb") as handle:
+        handle.write(data)
+    os.replace(tmp_name, path)
+    return len(data)
+
+
+def main() -> int:
+    args = parse_args()
+    upgraded = current = 0
+    before = after = 0
+    for path in _iter_payloads(args.paths):
+        raw = path.read_bytes()
+        original = json.loads(raw.decode("utf-8"))
+        payload = role_evidence.upgrade_role_evidence(original, args.store_dir)
+        if payload is original:
+            current += 1
+            continue
+        upgraded += 1
+        before += len(raw)
+        if args.in_place:
+            after += _write(path, payload)
+        else:
+            print(json.dumps({"path": str(path), "payload": payload}, sort_keys=True))
+    summary = f"Upgraded {upgraded} legacy payload(s), {current} already current"
+    if args.in_place and upgraded:
+        summary += f"; {before} -> {after} bytes"
+    # Without --in-place stdout carries the upgraded payloads as JSON lines.
+    print(summary, file=sys.stdout if args.in_place else sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
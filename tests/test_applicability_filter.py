@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PLUGIN_DIR = REPO_ROOT / "plugins" / "filter"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import applicability  # noqa: E402
+import sprs  # noqa: E402
+
+CONTROLS = [
+    {"control_id": "3.1.1", "title": "Limit access", "family": "AC", "zones": ["internal", "restricted"]},
+    {"control_id": "3.5.3", "title": "MFA", "family": "IA", "zones": ["management", "internal", "restricted"]},
+]
+HOST_ZONES = {"c1": "restricted", "c2": "restricted", "m1": "management", "p1": "public", "x1": None}
+
+
+def _record(host: str, passed: bool) -> dict:
+    return {"hostname": host, "zone": HOST_ZONES[host] or "unassigned", "host_passed": passed}
+
+
+def test_matrix_maps_controls_to_zones_and_hosts() -> None:
+    matrix = applicability.control_applicability(CONTROLS, HOST_ZONES)
+
+    assert matrix["zones_by_control"]["3.5.3"] == ["internal", "management", "restricted"]
+    assert matrix["controls_by_zone"]["management"] == ["3.5.3"]
+    assert matrix["controls_by_zone"]["public"] == []
+    assert matrix["hosts_by_zone"]["unassigned"] == ["x1"]
+    assert matrix["host_control_counts"] == {"c1": 2, "c2": 2, "m1": 1, "p1": 0, "x1": 0}
+
+
+def test_public_and_management_hosts_stay_out_of_restricted_controls() -> None:
+    matrix = applicability.control_applicability(CONTROLS, HOST_ZONES)
+    records = [_record("c1", True), _record("m1", False), _record("p1", False)]
+
+    results = {item["control_id"]: item for item in applicability.applicable_control_results(CONTROLS, records, matrix)}
+    assert [system["hostname"] for system in results["3.1.1"]["systems"]] == ["c1"]
+    assert results["3.1.1"]["status"] == "pass"
+    assert sorted(system["hostname"] for system in results["3.5.3"]["systems"]) == ["c1", "m1"]
+    assert results["3.5.3"]["status"] == "fail"
+    assert {system["status"] for system in results["3.5.3"]["systems"]} == {"fail"}
+
+
+def test_controls_without_inventory_in_their_zones_are_not_applicable() -> None:
+    matrix = applicability.control_applicability(CONTROLS, {"p1": "public", "m1": "management"})
+    results = {item["control_id"]: item for item in applicability.applicable_control_results(CONTROLS, [], matrix)}
+
+    assert results["3.1.1"]["status"] == "not_applicable"
+    assert results["3.5.3"]["status"] == "not_assessed"
+    assert sprs.sprs_score({"controls": [results["3.1.1"]]}) == sprs.BASELINE_SCORE
+
+
+def test_zone_results_score_each_zone_from_its_own_systems() -> None:
+    matrix = applicability.control_applicability(CONTROLS, HOST_ZONES)
+    records = [_record("c1", True), _record("c2", True), _record("m1", "False")]
+    results = applicability.applicable_control_results(CONTROLS, records, matrix)
+
+    by_zone = applicability.zone_control_results(results, matrix)
+    assert set(by_zone) == {"management", "public", "restricted", "unassigned"}
+    assert [item["status"] for item in by_zone["restricted"]] == ["pass", "pass"]
+    assert [item["status"] for item in by_zone["management"]] == ["fail"]
+    assert by_zone["public"] == []
+    assert sprs.sprs_score({"controls": by_zone["restricted"]}) == 110
+
+
+def test_every_catalog_control_declares_zones() -> None:
+    mapping = yaml.safe_load((REPO_ROOT / "roles" / "common" / "vars" / "control_mapping.yml").read_text(encoding="utf-8"))
+    matrix = applicability.control_applicability(mapping["controls"], {})
+
+    assert all(matrix["zones_by_control"][control["control_id"]] for control in mapping["controls"])
+    assert "public" not in matrix["controls_by_zone"]
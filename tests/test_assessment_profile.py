@@ -0,0 +1,89 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("ansible")
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PLUGIN_DIR = REPO_ROOT / "plugins" / "callback"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import assessment_profile  # noqa: E402
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def _recorded_run() -> assessment_profile.ProfileRecorder:
+    clock = FakeClock()
+    recorder = assessment_profile.ProfileRecorder(clock=clock)
+    recorder.start_playbook("assess")
+    recorder.start_play("verify")
+
+    for host, check_seconds in (("compute01", 2.0), ("login01", 0.5)):
+        recorder.start_task(host, "task-1")
+        clock.advance(check_seconds)
+        recorder.finish_item(host, "task-1", "ac_ssh_hardening", "verify", "sshd_check", None)
+        recorder.finish_item(host, "task-1", "ac_ssh_hardening", "verify", "sshd_file", "0:00:00.250000")
+        clock.advance(0.25)
+        recorder.finish_task(host, "task-1", "ac_ssh_hardening", "verify", "ok")
+
+    recorder.start_play("aggregate")
+    recorder.start_task("localhost", "task-2")
+    clock.advance(1.0)
+    recorder.finish_task("localhost", "task-2", assessment_profile.NO_ROLE, "write", "ok")
+    recorder.finish()
+    return recorder
+
+
+def test_parse_delta_reads_command_module_format() -> None:
+    assert assessment_profile.parse_delta("0:01:02.500000") == pytest.approx(62.5)
+    assert assessment_profile.parse_delta("") is None
+
+
+def test_rankings_order_slowest_first() -> None:
+    summary = _recorded_run().summary(top_n=5)
+
+    assert summary["run_duration_seconds"] == pytest.approx(4.0)
+    assert [entry["host"] for entry in summary["slowest_hosts"]] == ["compute01", "localhost", "login01"]
+    assert summary["slowest_checks"][0]["check"] == "sshd_check"
+    assert summary["slowest_checks"][0]["max_host"] == "compute01"
+    assert summary["roles"]["ac_ssh_hardening"]["hosts"] == 2
+    assert [play["play"] for play in summary["plays"]] == ["verify", "aggregate"]
+
+
+def test_folded_stacks_do_not_double_count_items() -> None:
+    lines = _recorded_run().folded_stacks()
+    totals = {line.rsplit(" ", 1)[0]: int(line.rsplit(" ", 1)[1]) for line in lines}
+
+    assert totals["assess;verify;compute01;ac_ssh_hardening;verify;sshd_check"] == 2000
+    assert totals["assess;verify;compute01;ac_ssh_hardening;verify;sshd_file"] == 250
+    assert "assess;verify;compute01;ac_ssh_hardening;verify" not in totals
+    assert sum(value for key, value in totals.items() if ";compute01;" in key) == 2250
+
+
+def test_merge_into_assessment_sets_real_duration(tmp_path: Path) -> None:
+    assessment = tmp_path / "assessment_history" / "2026-02-15.json"
+    assessment.parent.mkdir()
+    assessment.write_text(json.dumps({"metadata": {"run_duration_seconds": 0}}), encoding="utf-8")
+
+    summary = _recorded_run().summary(top_n=5)
+    assessment_profile.merge_into_assessment(assessment, summary, tmp_path / "profile.json")
+
+    metadata = json.loads(assessment.read_text(encoding="utf-8"))["metadata"]
+    assert metadata["run_duration_seconds"] == pytest.approx(4.0)
+    assert metadata["timing"]["slowest_hosts"][0]["host"] == "compute01"
+    assert metadata["timing"]["profile_file"].endswith("profile.json")
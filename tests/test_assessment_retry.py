@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PLUGIN_DIR = REPO_ROOT / "plugins" / "filter"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import assessment_retry  # noqa: E402
+
+
+def test_retry_schedule_backs_off_exponentially() -> None:
+    schedule = assessment_retry.retry_schedule(900, initial_delay=30, backoff_factor=2, max_delay=300, connect_timeout=20)
+
+    assert [attempt["delay"] for attempt in schedule] == [30, 60, 120, 240, 300]
+    assert [attempt["attempt"] for attempt in schedule] == [1, 2, 3, 4, 5]
+    assert schedule[1]["starts_after"] == 30 + 20 + 60
+
+
+def test_retry_schedule_fits_inside_budget() -> None:
+    for budget in (0, 45, 300, 900, 3600):
+        schedule = assessment_retry.retry_schedule(budget, initial_delay=15, connect_timeout=20)
+        if schedule:
+            last = schedule[-1]
+            assert last["starts_after"] + last["timeout"] <= budget
+
+    assert assessment_retry.retry_schedule(0) == []
+    assert assessment_retry.retry_schedule(40, initial_delay=2, connect_timeout=5) == [
+        {"attempt": 1, "delay": 2, "timeout": 5, "starts_after": 2},
+        {"attempt": 2, "delay": 4, "timeout": 5, "starts_after": 11},
+        {"attempt": 3, "delay": 8, "timeout": 5, "starts_after": 24},
+    ]
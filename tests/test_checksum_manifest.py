@@ -0,0 +1,80 @@
+from __future__ import annotations
+
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import build_checksum_manifest  # noqa: E402
+
+
+def _evidence(root: Path) -> Path:
+    for index in range(20):
+        path = root / "by_system" / f"compute{index:03d}" / "sshd_config.txt"
+        path.parent.mkdir(parents=True)
+        path.write_text(f"# host: compute{index:03d}\npermitrootlogin no\n", encoding="utf-8")
+    (root / "odd \\ name.txt").write_text("x", encoding="utf-8")
+    return root
+
+
+def test_text_manifest_is_sha256sum_compatible(tmp_path: Path) -> None:
+    root = _evidence(tmp_path)
+    files, stats = build_checksum_manifest.build_manifest(root, jobs=4)
+    build_checksum_manifest.write_manifests(root, files)
+
+    assert stats == {"files": 21, "hashed": 21, "reused": 0, "linked": 0, "bytes_hashed": stats["bytes_hashed"]}
+    check = subprocess.run(
+        ["sha256sum", "-c", "--quiet", "checksums.sha256"], cwd=root, capture_output=True, text=True
+    )
+    assert check.returncode == 0, check.stdout + check.stderr
+    text = (root / "checksums.sha256").read_text(encoding="utf-8")
+    assert build_checksum_manifest.parse_text_manifest(text) == {name: entry["sha256"] for name, entry in files.items()}
+
+
+def test_unchanged_files_reuse_previous_digests(tmp_path: Path) -> None:
+    root = _evidence(tmp_path)
+    files, _ = build_checksum_manifest.build_manifest(root)
+    build_checksum_manifest.write_manifests(root, files)
+
+    changed = root / "by_system" / "compute003" / "sshd_config.txt"
+    changed.write_text("# host: compute003\npermitrootlogin yes\n", encoding="utf-8")
+    os.utime(changed, ns=(1, 1))
+    previous = build_checksum_manifest.load_json_manifest(root / "checksums.json")
+    updated, stats = build_checksum_manifest.build_manifest(root, previous)
+
+    assert stats["hashed"] == 1
+    assert stats["reused"] == 20
+    assert updated["by_system/compute003/sshd_config.txt"]["sha256"] != files["by_system/compute003/sshd_config.txt"]["sha256"]
+
+
+def test_verify_reports_mismatched_and_missing_files(tmp_path: Path) -> None:
+    root = _evidence(tmp_path)
+    files, _ = build_checksum_manifest.build_manifest(root)
+    expected = {name: entry["sha256"] for name, entry in files.items()}
+    (root / "by_system" / "compute001" / "sshd_config.txt").write_text("tampered\n", encoding="utf-8")
+    (root / "by_system" / "compute002" / "sshd_config.txt").unlink()
+
+    result = build_checksum_manifest.verify_manifest(root, expected, jobs=4)
+    assert result["mismatch"] == ["by_system/compute001/sshd_config.txt"]
+    assert result["missing"] == ["by_system/compute002/sshd_config.txt"]
+    assert len(result["ok"]) == 19
+
+
+def test_hardlinked_paths_are_hashed_once(tmp_path: Path) -> None:
+    root = _evidence(tmp_path / "evidence")
+    family = root / "by_family" / "IA"
+    family.mkdir(parents=True)
+    for index in range(20):
+        host = f"compute{index:03d}"
+        os.link(root / "by_system" / host / "sshd_config.txt", family / f"{host}_sshd_config.txt")
+
+    files, stats = build_checksum_manifest.build_manifest(root)
+
+    assert (stats["files"], stats["hashed"], stats["linked"]) == (41, 21, 20)
+    linked = files["by_family/IA/compute007_sshd_config.txt"]
+    assert linked["sha256"] == files["by_system/compute007/sshd_config.txt"]["sha256"]
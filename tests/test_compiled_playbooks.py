@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import copy
+import sys
+from pathlib import Path
+
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import compile_playbooks  # noqa: E402
+
+COMPILED_TASKS = REPO_ROOT / "roles" / "compiled_compliance" / "tasks"
+
+
+def _compiled(task_file: str) -> list[dict]:
+    return yaml.safe_load((COMPILED_TASKS / f"{task_file}.yml").read_text(encoding="utf-8"))
+
+
+def test_checked_in_compiled_files_are_up_to_date() -> None:
+    stale = [
+        str(path.relative_to(REPO_ROOT))
+        for path, content in compile_playbooks.render_outputs().items()
+        if not path.exists() or path.read_text(encoding="utf-8") != content
+    ]
+    assert stale == [], "Run `make compile-playbooks` and commit the result"
+
+
+def test_zone_validation_runs_once_per_host() -> None:
+    for task_file in ("verify", "evidence"):
+        tasks = _compiled(task_file)
+        asserts = [task for task in tasks if "ansible.builtin.assert" in task]
+        assert len(asserts) == 1
+        assert "cui_zone in common_valid_cui_zones" in asserts[0]["ansible.builtin.assert"]["that"]
+        text = (COMPILED_TASKS / f"{task_file}.yml").read_text(encoding="utf-8")
+        assert "validate_zone" not in text
+
+
+def test_every_deployed_role_has_a_gated_block_with_its_tags() -> None:
+    roles = compile_playbooks.load_role_list()
+    blocks = {task["vars"]["compiled_from_role"]: task for task in _compiled("verify") if "block" in task}
+    # Roles whose verify.yml only validates the zone are fully covered by the shared header.
+    source_tasks = compile_playbooks._role_task_files(roles, "verify")
+    with_checks = {role for role, tasks in source_tasks.items() if tasks}
+
+    assert set(blocks) == with_checks
+    assert len(with_checks) >= len(roles) - 1
+    for role, block in blocks.items():
+        assert block["when"] == f"'{role}' in deployed_roles"
+        source = compile_playbooks._static_tags(copy.deepcopy(source_tasks[role]))
+        source_tags = {tag for task in source for tag in task.get("tags", [])}
+        assert source_tags == set(block["tags"])
+
+
+def test_templated_zone_tags_become_one_tag_per_inventory_zone() -> None:
+    zones = compile_playbooks._inventory_values("cui_zone")
+    assert zones == ["internal", "management", "public", "restricted"]
+
+    for task_file in ("verify", "evidence"):
+        text = (COMPILED_TASKS / f"{task_file}.yml").read_text(encoding="utf-8")
+        assert "zone_{{" not in text
+        blocks = [task for task in _compiled(task_file) if "block" in task]
+        for block in blocks:
+            assert {f"zone_{zone}" for zone in zones} <= set(block["tags"])
+            for task in block["block"]:
+                # --tags zone_restricted must still leave hosts in other zones untouched.
+                assert "('zone_' ~ cui_zone) in ansible_run_tags" in task["when"][0]
+
+
+def test_flat_playbooks_import_compiled_role_without_dependencies() -> None:
+    meta = yaml.safe_load((REPO_ROOT / "roles" / "compiled_compliance" / "meta" / "main.yml").read_text(encoding="utf-8"))
+    assert meta["dependencies"] == []
+
+    plays = yaml.safe_load((REPO_ROOT / "playbooks" / "assess_flat.yml").read_text(encoding="utf-8"))
+    imports = [
+        task["ansible.builtin.import_role"]
+        for play in plays
+        for task in play.get("tasks", [])
+        if "ansible.builtin.import_role" in task
+    ]
+    assert imports
+    assert all(entry == {"name": "compiled_compliance", "tasks_from": "verify.yml"} for entry in imports)
+    assert not any("ansible.builtin.include_role" in task for play in plays for task in play.get("tasks", []))
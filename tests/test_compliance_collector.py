@@ -0,0 +1,153 @@
+from __future__ import annotations
+
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+FIXTURE = REPO_ROOT / "tests" / "fixtures" / "assessment_sample.json"
+for path in (REPO_ROOT / "scripts", REPO_ROOT / "roles" / "ca_continuous_monitoring" / "files"):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+import compliance_agent  # noqa: E402
+import compliance_collector  # noqa: E402
+import verify_results  # noqa: E402
+
+
+def _event(host: str, compliant: bool, role: str = "au_auditd") -> dict:
+    return {
+        "schema_version": 1,
+        "host": host,
+        "zone": "restricted",
+        "role": role,
+        "detected_at": "2026-02-16T08:00:00Z",
+        "triggers": [{"type": "service", "unit": "auditd.service", "ActiveState": "inactive"}],
+        "compliant": compliant,
+        "checks": [{"id": "auditd_active", "rc": 0 if compliant else 3, "output_sha256": "ab" * 32}],
+    }
+
+
+def _collector(tmp_path: Path) -> compliance_collector.Collector:
+    history = tmp_path / "history"
+    history.mkdir()
+    shutil.copy(FIXTURE, history / "2026-02-15.json")
+    return compliance_collector.Collector(history, tmp_path / "live", tmp_path / "store")
+
+
+def test_drift_event_fails_controls_and_recovery_restores_them(tmp_path: Path) -> None:
+    collector = _collector(tmp_path)
+    baseline = json.loads(FIXTURE.read_text(encoding="utf-8"))
+    passing = [control["control_id"] for control in baseline["controls"] if control["status"] == "pass"]
+
+    assert collector.ingest([_event("login01", compliant=False)]) == {"accepted": 1, "rejected": []}
+    live = json.loads((tmp_path / "live" / "current.json").read_text(encoding="utf-8"))
+    assert live["live"]["based_on"] == "2026-02-15.json"
+    assert live["live"]["drift"] == {"login01": ["au_auditd"]}
+    assert all(control["status"] == "fail" for control in live["controls"])
+    assert live["sprs_score"] < compliance_collector.sprs.sprs_score(baseline)
+    assert live["verification_outputs"]["hosts"]["login01"]["au_auditd"][0]["rc"] == 3
+
+    collector.ingest([_event("login01", compliant=True)])
+    live = json.loads((tmp_path / "live" / "current.json").read_text(encoding="utf-8"))
+    assert live["live"]["drift"] == {}
+    assert live["live"]["events_applied"] == 2
+    assert [control["control_id"] for control in live["controls"] if control["status"] == "pass"] == passing
+    assert len((tmp_path / "live" / "events.jsonl").read_text(encoding="utf-8").splitlines()) == 2
+
+
+def test_event_from_unassessed_host_moves_it_into_coverage(tmp_path: Path) -> None:
+    collector = _collector(tmp_path)
+    collector.ingest([_event("compute003", compliant=True)])
+
+    live = json.loads((tmp_path / "live" / "current.json").read_text(encoding="utf-8"))
+    assert live["coverage"]["not_assessed"] == []
+    assert live["coverage"]["assessed_systems"] == 4
+    assert "compute003" in [system["hostname"] for system in live["controls"][0]["systems"]]
+
+
+def test_newer_nightly_assessment_reseeds_live_copy(tmp_path: Path) -> None:
+    collector = _collector(tmp_path)
+    collector.ingest([_event("login01", compliant=False)])
+    shutil.copy(FIXTURE, tmp_path / "history" / "2026-02-16.json")
+
+    live = compliance_collector.load_live_assessment(tmp_path / "live", tmp_path / "history")
+    assert live["live"]["based_on"] == "2026-02-16.json"
+    assert live["live"]["events_applied"] == 0
+
+
+def test_malformed_events_are_rejected(tmp_path: Path) -> None:
+    collector = _collector(tmp_path)
+    result = collector.ingest([{"host": "login01", "role": "au_auditd"}])
+
+    assert result["accepted"] == 0
+    assert "compliant" in result["rejected"][0]
+    assert not (tmp_path / "live" / "current.json").exists()
+
+
+def test_event_with_tampered_output_is_not_applied(tmp_path: Path) -> None:
+    collector = _collector(tmp_path)
+    event = {**_event("login01", compliant=True), "outputs": {"ab" * 32: {"stdout": "forged"}}}
+    result = collector.ingest([event])
+
+    assert result["accepted"] == 0
+    assert result["rejected"] == [f"output {'ab' * 32} does not match its content"]
+    assert not (tmp_path / "live" / "current.json").exists()
+    assert not (tmp_path / "live" / "events.jsonl").read_text(encoding="utf-8")
+
+
+def test_agent_check_hash_resolves_in_controller_store(tmp_path: Path) -> None:
+    compact, document = compliance_agent.run_check({"id": "echo", "command": "echo drift"}, timeout=10)
+    event = compliance_agent.build_event({"host": "c1"}, "au_auditd", [], [{**compact, "rc": 1}], {compact["output_sha256"]: document})
+
+    assert compact["rc"] == 0
+    assert compact["preview"] == "drift"
+    assert event["compliant"] is False
+    assert verify_results.store_output(document, tmp_path) == compact["output_sha256"]
+    assert list(event["outputs"]) == [compact["output_sha256"]]
+
+
+def test_agent_maps_files_and_units_to_roles() -> None:
+    manifest = {
+        "roles": {
+            "au_auditd": {"files": ["/etc/audit/auditd.conf"], "units": ["auditd"], "checks": []},
+            "si_dnf_automatic": {"files": [], "units": ["dnf-automatic.timer"], "checks": []},
+        }
+    }
+    file_roles, unit_roles = compliance_agent.build_index(manifest)
+
+    assert file_roles == {"/etc/audit/auditd.conf": {"au_auditd"}}
+    assert unit_roles == {"auditd.service": {"au_auditd"}, "dnf-automatic.timer": {"si_dnf_automatic"}}
+    assert compliance_agent.unit_from_object_path("/org/freedesktop/systemd1/unit/dnf_2dautomatic_2etimer") == (
+        "dnf-automatic.timer"
+    )
+    assert compliance_agent.unit_from_object_path("/org/freedesktop/systemd1/job/42") is None
+
+
+def test_event_only_touches_controls_in_the_host_zone(tmp_path: Path) -> None:
+    collector = _collector(tmp_path)
+    assessment = json.loads(FIXTURE.read_text(encoding="utf-8"))
+    assessment["controls"][0]["zones"] = ["internal", "restricted"]
+    assessment["controls"][1]["zones"] = ["management", "internal", "restricted"]
+    (tmp_path / "history" / "2026-02-15.json").write_text(json.dumps(assessment), encoding="utf-8")
+
+    collector.ingest([{**_event("mgmt01", compliant=False), "zone": "management"}])
+    live = json.loads((tmp_path / "live" / "current.json").read_text(encoding="utf-8"))
+    assert "mgmt01" not in [system["hostname"] for system in live["controls"][0]["systems"]]
+    assert "mgmt01" in [system["hostname"] for system in live["controls"][1]["systems"]]
+    assert live["controls"][0]["status"] == "pass"
+
+
+def test_serve_refuses_unauthenticated_events_off_loopback(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.delenv("COMPLIANCE_COLLECTOR_TOKEN", raising=False)
+    monkeypatch.setattr(sys, "argv", ["compliance_collector.py", "serve", "--bind", "0.0.0.0"])
+
+    assert compliance_collector.main() == 2
+    assert compliance_collector.is_loopback("127.0.0.1")
+    assert compliance_collector.is_loopback("::1")
+    assert compliance_collector.is_loopback("localhost")
+    assert not compliance_collector.is_loopback("0.0.0.0")
+    assert not compliance_collector.is_loopback("collector.example.org")
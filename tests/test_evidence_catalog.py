@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import build_checksum_manifest  # noqa: E402
+import evidence_catalog  # noqa: E402
+import evidence_store  # noqa: E402
+
+RUN = "evidence-2026-02-15T02-00-00Z"
+
+
+def _evidence_root(tmp_path: Path) -> tuple[Path, Path]:
+    store = tmp_path / "store"
+    root = tmp_path / "auditor_packages" / "2026-02-15" / "evidence" / RUN
+    for host in ("compute001", "compute002"):
+        sha256, _ = evidence_store.put_output(b"permitrootlogin no\n", store)
+        evidence_store.write_manifest(
+            RUN,
+            {
+                "host": host,
+                "zone": "restricted",
+                "collected": "2026-02-15T02:00:00Z",
+                "artifacts": [
+                    {
+                        "id": "sshd_config",
+                        "family": "IA",
+                        "command": "sshd -T",
+                        "filename": "sshd_config.txt",
+                        "stdout": sha256,
+                    }
+                ],
+                "inventory": {"hostname": host},
+            },
+            store,
+        )
+    evidence_store.materialize(RUN, root, store)
+    (root / "openscap").mkdir()
+    (root / "openscap" / "report.html").write_text("<html></html>", encoding="utf-8")
+    files, _ = build_checksum_manifest.build_manifest(root)
+    build_checksum_manifest.write_manifests(root, files)
+    return root, store
+
+
+def test_catalog_indexes_each_physical_file_with_host_family_and_controls(tmp_path: Path) -> None:
+    root, store = _evidence_root(tmp_path)
+
+    path, count = evidence_catalog.build_catalog(root, store_dir=store)
+
+    assert path == root / evidence_catalog.CATALOG_NAME
+    assert count == 5
+    connection, catalog_root = evidence_catalog.open_catalog(tmp_path / "auditor_packages")
+    assert catalog_root == root
+    rows = evidence_catalog.query(connection, control_id="3.5.3")
+    assert [row["path"] for row in rows] == [
+        "by_system/compute001/sshd_config.txt",
+        "by_system/compute002/sshd_config.txt",
+    ]
+    assert rows[0]["family_path"] == "by_family/IA/compute001_sshd_config.txt"
+    assert rows[0]["command"] == "sshd -T"
+    assert rows[0]["sha256"] == build_checksum_manifest.sha256_file(root / rows[0]["path"])
+    host_rows = evidence_catalog.query(connection, host="compute002", limit=1)
+    assert host_rows[0]["path"] == "by_system/compute002/sshd_config.txt"
+    assert evidence_catalog.query(connection, control_id="3.1.1") == []
+
+
+def test_directory_without_catalog_is_indexed_in_one_walk(tmp_path: Path) -> None:
+    (tmp_path / "by_family" / "AU").mkdir(parents=True)
+    (tmp_path / "by_family" / "AU" / "compute001_audit_rules.txt").write_text("-w /etc/passwd\n", encoding="utf-8")
+    (tmp_path / ".bundles").mkdir()
+    (tmp_path / ".bundles" / "compute001.tar.gz").write_bytes(b"")
+
+    connection, root = evidence_catalog.open_catalog(tmp_path)
+
+    assert root == tmp_path
+    assert [row["path"] for row in evidence_catalog.query(connection)] == ["by_family/AU/compute001_audit_rules.txt"]
+    assert evidence_catalog.query(connection, control_id="3.3.1")[0]["family"] == "AU"
+    assert evidence_catalog.open_catalog(tmp_path / "missing") == (None, tmp_path / "missing")
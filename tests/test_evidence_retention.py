@@ -0,0 +1,113 @@
+from __future__ import annotations
+
+import filecmp
+import os
+import sys
+import tarfile
+from datetime import date
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import build_checksum_manifest  # noqa: E402
+import evidence_retention  # noqa: E402
+
+
+def _run(root: Path, day: str, packages: str) -> Path:
+    run = root / day / "evidence" / f"evidence-{day}T02-00-00Z"
+    for host in ("compute001", "compute002"):
+        system = run / "by_system" / host / "packages.txt"
+        system.parent.mkdir(parents=True)
+        system.write_text(f"# host: {host}\n{packages}\n", encoding="utf-8")
+        family = run / "by_family" / "CM" / f"{host}_packages.txt"
+        family.parent.mkdir(parents=True, exist_ok=True)
+        os.link(system, family)
+        sshd = run / "by_system" / host / "sshd_config.txt"
+        sshd.write_text(f"# host: {host}\npermitrootlogin no\n", encoding="utf-8")
+    files, _ = build_checksum_manifest.build_manifest(run)
+    build_checksum_manifest.write_manifests(run, files)
+    (run / "metadata.json").write_text(f'{{"day": "{day}"}}', encoding="utf-8")
+    with tarfile.open(root / f"{day}.tar.gz", "w:gz") as archive:
+        archive.add(root / day, arcname=day)
+    return run
+
+
+def _snapshot(path: Path) -> dict[str, bytes]:
+    return {p.relative_to(path).as_posix(): p.read_bytes() for p in sorted(path.rglob("*")) if p.is_file()}
+
+
+def test_gc_stores_intermediate_days_as_deltas_and_reconstructs_them(tmp_path: Path) -> None:
+    root = tmp_path / "auditor_packages"
+    _run(root, "2026-02-01", "openssh-9.6")
+    second = _run(root, "2026-02-02", "openssh-9.6")
+    third = _run(root, "2026-02-03", "openssh-9.7")
+    _run(root, "2026-02-08", "openssh-9.7")
+    original = {day: _snapshot(root / day) for day in ("2026-02-02", "2026-02-03")}
+
+    report = evidence_retention.collect_garbage(root, full_every=7, keep_recent=1)
+
+    assert report["converted"] == [
+        "2026-02-02/evidence/evidence-2026-02-02T02-00-00Z",
+        "2026-02-03/evidence/evidence-2026-02-03T02-00-00Z",
+    ]
+    assert report["reclaimed_bytes"] > 0
+    assert not (root / "2026-02-01.tar.gz").exists()
+    assert (root / "2026-02-08.tar.gz").exists()
+    assert sorted(p.name for p in second.rglob("*.txt")) == []
+    assert sorted(p.relative_to(third).as_posix() for p in third.rglob("*.txt")) == [
+        "by_family/CM/compute001_packages.txt",
+        "by_family/CM/compute002_packages.txt",
+        "by_system/compute001/packages.txt",
+        "by_system/compute002/packages.txt",
+    ]
+    kinds = [run.kind for run in evidence_retention.plan_runs(root, 7)]
+    assert kinds == ["full", "delta", "delta", "full"]
+    assert evidence_retention.collect_garbage(root, full_every=7, keep_recent=1)["converted"] == []
+
+    archive = evidence_retention.reconstruct(root, "2026-02-03", tmp_path / "out")
+    with tarfile.open(archive, "r:gz") as handle:
+        handle.extractall(tmp_path / "extracted")
+    assert _snapshot(tmp_path / "extracted" / "2026-02-03") == original["2026-02-03"]
+
+    rebuilt = evidence_retention.reconstruct(root, "2026-02-02", tmp_path / "dirs", archive=False)
+    assert _snapshot(rebuilt) == original["2026-02-02"]
+    run = rebuilt / "evidence" / "evidence-2026-02-02T02-00-00Z"
+    family = run / "by_family" / "CM" / "compute001_packages.txt"
+    assert filecmp.cmp(family, run / "by_system" / "compute001" / "packages.txt")
+
+
+def test_reconstruct_rejects_a_base_file_changed_in_place(tmp_path: Path) -> None:
+    root = tmp_path / "auditor_packages"
+    base = _run(root, "2026-02-01", "openssh-9.6")
+    _run(root, "2026-02-02", "openssh-9.6")
+    _run(root, "2026-02-08", "openssh-9.7")
+    evidence_retention.collect_garbage(root, full_every=7, keep_recent=1)
+
+    # Same inode, same manifest entry, different bytes: only hashing the file can notice.
+    sshd = base / "by_system" / "compute001" / "sshd_config.txt"
+    sshd.write_text("# host: compute001\npermitrootlogin yes\n", encoding="utf-8")
+
+    with pytest.raises(ValueError, match="no longer matches"):
+        evidence_retention.reconstruct(root, "2026-02-02", tmp_path / "out", archive=False)
+
+
+def test_snapshot_groups_expire_together(tmp_path: Path) -> None:
+    root = tmp_path / "auditor_packages"
+    _run(root, "2026-01-01", "a")
+    _run(root, "2026-01-02", "a")
+    _run(root, "2026-01-10", "b")
+
+    report = evidence_retention.collect_garbage(
+        root, full_every=7, keep_recent=1, max_age_days=30, today=date(2026, 2, 5)
+    )
+
+    assert report["expired"] == [
+        "2026-01-01/evidence/evidence-2026-01-01T02-00-00Z",
+        "2026-01-02/evidence/evidence-2026-01-02T02-00-00Z",
+    ]
+    assert sorted(path.name for path in root.iterdir()) == ["2026-01-10", "2026-01-10.tar.gz"]
@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PLUGIN_DIR = REPO_ROOT / "plugins" / "filter"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+from evidence_schedule import evidence_waves, poll_retries  # noqa: E402
+
+HOST_ZONES = {
+    "mgmt01": "management",
+    "ansible01": "management",
+    "login01": "internal",
+    "login02": "internal",
+    "login03": "internal",
+    "compute01": "restricted",
+    "compute02": "restricted",
+    "web01": None,
+}
+
+
+def test_capped_zones_are_split_into_waves_of_at_most_cap_hosts() -> None:
+    schedule = evidence_waves(HOST_ZONES, {"management": 1, "internal": 2})
+
+    assert schedule["waves"] == 2
+    assert schedule["capped_zones"] == ["internal", "management"]
+    waves = schedule["host_wave"]
+    assert [waves["ansible01"], waves["mgmt01"]] == [0, 1]
+    assert [waves["login01"], waves["login02"], waves["login03"]] == [0, 0, 1]
+    # Uncapped zones all launch at once.
+    assert waves["compute01"] == waves["compute02"] == waves["web01"] == 0
+
+
+def test_no_caps_launches_every_host_in_one_wave() -> None:
+    schedule = evidence_waves(HOST_ZONES, {"public": 1})
+
+    assert schedule["waves"] == 1
+    assert schedule["capped_zones"] == []
+    assert set(schedule["host_wave"].values()) == {0}
+    assert evidence_waves({}, {"internal": 2})["waves"] == 0
+
+
+def test_poll_retries_fit_the_remaining_budget() -> None:
+    assert poll_retries(1000, 700, 10) == 30
+    assert poll_retries(1000, 1005, 10) == 1
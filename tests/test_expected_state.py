@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+import pytest
+
+pytest.importorskip("ansible")
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PLUGIN_DIR = REPO_ROOT / "plugins" / "action"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import expected_state  # noqa: E402
+from ansible.parsing.dataloader import DataLoader  # noqa: E402
+from ansible.template import Templar  # noqa: E402
+
+
+def _environment() -> Any:
+    return Templar(loader=DataLoader()).environment
+
+
+def test_referenced_variables_find_only_what_the_template_reads() -> None:
+    source = (REPO_ROOT / "roles" / "ac_ssh_hardening" / "templates" / "sshd_config.j2").read_text(encoding="utf-8")
+    names, dynamic = expected_state.referenced_variables(_environment(), source)
+
+    assert names
+    assert all(not name.startswith("au_") for name in names)
+    assert dynamic is False
+
+    watch = (REPO_ROOT / "roles" / "ca_continuous_monitoring" / "templates" / "watch.json.j2").read_text(encoding="utf-8")
+    assert expected_state.referenced_variables(_environment(), watch)[1] is True
+
+
+def test_variable_set_key_changes_with_values_and_template_source() -> None:
+    key = expected_state.variable_set_key("ac_login_banner", "issue.j2", "{{ banner }}", {"banner": "CUI"})
+
+    assert key == expected_state.variable_set_key("ac_login_banner", "issue.j2", "{{ banner }}", {"banner": "CUI"})
+    assert key != expected_state.variable_set_key("ac_login_banner", "issue.j2", "{{ banner }}", {"banner": "X"})
+    assert key != expected_state.variable_set_key("ac_login_banner", "issue.j2", "{{ banner }}\n", {"banner": "CUI"})
+
+
+def test_catalog_entries_round_trip(tmp_path: Path) -> None:
+    expected_state.save_entry("ab" * 32, {"sha256": "cd" * 32}, tmp_path)
+
+    assert expected_state.load_entry("ab" * 32, tmp_path) == {"sha256": "cd" * 32}
+    assert expected_state.load_entry("ef" * 32, tmp_path) is None
+
+
+def test_role_layers_merge_defaults_and_vars_in_role_order() -> None:
+    defaults, role_vars = expected_state.role_layers(("common", "ac_ssh_hardening", "hpc_interconnect"))
+
+    assert defaults["ac_ssh_hardening_templates"][0]["src"] == "sshd_config.j2"
+    assert "hpc_interconnect_enabled" in defaults
+    assert role_vars
+
+
+def test_role_layers_are_parsed_once_per_role_list(tmp_path: Path) -> None:
+    defaults_file = tmp_path / "demo" / "defaults" / "main.yml"
+    defaults_file.parent.mkdir(parents=True)
+    defaults_file.write_text("demo_enabled: true\n", encoding="utf-8")
+
+    first = expected_state.role_layers(("demo",), tmp_path)
+    defaults_file.write_text("demo_enabled: false\n", encoding="utf-8")
+
+    assert expected_state.role_layers(("demo",), tmp_path) is first
+    assert first[0] == {"demo_enabled": True}
+
+
+def test_host_check_reports_only_changed_or_missing_files(tmp_path: Path) -> None:
+    good, bad = tmp_path / "good.conf", tmp_path / "bad name.conf"
+    good.write_text("PermitRootLogin no\n", encoding="utf-8")
+    bad.write_text("PermitRootLogin yes\n", encoding="utf-8")
+    digest = subprocess.run(["sha256sum", str(good)], capture_output=True, text=True, check=True).stdout.split()[0]
+    expected = {str(good): digest, str(bad): digest, str(tmp_path / "missing.conf"): digest}
+
+    output = subprocess.run(
+        ["/bin/sh", "-c", expected_state.check_command(expected)], capture_output=True, text=True, check=True
+    ).stdout
+    assert expected_state.parse_check_output(output, expected) == sorted([str(bad), str(tmp_path / "missing.conf")])
@@ -0,0 +1,82 @@
+from __future__ import annotations
+
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+pytest.importorskip("ansible")
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PLUGIN_DIR = REPO_ROOT / "plugins" / "action"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import fact_snapshot  # noqa: E402
+
+PROBE = "3f0c2d4e-boot\n--\n/var/lib/rpm/rpmdb.sqlite 1760000000 8192\n"
+ASSESS_SUBSET = ["!all", "!min", "date_time"]
+
+
+def _signature(stdout: str = PROBE) -> dict[str, str]:
+    return fact_snapshot.host_signature(stdout)
+
+
+def test_normalize_subset_matches_setup_semantics() -> None:
+    assert fact_snapshot.normalize_subset(None) == ["all", "min"]
+    assert fact_snapshot.normalize_subset("!all,!min,date_time") == ["date_time"]
+    assert fact_snapshot.normalize_subset(["min", "mounts"]) == ["min", "mounts"]
+    assert fact_snapshot.normalize_subset(["!all", "distribution"]) == ["distribution", "min"]
+
+
+def test_snapshot_is_reused_until_reboot_package_change_or_ttl(tmp_path: Path) -> None:
+    requested = fact_snapshot.normalize_subset(ASSESS_SUBSET)
+    fact_snapshot.save_snapshot("c1", {"date_time": {"epoch": "1"}}, requested, _signature(), 1000.0, tmp_path)
+    snapshots = fact_snapshot.load_snapshots("c1", tmp_path)
+
+    snapshot, reason = fact_snapshot.find_snapshot(snapshots, _signature(), requested, 3600, 2000.0)
+    assert reason == "hit"
+    assert snapshot["ansible_facts"] == {"date_time": {"epoch": "1"}}
+
+    rebooted = _signature(PROBE.replace("3f0c2d4e-boot", "9a9a-boot"))
+    assert fact_snapshot.find_snapshot(snapshots, rebooted, requested, 3600, 2000.0) == (None, "rebooted")
+
+    updated = _signature(PROBE.replace("1760000000", "1760003600"))
+    assert fact_snapshot.find_snapshot(snapshots, updated, requested, 3600, 2000.0) == (None, "packages_changed")
+
+    assert fact_snapshot.find_snapshot(snapshots, _signature(), requested, 3600, 9000.0) == (None, "expired")
+    assert fact_snapshot.find_snapshot(snapshots, _signature(), requested, 0, 2000.0) == (None, "disabled")
+
+
+def test_narrow_snapshot_does_not_satisfy_wider_subset(tmp_path: Path) -> None:
+    narrow = fact_snapshot.normalize_subset(ASSESS_SUBSET)
+    wide = fact_snapshot.normalize_subset(["!all", "!min", "date_time", "distribution"])
+    fact_snapshot.save_snapshot("c1", {"date_time": {}}, narrow, _signature(), 1000.0, tmp_path)
+
+    snapshots = fact_snapshot.load_snapshots("c1", tmp_path)
+    assert fact_snapshot.find_snapshot(snapshots, _signature(), wide, 3600, 1001.0) == (None, "subset")
+
+    fact_snapshot.save_snapshot("c1", {"date_time": {}, "distribution": "Rocky"}, wide, _signature(), 1001.0, tmp_path)
+    snapshot, reason = fact_snapshot.find_snapshot(
+        fact_snapshot.load_snapshots("c1", tmp_path), _signature(), narrow, 3600, 1002.0
+    )
+    assert reason == "hit"
+    assert snapshot is not None
+
+    fact_snapshot.invalidate("c1", tmp_path)
+    assert fact_snapshot.load_snapshots("c1", tmp_path) == []
+
+
+def test_volatile_facts_refresh_only_when_requested() -> None:
+    assert fact_snapshot.volatile_refresh(["date_time"], ["date_time"]) == ["date_time"]
+    assert fact_snapshot.volatile_refresh(["min", "mounts"], ["date_time"]) == ["date_time"]
+    assert fact_snapshot.volatile_refresh(["distribution"], ["date_time"]) == []
+
+
+def test_playbook_fact_profiles_are_declared_for_gathering_playbooks() -> None:
+    profiles = yaml.safe_load((REPO_ROOT / "playbooks" / "vars" / "fact_profiles.yml").read_text(encoding="utf-8"))
+    for playbook in ("site", "assess", "evidence", "ssp_evidence"):
+        assert playbook in profiles["fact_gather_profiles"]
+        plays = yaml.safe_load((REPO_ROOT / "playbooks" / f"{playbook}.yml").read_text(encoding="utf-8"))
+        assert all(play.get("gather_facts") is False for play in plays)
@@ -0,0 +1,141 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PLUGIN_DIR = REPO_ROOT / "plugins" / "filter"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import role_evidence  # noqa: E402
+import verify_results  # noqa: E402
+
+SSHD_OUTPUT = "\n".join(f"option{index} value{index}" for index in range(200))
+
+
+def _stat_result(path: str) -> dict:
+    return {
+        "item": path,
+        "ansible_loop_var": "item",
+        "changed": False,
+        "failed": False,
+        "invocation": {"module_args": {"path": path, "follow": False, "get_checksum": True, "get_mime": True}},
+        "stat": {
+            "path": path,
+            "exists": True,
+            "mode": "0600",
+            "pw_name": "root",
+            "gr_name": "root",
+            "uid": 0,
+            "gid": 0,
+            "mtime": 1739584800.0,
+            "atime": 1739584800.0,
+            "ctime": 1739584800.0,
+            "checksum": "ab" * 32,
+            "mimetype": "text/plain",
+            "charset": "us-ascii",
+            "size": 3512,
+            "inode": 12345,
+            "dev": 64768,
+            "attributes": [],
+            "isreg": True,
+        },
+    }
+
+
+def _command_result() -> dict:
+    return {
+        "item": {"id": "sshd_effective", "command": "sshd -T"},
+        "ansible_loop_var": "item",
+        "cmd": ["sshd", "-T"],
+        "rc": 0,
+        "start": "2026-02-15 02:00:00.000000",
+        "end": "2026-02-15 02:00:00.125000",
+        "delta": "0:00:00.125000",
+        "stdout": SSHD_OUTPUT,
+        "stdout_lines": SSHD_OUTPUT.splitlines(),
+        "stderr": "",
+        "stderr_lines": [],
+        "changed": False,
+        "invocation": {"module_args": {"_raw_params": "sshd -T", "_uses_shell": False, "chdir": None}},
+    }
+
+
+def _legacy_payload() -> dict:
+    return {
+        "role": "ac_ssh_hardening",
+        "host": "compute001",
+        "zone": "restricted",
+        "collected_at": "2026-02-15T02:00:00Z",
+        "file_stats": [_stat_result("/etc/ssh/sshd_config"), {"item": "/etc/issue", "stat": {"exists": False}}],
+        "command_results": [_command_result()],
+    }
+
+
+def test_compact_records_keep_identity_and_store_full_output(tmp_path: Path) -> None:
+    files = role_evidence.compact_evidence_files(_legacy_payload()["file_stats"])
+    commands = role_evidence.compact_evidence_commands([_command_result()], store_dir=tmp_path)
+
+    assert files == [
+        {
+            "path": "/etc/ssh/sshd_config",
+            "exists": True,
+            "mode": "0600",
+            "owner": "root",
+            "mtime": 1739584800.0,
+            "checksum": "ab" * 32,
+        },
+        {"path": "/etc/issue", "exists": False},
+    ]
+    assert commands[0]["id"] == "sshd_effective"
+    assert commands[0]["duration_seconds"] == 0.125
+    assert set(commands[0]) == {"id", "rc", "duration_seconds", "output_sha256", "output_bytes"}
+    assert verify_results.load_output(commands[0]["output_sha256"], tmp_path)["stdout"] == SSHD_OUTPUT
+
+
+def test_legacy_payload_is_upgraded_and_an_order_of_magnitude_smaller(tmp_path: Path) -> None:
+    legacy = _legacy_payload()
+    upgraded = role_evidence.upgrade_role_evidence(legacy, store_dir=tmp_path)
+
+    assert upgraded["schema_version"] == role_evidence.SCHEMA_VERSION
+    assert {"role", "host", "zone", "collected_at", "files", "commands"} <= set(upgraded)
+    assert "file_stats" not in upgraded and "command_results" not in upgraded
+    assert role_evidence.upgrade_role_evidence(upgraded, store_dir=tmp_path) is upgraded
+    assert len(json.dumps(upgraded, indent=4)) * 10 < len(json.dumps(legacy, indent=4))
+
+
+def test_upgrade_script_rewrites_legacy_payloads_in_place(tmp_path: Path) -> None:
+    payload_dir = tmp_path / "cui-evidence" / "compute001"
+    payload_dir.mkdir(parents=True)
+    legacy = payload_dir / "ac_ssh_hardening_evidence.json"
+    legacy.write_text(json.dumps(_legacy_payload(), indent=4), encoding="utf-8")
+
+    result = subprocess.run(
+        [
+            sys.executable,
+            str(REPO_ROOT / "scripts" / "upgrade_role_evidence.py"),
+            "--in-place",
+            "--store-dir",
+            str(tmp_path / "store"),
+            str(tmp_path / "cui-evidence"),
+        ],
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.startswith("Upgraded 1 legacy payload(s), 0 already current")
+    assert json.loads(legacy.read_text(encoding="utf-8"))["schema_version"] == 2
+
+
+def test_every_role_writes_the_compact_payload_schema() -> None:
+    for path in sorted(REPO_ROOT.glob("roles/*/tasks/evidence.yml")):
+        text = path.read_text(encoding="utf-8")
+        if "_evidence_payload" not in text:
+            continue
+        assert "compact_evidence_files" in text and "compact_evidence_commands" in text, path
+        assert ".results | default([]) }}" not in text, path
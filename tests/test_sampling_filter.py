@@ -0,0 +1,92 @@
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PLUGIN_DIR = REPO_ROOT / "plugins" / "filter"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import sampling  # noqa: E402
+
+
+def _pool(count: int, fingerprint: str = "restricted:golden-1") -> dict[str, str]:
+    return {f"compute{index:04d}": fingerprint for index in range(count)}
+
+
+def test_sample_size_is_small_for_large_homogeneous_pools() -> None:
+    assert sampling.sample_size(2000) <= 60
+    assert sampling.sample_size(2000, confidence=0.99) > sampling.sample_size(2000)
+    assert sampling.sample_size(5) == 5
+    assert sampling.sample_size(0) == 0
+
+
+def test_assessment_sample_selects_per_fingerprint_group() -> None:
+    hosts = _pool(2000)
+    hosts.update({"login01": "internal:login", "login02": "internal:login"})
+
+    result = sampling.assessment_sample(hosts, seed="2026-02-15", previous_assessment={})
+
+    assert len(result["selected_hosts"]) <= 62
+    assert {"login01", "login02"}.issubset(result["selected_hosts"])
+    assert len(result["selected_hosts"]) + len(result["inferred_hosts"]) == 2002
+    assert result["confidence"] == 0.95
+    assert {group["fingerprint"] for group in result["groups"]} == {"restricted:golden-1", "internal:login"}
+
+
+def test_assessment_sample_is_deterministic_for_a_seed() -> None:
+    first = sampling.assessment_sample(_pool(500), seed="2026-02-15", previous_assessment={})
+    second = sampling.assessment_sample(_pool(500), seed="2026-02-15", previous_assessment={})
+    assert first["selected_hosts"] == second["selected_hosts"]
+
+
+def test_previously_failing_changed_and_forced_hosts_are_always_assessed() -> None:
+    hosts = _pool(500)
+    hosts["compute0007"] = "restricted:golden-2"
+    previous = {
+        "controls": [
+            {
+                "control_id": "3.1.1",
+                "systems": [
+                    # Aggregation stamps the control's status on every system.
+                    {"hostname": "compute0100", "host_passed": False, "status": "fail"},
+                    {"hostname": "compute0101", "host_passed": True, "status": "fail"},
+                ],
+            }
+        ],
+        "sampling": {"fingerprints": {**_pool(500)}},
+    }
+
+    result = sampling.assessment_sample(
+        hosts,
+        seed="2026-02-15",
+        forced_hosts=["compute0200"],
+        previous_assessment=previous,
+    )
+
+    for host in ("compute0100", "compute0007", "compute0200"):
+        assert host in result["selected_hosts"]
+    restricted = next(group for group in result["groups"] if group["fingerprint"] == "restricted:golden-1")
+    assert set(restricted["mandatory_hosts"]) == {"compute0100", "compute0200"}
+
+
+def test_unknown_fingerprints_are_never_inferred() -> None:
+    hosts = _pool(100)
+    hosts["compute0050"] = ""
+    hosts["compute0051"] = "restricted:unknown"
+    result = sampling.assessment_sample(hosts, seed="x", previous_assessment={})
+    assert {"compute0050", "compute0051"}.issubset(result["selected_hosts"])
+
+
+def test_previous_assessment_is_read_from_the_configured_history_dir(tmp_path: Path) -> None:
+    previous = {
+        "controls": [{"control_id": "3.1.1", "systems": [{"hostname": "compute0042", "host_passed": False}]}],
+        "sampling": {"fingerprints": _pool(500)},
+    }
+    (tmp_path / "2026-02-14.json").write_text(json.dumps(previous), encoding="utf-8")
+
+    result = sampling.assessment_sample(_pool(500), seed="x", history_dir=str(tmp_path))
+
+    assert result["groups"][0]["mandatory_hosts"] == ["compute0042"]
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+import json
+import os
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip("ansible")
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+for plugin_dir in (REPO_ROOT / "scripts", REPO_ROOT / "plugins" / "connection"):
+    if str(plugin_dir) not in sys.path:
+        sys.path.insert(0, str(plugin_dir))
+
+import generate_simulated_fleet  # noqa: E402
+import simulated  # noqa: E402
+
+
+def _fleet(host: str = "sim-compute00001", profile: str = "default") -> simulated.FleetModel:
+    return simulated.FleetModel(simulated.load_model(str(simulated.DEFAULT_MODEL_FILE)), host, profile, seed="test")
+
+
+def test_build_inventory_distributes_hosts_across_zones() -> None:
+    inventory = generate_simulated_fleet.build_inventory(2000, drift_rate=0.1, unreachable_rate=0.01, seed="s")
+    children = inventory["all"]["children"]
+
+    assert sum(len(group["hosts"]) for group in children.values()) == 2000
+    assert len(children["restricted"]["hosts"]) > len(children["internal"]["hosts"])
+    assert inventory["all"]["vars"]["ansible_connection"] == "simulated"
+    assert inventory == generate_simulated_fleet.build_inventory(2000, drift_rate=0.1, unreachable_rate=0.01, seed="s")
+
+    host_vars = [value or {} for group in children.values() for value in group["hosts"].values()]
+    assert 100 < sum(1 for entry in host_vars if entry.get("ansible_simulated_profile") == "drifted") < 300
+    assert 0 < sum(1 for entry in host_vars if entry.get("ansible_simulated_unreachable")) < 60
+
+
+def test_write_inventory_links_real_group_vars(tmp_path: Path) -> None:
+    inventory_file = generate_simulated_fleet.write_inventory(generate_simulated_fleet.build_inventory(5), tmp_path)
+
+    assert inventory_file.exists()
+    assert (tmp_path / "group_vars" / "restricted.yml").exists()
+
+
+def test_fleet_model_profiles_and_failure_injection() -> None:
+    assert _fleet().command_result("systemctl is-active auditd") == {"rc": 0, "stdout": "active", "stderr": ""}
+    assert _fleet(profile="drifted").command_result("systemctl is-active auditd")["rc"] == 3
+    assert _fleet(host="n1", profile="golden").command_result("sha256sum /etc/image-id")["stdout"].startswith("golden-")
+
+    outcomes = [_fleet(host=f"n{index}").command_result("test -f /etc/issue", failure_rate=0.5)["rc"] for index in range(200)]
+    assert 60 < outcomes.count(1) < 140
+    assert outcomes == [_fleet(host=f"n{index}").command_result("test -f /etc/issue", failure_rate=0.5)["rc"] for index in range(200)]
+
+
+def test_parse_module_payload_reads_ansiballz_wrapper() -> None:
+    params = json.dumps({"ANSIBLE_MODULE_ARGS": {"_raw_params": "sshd -T", "_ansible_check_mode": False}})
+    wrapper = (
+        "def invoke_module(modlib_path, temp_path, json_params):\n"
+        "    runpy.run_module(mod_name='ansible.modules.command', init_globals=None)\n"
+        f"    ANSIBALLZ_PARAMS = {params!r}\n"
+    )
+    assert simulated.parse_module_payload(wrapper.encode("utf-8")) == (
+        "command",
+        {"_raw_params": "sshd -T", "_ansible_check_mode": False},
+    )
+    assert simulated.parse_module_payload(b"echo hello") is None
+
+
+@pytest.mark.skipif(shutil.which("ansible-playbook") is None, reason="ansible-playbook not installed")
+def test_compliance_gate_runs_against_simulated_fleet(tmp_path: Path) -> None:
+    inventory = generate_simulated_fleet.build_inventory(
+        8, zones={"restricted": 1.0}, latency_ms=1, jitter_ms=1, drift_rate=0, slow_rate=0, unreachable_rate=0
+    )
+    hosts = inventory["all"]["children"]["restricted"]["hosts"]
+    hosts["sim-compute00001"] = {"ansible_simulated_profile": "drifted"}
+    hosts["sim-compute00002"] = {"ansible_simulated_unreachable": True}
+    inventory_file = generate_simulated_fleet.write_inventory(inventory, tmp_path / "inventory")
+
+    result = subprocess.run(
+        ["ansible-playbook", "tests/playbooks/test_compliance_gate.yml", "-i", str(inventory_file), "-f", "8"],
+        cwd=REPO_ROOT,
+        env=dict(
+            os.environ,
+            ANSIBLE_CALLBACKS_ENABLED="assessment_profile",
+            ASSESSMENT_PROFILE_DIR=str(tmp_path / "profiles"),
+        ),
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+
+    assert "sim-compute00003           : ok=5" in result.stdout
+    assert "Compliance gate failed for node sim-compute00001" in result.stdout
+    assert "sim-compute00002           : ok=0    changed=0    unreachable=1" in result.stdout
+    assert list((tmp_path / "profiles").glob("test_compliance_gate-*.json"))
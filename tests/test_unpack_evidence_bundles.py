@@ -0,0 +1,247 @@
+from __future__ import annotations
+
+import io
+import json
+import sys
+import tarfile
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+import evidence_store  # noqa: E402
+import unpack_evidence_bundles  # noqa: E402
+
+ARTIFACTS = [
+    {"id": "sshd_config", "family": "IA", "command": "sshd -T", "filename": "sshd_config.txt"},
+    {"id": "selinux_status", "family": "AC", "command": "sestatus", "filename": "selinux_status.txt"},
+]
+
+
+def _manifest(host: str) -> dict:
+    return {
+        "host": host,
+        "zone": "restricted",
+        "collected": "2026-02-15T02:00:00Z",
+        "artifacts": ARTIFACTS,
+        "inventory": {"hostname": host, "zone": "restricted", "os_family": "RedHat", "os_version": "9.4"},
+    }
+
+
+def _bundle(path: Path, members: dict[str, bytes]) -> Path:
+    with tarfile.open(path, "w:gz") as archive:
+        for name, data in members.items():
+            info = tarfile.TarInfo(name)
+            info.size = len(data)
+            archive.addfile(info, io.BytesIO(data))
+    return path
+
+
+def _host_bundle(tmp_path: Path, host: str) -> Path:
+    return _bundle(
+        tmp_path / f"{host}.tar.gz",
+        {
+            "manifest.json": json.dumps(_manifest(host)).encode(),
+            "sshd_config.stdout": b"permitrootlogin no\npassword = hunter2\n",
+            "sshd_config.stderr": b"",
+            "selinux_status.stdout": b"",
+            "selinux_status.stderr": b"sestatus: command not found\n",
+        },
+    )
+
+
+def test_bundle_materializes_into_system_family_and_inventory_views(tmp_path: Path) -> None:
+    store, root = tmp_path / "store", tmp_path / "evidence"
+    unpack_evidence_bundles.ingest_bundle(_host_bundle(tmp_path, "compute001"), "evidence-run1", store)
+
+    assert evidence_store.materialize("evidence-run1", root, store) == {"files": 3, "links": 2, "indexes": 0}
+    system_file = root / "by_system" / "compute001" / "sshd_config.txt"
+    assert system_file.read_text() == (
+        "# command: sshd -T\n# host: compute001\n# zone: restricted\n"
+        "# collected: 2026-02-15T02:00:00Z\npermitrootlogin no\npassword = [REDACTED]\n"
+    )
+    assert (root / "by_family" / "IA" / "compute001_sshd_config.txt").samefile(system_file)
+    assert (root / "by_system" / "compute001" / "selinux_status.txt").read_text().endswith(
+        "\n# stderr:\nsestatus: command not found\n"
+    )
+    assert json.loads((root / "inventory" / "compute001.json").read_text())["os_version"] == "9.4"
+
+
+def test_family_index_replaces_links_when_requested(tmp_path: Path) -> None:
+    store, root = tmp_path / "store", tmp_path / "evidence"
+    unpack_evidence_bundles.ingest_bundle(_host_bundle(tmp_path, "compute001"), "evidence-run1", store)
+
+    counts = evidence_store.materialize("evidence-run1", root, store, family_view="index")
+
+    assert counts == {"files": 3, "links": 0, "indexes": 2}
+    index = (root / "by_family" / "IA" / "index.txt").read_text().splitlines()
+    assert index[1] == "compute001_sshd_config.txt -> ../../by_system/compute001/sshd_config.txt"
+    assert sorted(path.name for path in (root / "by_family" / "AC").iterdir()) == ["index.txt"]
+
+
+def test_identical_output_is_stored_and_redacted_once(tmp_path: Path) -> None:
+    store = tmp_path / "store"
+    first = unpack_evidence_bundles.ingest_bundle(_host_bundle(tmp_path, "compute001"), "evidence-run1", store)
+    second = unpack_evidence_bundles.ingest_bundle(_host_bundle(tmp_path, "compute002"), "evidence-run1", store)
+
+    assert first["bundle"]["redacted_objects"] == 3
+    assert second["bundle"]["redacted_objects"] == 0
+    assert [artifact["stdout"] for artifact in first["artifacts"]] == [
+        artifact["stdout"] for artifact in second["artifacts"]
+    ]
+    stats = evidence_store.run_stats("evidence-run1", store)
+    assert stats["references"] == 8
+    assert stats["unique_objects"] == 3
+    assert stats["stored_bytes"] < stats["logical_bytes"]
+
+
+def test_new_pattern_pack_redacts_again_and_is_not_offered_old_output(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    store = tmp_path / "store"
+    bundle = _bundle(
+        tmp_path / "compute001.tar.gz",
+        {
+            "manifest.json": json.dumps(_manifest("compute001")).encode(),
+            "sshd_config.fingerprint": b"f1",
+            "sshd_config.stdout": b"permitrootlogin no\n",
+        },
+    )
+    first = unpack_evidence_bundles.ingest_bundle(bundle, "evidence-run1", store)
+    assert first["bundle"]["redacted_objects"] == 1
+    assert evidence_store.latest_fingerprints(store) == {"compute001": {"sshd_config": "f1"}}
+
+    monkeypatch.setattr(evidence_store, "redaction_version", lambda: "f" * 64)
+    assert evidence_store.latest_fingerprints(store) == {"compute001": {}}
+    second = unpack_evidence_bundles.ingest_bundle(bundle, "evidence-run2", store)
+    assert second["bundle"]["redacted_objects"] == 1
+    assert second["artifacts"][0]["redaction_version"] == "f" * 64
+
+
+def test_bundle_without_leading_manifest_is_rejected(tmp_path: Path) -> None:
+    bundle = _bundle(tmp_path / "bad.tar.gz", {"sshd_config.stdout": b"x", "manifest.json": b"{}"})
+    with pytest.raises(unpack_evidence_bundles.BundleError):
+        unpack_evidence_bundles.ingest_bundle(bundle, "evidence-run1", tmp_path / "store")
+
+    (tmp_path / "text.tar.gz").write_text("simulated content\n")
+    with pytest.raises(unpack_evidence_bundles.BundleError):
+        unpack_evidence_bundles.ingest_bundle(tmp_path / "text.tar.gz", "evidence-run1", tmp_path / "store")
+
+
+def test_unchanged_fingerprint_links_the_previous_output(tmp_path: Path) -> None:
+    store = tmp_path / "store"
+    first = _manifest("compute001")
+    unpack_evidence_bundles.ingest_bundle(
+        _bundle(
+            tmp_path / "first.tar.gz",
+            {
+                "manifest.json": json.dumps(first).encode(),
+                "sshd_config.fingerprint": b"f1",
+                "sshd_config.stdout": b"permitrootlogin no\n",
+                "sshd_config.stderr": b"",
+                "selinux_status.stdout": b"SELinux status: enabled\n",
+                "selinux_status.stderr": b"",
+            },
+        ),
+        "evidence-2026-02-15T02-00-00Z",
+        store,
+    )
+    assert evidence_store.latest_fingerprints(store) == {"compute001": {"sshd_config": "f1"}}
+
+    second = dict(first, collected="2026-02-16T02:00:00Z")
+    manifest = unpack_evidence_bundles.ingest_bundle(
+        _bundle(
+            tmp_path / "second.tar.gz",
+            {
+                "manifest.json": json.dumps(second).encode(),
+                "sshd_config.fingerprint": b"f1",
+                "sshd_config.reused": b"",
+                "selinux_status.stdout": b"SELinux status: disabled\n",
+                "selinux_status.stderr": b"",
+            },
+        ),
+        "evidence-2026-02-16T02-00-00Z",
+        store,
+    )
+
+    assert manifest["bundle"]["reused"] == ["sshd_config"]
+    assert manifest["bundle"]["unresolved"] == []
+    root = tmp_path / "evidence"
+    evidence_store.materialize("evidence-2026-02-16T02-00-00Z", root, store, ["by_system"])
+    sshd = (root / "by_system" / "compute001" / "sshd_config.txt").read_text()
+    assert sshd.endswith("# collected: 2026-02-15T02:00:00Z\npermitrootlogin no\n")
+    assert "disabled" in (root / "by_system" / "compute001" / "selinux_status.txt").read_text()
+    stats = evidence_store.run_stats("evidence-2026-02-16T02-00-00Z", store)
+    assert (stats["artifacts_collected"], stats["artifacts_reused"]) == (1, 1)
+    assert stats["reused_by_host"] == {"compute001": ["sshd_config"]}
+
+
+def test_reuse_without_previous_output_is_left_for_recollection(tmp_path: Path) -> None:
+    manifest = unpack_evidence_bundles.ingest_bundle(
+        _bundle(
+            tmp_path / "host.tar.gz",
+            {
+                "manifest.json": json.dumps(_manifest("compute001")).encode(),
+                "sshd_config.fingerprint": b"f1",
+                "sshd_config.reused": b"",
+            },
+        ),
+        "evidence-run1",
+        tmp_path / "store",
+    )
+
+    assert manifest["bundle"]["unresolved"] == ["sshd_config"]
+    assert manifest["artifacts"] == []
+    assert evidence_store.latest_fingerprints(tmp_path / "store") == {"compute001": {}}
+
+
+def test_truncated_output_is_marked_in_the_evidence_file(tmp_path: Path) -> None:
+    store, root = tmp_path / "store", tmp_path / "evidence"
+    manifest = unpack_evidence_bundles.ingest_bundle(
+        _bundle(
+            tmp_path / "host.tar.gz",
+            {
+                "manifest.json": json.dumps(_manifest("compute001")).encode(),
+                "sshd_config.stdout": b"permitrootlogin no\nciphers aes",
+                "sshd_config.stdout-truncated": b"30",
+                "sshd_config.stderr": b"",
+            },
+        ),
+        "evidence-run1",
+        store,
+    )
+    evidence_store.materialize("evidence-run1", root, store, ["by_system"])
+
+    assert manifest["artifacts"][0]["truncated"] == {"stdout": 30}
+    assert (root / "by_system" / "compute001" / "sshd_config.txt").read_text().endswith(
+        "ciphers aes\n# [truncated: output exceeded the 30-byte evidence cap; only the first 30 bytes were collected]\n"
+    )
+
+
+def test_timed_out_command_is_marked_and_never_offered_for_reuse(tmp_path: Path) -> None:
+    store, root = tmp_path / "store", tmp_path / "evidence"
+    manifest = unpack_evidence_bundles.ingest_bundle(
+        _bundle(
+            tmp_path / "host.tar.gz",
+            {
+                "manifest.json": json.dumps(_manifest("compute001")).encode(),
+                "sshd_config.fingerprint": b"abc123",
+                "sshd_config.stdout": b"permitrootlogin no",
+                "sshd_config.stderr": b"",
+                "sshd_config.timeout": b"60",
+            },
+        ),
+        "evidence-run1",
+        store,
+    )
+    evidence_store.materialize("evidence-run1", root, store, ["by_system"])
+
+    assert manifest["artifacts"][0]["timed_out"] == 60
+    assert (root / "by_system" / "compute001" / "sshd_config.txt").read_text().endswith(
+        "permitrootlogin no\n# [timed out: the command was stopped after 60 seconds; output above is partial]\n"
+    )
+    assert evidence_store.latest_fingerprints(store) == {"compute001": {}}
@@ -0,0 +1,88 @@
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+PLUGIN_DIR = REPO_ROOT / "plugins" / "filter"
+if str(PLUGIN_DIR) not in sys.path:
+    sys.path.insert(0, str(PLUGIN_DIR))
+
+import verify_results  # noqa: E402
+
+
+def _registered(stdout: str, rc: int = 0, check_id: str = "sshd_config") -> dict:
+    return {
+        "item": {"id": check_id, "command": "sshd -T"},
+        "cmd": ["sshd", "-T"],
+        "rc": rc,
+        "stdout": stdout,
+        "stdout_lines": stdout.splitlines(),
+        "stderr": "",
+        "stderr_lines": [],
+        "start": "2026-02-15 10:00:00.000000",
+        "end": "2026-02-15 10:00:01.250000",
+        "delta": "0:00:01.250000",
+        "changed": False,
+        "invocation": {"module_args": {"_raw_params": "sshd -T"}},
+    }
+
+
+def test_compact_result_keeps_rc_duration_hash_and_preview(tmp_path: Path) -> None:
+    stdout = "permitrootlogin no\n" * 2000
+    compact = verify_results.compact_verify_results([_registered(stdout)], store_dir=tmp_path, preview_chars=40)[0]
+
+    assert compact["id"] == "sshd_config"
+    assert compact["rc"] == 0
+    assert compact["duration_seconds"] == 1.25
+    assert compact["preview"] == stdout[:40]
+    assert compact["truncated"] is True
+    assert len(json.dumps(compact)) < len(stdout) / 100
+
+    stored = verify_results.load_output(compact["output_sha256"], tmp_path)
+    assert stored["stdout"] == stdout
+    assert stored["cmd"] == ["sshd", "-T"]
+
+
+def test_identical_outputs_share_one_object(tmp_path: Path) -> None:
+    results = [_registered("enabled\n"), _registered("enabled\n"), _registered("disabled\n", rc=1)]
+    compact = verify_results.compact_verify_results(results, store_dir=tmp_path)
+
+    assert compact[0]["output_sha256"] == compact[1]["output_sha256"]
+    assert compact[0]["output_sha256"] != compact[2]["output_sha256"]
+    assert len(list((tmp_path / "objects").rglob("*.json"))) == 2
+
+
+def test_skipped_results_and_refs(tmp_path: Path) -> None:
+    compact = verify_results.compact_verify_results(
+        [{"item": {"id": "optional"}, "skipped": True, "skip_reason": "Conditional result was False"}],
+        store_dir=tmp_path,
+    )
+    assert compact == [{"id": "optional", "rc": None, "skipped": True}]
+
+    refs = verify_results.verify_output_refs(
+        verify_results.compact_verify_results([_registered("ok\n")], store_dir=tmp_path)
+    )
+    assert set(refs[0]) == {"id", "rc", "output_sha256"}
+
+
+def test_show_verify_output_prints_full_output(tmp_path: Path) -> None:
+    compact = verify_results.compact_verify_results([_registered("ciphers aes256-gcm\n")], store_dir=tmp_path)[0]
+    result = subprocess.run(
+        [
+            sys.executable,
+            "scripts/show_verify_output.py",
+            compact["output_sha256"],
+            "--store-dir",
+            str(tmp_path),
+        ],
+        cwd=REPO_ROOT,
+        capture_output=True,
+        text=True,
+        check=False,
+    )
+    assert result.returncode == 0, result.stderr
+    assert "ciphers aes256-gcm" in result.stdout
+    assert "rc: 0" in result.stdout